@@ -0,0 +1,3 @@
+from .generator import generate_ecosystem, RELATION_MIX
+from .harness import Benchmark, Result, measure, run_suite, save_results, load_results, compare
+from .suite import BENCHMARKS
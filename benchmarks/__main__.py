@@ -0,0 +1,59 @@
+"""Run the scaling benchmarks on synthetic power-law dependency graphs.
+
+Usage: python -m benchmarks --sizes 1000 10000 --output results.json --baseline baseline.json
+"""
+
+import argparse
+import sys
+
+from . import BENCHMARKS, generate_ecosystem, run_suite, save_results, load_results, compare
+
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Graph sizes in nodes (up to 1000000)")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per benchmark (best is kept)")
+    parser.add_argument("--only", nargs="+", choices=[b.name for b in BENCHMARKS],
+                        help="Run only these benchmarks")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory run")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write results")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown ratio that counts as a regression")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    ecosystems = {}
+    for size in sorted(set(args.sizes)):
+        print(f"Generating {size:,}-node ecosystem...")
+        ecosystems[size] = generate_ecosystem(size, seed=args.seed)
+
+    print()
+    results = run_suite(BENCHMARKS, ecosystems, repeats=args.repeats,
+                        memory=not args.no_memory, only=args.only)
+    save_results(args.output, results, seed=args.seed, repeats=args.repeats)
+    print(f"\nWrote {args.output}")
+
+    if not args.baseline:
+        return
+
+    rows = compare(results, load_results(args.baseline), args.threshold)
+    print(f"\n--- Compared to {args.baseline} ---")
+    for row in rows:
+        flag = "  REGRESSION" if row['regression'] else ""
+        print(f"{row['benchmark']:<24} {row['nodes']:>9,} nodes  {row['ratio']:>6.2f}x{flag}")
+
+    if any(row['regression'] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
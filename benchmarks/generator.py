@@ -0,0 +1,86 @@
+import numpy as np
+
+from src.storage import Package, Dependency, RelationType, Domain, Role, HealthStatus
+
+
+# share of each relation type among edges, measured from the collected dataset
+RELATION_MIX = {
+    RelationType.REQUIRES_CORE: 0.376,
+    RelationType.REQUIRES_OPTIONAL: 0.323,
+    RelationType.REQUIRES_DEV: 0.286,
+    RelationType.EXTENDS: 0.015,
+}
+
+
+def generate_ecosystem(num_nodes: int,
+                       seed: int = 0,
+                       avg_out_degree: float = 4.0,
+                       exponent: float = 2.1,
+                       relation_mix: dict[RelationType, float] = None) -> tuple[list[Package], list[Dependency]]:
+    """Seeded synthetic dependency ecosystem with power-law in-degrees.
+
+    Packages are ordered by age; each one depends on older packages chosen
+    with probability proportional to a Pareto-distributed popularity, so a
+    few foundational packages (the numpys) collect most of the dependents.
+    Out-degrees are log-normal around `avg_out_degree`. Everything is drawn
+    with numpy in bulk, so a million nodes takes seconds.
+    """
+    rng = np.random.default_rng(seed)
+    mix = relation_mix or RELATION_MIX
+
+    # popularity ~ Pareto; in-degree tail exponent follows `exponent`
+    popularity = rng.pareto(exponent - 1, num_nodes) + 1
+    cumulative = np.cumsum(popularity)
+
+    sigma = 1.0
+    out_degree = rng.lognormal(np.log(avg_out_degree) - sigma ** 2 / 2, sigma, num_nodes).astype(np.int64)
+    out_degree[0] = 0
+    out_degree = np.minimum(out_degree, np.arange(num_nodes))
+
+    src = np.repeat(np.arange(num_nodes), out_degree)
+    # pick older targets by inverse-CDF over each source's prefix of popularity
+    prefix = np.where(src > 0, cumulative[np.maximum(src - 1, 0)], 0.0)
+    dst = np.searchsorted(cumulative, rng.random(len(src)) * prefix, side='right')
+    dst = np.minimum(dst, np.maximum(src - 1, 0))
+
+    relations = list(mix)
+    weights = np.array([mix[r] for r in relations])
+    rel = rng.choice(len(relations), size=len(src), p=weights / weights.sum())
+
+    # one edge per (source, target, relation), like the dependencies table
+    keys = np.unique(np.stack([src, dst, rel], axis=1), axis=0)
+    keys = keys[keys[:, 0] != keys[:, 1]]
+
+    names = [f"pkg-{i:07d}" for i in range(num_nodes)]
+    packages = _packages(names, popularity, rng)
+    dependencies = [
+        Dependency(source=names[s], target=names[t], relation_type=relations[r],
+                   version_constraint=">=1.0", source_file="pyproject.toml")
+        for s, t, r in keys.tolist()
+    ]
+    return packages, dependencies
+
+
+def _packages(names: list[str], popularity: np.ndarray, rng: np.random.Generator) -> list[Package]:
+    n = len(names)
+    domains = [d.value for d in Domain]
+    roles = [r.value for r in Role]
+    health = [h.value for h in HealthStatus]
+
+    domain_idx = rng.integers(len(domains), size=n)
+    role_idx = rng.choice(len(roles), size=n)
+    health_idx = rng.integers(len(health), size=n)
+    # stars track popularity loosely, with plenty of noise
+    stars = (popularity * rng.lognormal(3.0, 1.5, n)).astype(np.int64)
+
+    return [
+        Package(
+            name=names[i],
+            github_repo=f"synthetic/{names[i]}",
+            domain=domains[domain_idx[i]],
+            role=roles[role_idx[i]],
+            health_status=health[health_idx[i]],
+            github_stars=int(stars[i]),
+        )
+        for i in range(n)
+    ]
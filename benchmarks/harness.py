@@ -0,0 +1,136 @@
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Callable
+
+
+@dataclass
+class Result:
+    """One benchmark run at one graph size."""
+    benchmark: str
+    nodes: int
+    edges: int
+    seconds: float | None = None
+    peak_mb: float | None = None
+    status: str = 'ok'
+
+
+@dataclass
+class Benchmark:
+    """A hot path to measure.
+
+    `setup` builds whatever the timed call needs from the generated
+    ecosystem (untimed); `run` is the timed call and `teardown` releases
+    the state. Sizes above `max_nodes` are recorded as skipped.
+    """
+    name: str
+    setup: Callable
+    run: Callable
+    max_nodes: int = None
+    teardown: Callable = None
+
+
+def measure(fn: Callable, repeats: int = 3, memory: bool = True) -> tuple[float, float | None]:
+    """Best-of-`repeats` wall time, then peak traced allocation of one extra run (MB)."""
+    best = float('inf')
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        # separate run so tracing overhead doesn't skew the timings
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = peak / 2 ** 20
+
+    return best, peak_mb
+
+
+def run_suite(benchmarks: list[Benchmark], ecosystems: dict[int, tuple], repeats: int = 3,
+              memory: bool = True, only: list[str] = None, log: Callable = print) -> list[Result]:
+    """Run every benchmark against every generated ecosystem, smallest first."""
+    results = []
+    for size in sorted(ecosystems):
+        ecosystem = ecosystems[size]
+        num_edges = len(ecosystem[1])
+        for bench in benchmarks:
+            if only and bench.name not in only:
+                continue
+            result = Result(bench.name, size, num_edges)
+            if bench.max_nodes is not None and size > bench.max_nodes:
+                result.status = 'skipped'
+            else:
+                state = None
+                try:
+                    state = bench.setup(ecosystem)
+                    result.seconds, result.peak_mb = measure(lambda: bench.run(state), repeats, memory)
+                except MemoryError:
+                    result.status = 'out_of_memory'
+                finally:
+                    if bench.teardown and state is not None:
+                        bench.teardown(state)
+            results.append(result)
+            log(format_result(result))
+    return results
+
+
+def format_result(r: Result) -> str:
+    if r.status != 'ok':
+        return f"{r.benchmark:<24} {r.nodes:>9,} nodes  {r.status}"
+    memory = f"{r.peak_mb:>9.1f} MB" if r.peak_mb is not None else ""
+    return f"{r.benchmark:<24} {r.nodes:>9,} nodes  {r.seconds:>9.4f} s {memory}"
+
+
+def save_results(path: str, results: list[Result], **meta):
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            **meta,
+        },
+        'results': [asdict(r) for r in results],
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_results(path: str) -> list[Result]:
+    with open(path) as f:
+        return [Result(**r) for r in json.load(f)['results']]
+
+
+def compare(results: list[Result], baseline: list[Result], threshold: float = 1.25) -> list[dict]:
+    """Pair results with the baseline by (benchmark, nodes) and flag slowdowns.
+
+    A run counts as a regression when it takes more than `threshold` times
+    the baseline time.
+    """
+    base = {(r.benchmark, r.nodes): r for r in baseline if r.status == 'ok'}
+    rows = []
+    for r in results:
+        b = base.get((r.benchmark, r.nodes))
+        if r.status != 'ok' or b is None:
+            continue
+        ratio = r.seconds / b.seconds if b.seconds else float('inf')
+        rows.append({
+            'benchmark': r.benchmark,
+            'nodes': r.nodes,
+            'baseline_seconds': b.seconds,
+            'seconds': r.seconds,
+            'ratio': ratio,
+            'regression': ratio > threshold,
+        })
+    return rows
@@ -0,0 +1,139 @@
+import random
+from dataclasses import dataclass
+
+from src.storage import Repository
+
+
+MARKERS = ['', '; python_version >= "3.8"', '; sys_platform == "linux"', '; extra == "gpu"']
+SPECS = ['', '>=1.0', '>=2.1,<3', '==0.4.2', '~=1.5', '!=1.2.0,>=1.0']
+EXTRAS = ['', '[gpu]', '[all,dev]']
+
+
+@dataclass
+class Manifest:
+    """One generated manifest and the number of requirement specs it contains."""
+    kind: str
+    content: str
+    source_pkg: str
+    lines: int
+
+
+def _requirement(rng: random.Random, names: list[str]) -> str:
+    return rng.choice(names) + rng.choice(EXTRAS) + rng.choice(SPECS) + rng.choice(MARKERS)
+
+
+def pep621_pyproject(rng: random.Random, names: list[str], size: int) -> tuple[str, int]:
+    groups = {'dev': size // 4, 'docs': size // 8, 'gpu': size // 8, 'all': size // 4}
+    core = [_requirement(rng, names) for _ in range(size)]
+    out = ['[project]', 'name = "generated"', 'dependencies = [']
+    # literal strings, since markers contain double quotes
+    out += [f"    '{r}'," for r in core] + [']', '', '[project.optional-dependencies]']
+    for group, count in groups.items():
+        out.append(f'{group} = [' + ', '.join(f"'{_requirement(rng, names)}'" for _ in range(count)) + ']')
+    return '\n'.join(out) + '\n', size + sum(groups.values())
+
+
+def poetry_pyproject(rng: random.Random, names: list[str], size: int) -> tuple[str, int]:
+    out = ['[tool.poetry]', 'name = "generated"', '', '[tool.poetry.dependencies]', 'python = "^3.9"']
+    lines = 0
+    for _ in range(size):
+        name = rng.choice(names)
+        if rng.random() < 0.3:
+            out.append(f'{name} = {{ version = "^1.{rng.randint(0, 9)}", optional = true }}')
+        else:
+            out.append(f'{name} = "^{rng.randint(0, 5)}.{rng.randint(0, 20)}"')
+        lines += 1
+    for group in ('dev', 'test', 'docs', 'lint', 'benchmarks'):
+        out += ['', f'[tool.poetry.group.{group}.dependencies]']
+        for _ in range(max(size // 5, 1)):
+            out.append(f'{rng.choice(names)} = ">={rng.randint(0, 5)}.0"')
+            lines += 1
+    return '\n'.join(out) + '\n', lines
+
+
+def transformers_setup_py(rng: random.Random, names: list[str], size: int) -> tuple[str, int]:
+    """setup.py in the style of huggingface/transformers: a `_deps` table and deps_list()."""
+    table = sorted(set(rng.sample(names, min(size, len(names)))))
+    specs = [name + rng.choice(SPECS[1:]) for name in table]
+    out = ['import re', 'from setuptools import setup', '', '_deps = [']
+    out += [f'    "{s}",' for s in specs] + [']', '']
+    out += [
+        'deps = {b: a for a, b in (re.findall(r"^(([^!=<>~ ]+)(?:[!=<>~ ].*)?$)", x)[0] for x in _deps)}',
+        '',
+        'def deps_list(*pkgs):',
+        '    return [deps[pkg] for pkg in pkgs]',
+        '',
+    ]
+
+    def picks(count):
+        return ', '.join(f'"{rng.choice(table)}"' for _ in range(count))
+
+    core = max(size // 4, 1)
+    extras = {'torch': size // 8, 'tf': size // 8, 'testing': size // 4, 'dev': size // 4}
+    lookups = ', '.join(f'deps["{rng.choice(table)}"]' for _ in range(core))
+    out.append(f'install_requires = [{lookups}]')
+    out.append('')
+    out.append('setup(')
+    out.append('    name="generated",')
+    out.append('    install_requires=install_requires,')
+    out.append('    extras_require={')
+    out += [f'        "{name}": deps_list({picks(max(count, 1))}),' for name, count in extras.items()]
+    out.append('    },')
+    out.append(')')
+    return '\n'.join(out) + '\n', core + sum(max(c, 1) for c in extras.values())
+
+
+def requirements_txt(rng: random.Random, names: list[str], size: int) -> tuple[str, int]:
+    out = ['# generated requirements', '--index-url https://pypi.org/simple', '-r base.txt', '']
+    lines = 0
+    for i in range(size):
+        if i % 50 == 0:
+            out.append(f'# section {i // 50}')
+        out.append(_requirement(rng, names))
+        lines += 1
+    return '\n'.join(out) + '\n', lines
+
+
+GENERATORS = {
+    'pyproject_pep621': pep621_pyproject,
+    'pyproject_poetry': poetry_pyproject,
+    'setup_py_transformers': transformers_setup_py,
+    'requirements_txt': requirements_txt,
+}
+
+# per-file requirement counts: mostly small manifests, some big ones
+SIZES = {
+    'pyproject_pep621': (5, 40),
+    'pyproject_poetry': (5, 40),
+    'setup_py_transformers': (20, 120),
+    'requirements_txt': (10, 5000),
+}
+
+
+def generate_corpus(files_per_kind: int = 200, seed: int = 0, vocabulary: int = 2000) -> list[Manifest]:
+    """Seeded corpus of manifests of every supported kind."""
+    rng = random.Random(seed)
+    names = [f'pkg{"-_"[i % 2]}name{i}' for i in range(vocabulary)]
+    corpus = []
+    for kind, generate in GENERATORS.items():
+        low, high = SIZES[kind]
+        for i in range(files_per_kind):
+            # log-uniform sizes, so a few files are huge
+            size = int(low * (high / low) ** rng.random())
+            content, lines = generate(rng, names, size)
+            corpus.append(Manifest(kind, content, f'{kind}-{i}', lines))
+    return corpus
+
+
+def corpus_repositories(corpus: list[Manifest]) -> list[Repository]:
+    """Wrap each manifest in a Repository, as extract_all expects."""
+    field = {
+        'pyproject_pep621': 'pyproject_toml',
+        'pyproject_poetry': 'pyproject_toml',
+        'setup_py_transformers': 'setup_py',
+        'requirements_txt': 'requirements_txt',
+    }
+    return [
+        Repository(full_name=f'synthetic/{m.source_pkg}', package_name=m.source_pkg, **{field[m.kind]: m.content})
+        for m in corpus
+    ]
@@ -0,0 +1,126 @@
+"""Measure manifest parser throughput and serial vs process-pool extraction.
+
+Usage: python -m benchmarks.parsers --files 500 --workers 4 --output parser_results.json
+"""
+
+import argparse
+import json
+import os
+from collections import defaultdict
+
+from src.parsing import parse_pyproject, parse_setup_py, parse_requirements, extract_all
+from src.parsing.dependency_extractor import PARALLEL_THRESHOLD
+from src.storage import Database
+
+from .harness import measure
+from .manifests import Manifest, generate_corpus, corpus_repositories
+
+
+PARSERS = {
+    'pyproject_pep621': parse_pyproject,
+    'pyproject_poetry': parse_pyproject,
+    'setup_py_transformers': parse_setup_py,
+    'requirements_txt': parse_requirements,
+}
+
+
+def parser_throughput(corpus: list[Manifest], repeats: int = 3) -> list[dict]:
+    """Files and requirement lines per second for each manifest kind."""
+    by_kind = defaultdict(list)
+    for m in corpus:
+        by_kind[m.kind].append(m)
+
+    rows = []
+    for kind, manifests in by_kind.items():
+        parse = PARSERS[kind]
+
+        def run():
+            for m in manifests:
+                parse(m.content, m.source_pkg)
+
+        seconds, _ = measure(run, repeats, memory=False)
+        lines = sum(m.lines for m in manifests)
+        rows.append({
+            'parser': kind,
+            'files': len(manifests),
+            'lines': lines,
+            'seconds': seconds,
+            'files_per_second': len(manifests) / seconds,
+            'lines_per_second': lines / seconds,
+        })
+    return rows
+
+
+def extraction_scaling(repos: list, workers: list[int], repeats: int = 1) -> list[dict]:
+    """Time extract_all over the whole corpus with each worker count; 1 worker is always included as the baseline."""
+    if len(repos) < PARALLEL_THRESHOLD:
+        print(f"  note: {len(repos)} repos is below PARALLEL_THRESHOLD ({PARALLEL_THRESHOLD}), so every run is serial")
+    rows = []
+    for count in sorted({1, *workers}):
+        seconds, _ = measure(lambda: extract_all(repos, workers=count), repeats, memory=False)
+        rows.append({'workers': count, 'repos': len(repos), 'seconds': seconds,
+                     'repos_per_second': len(repos) / seconds})
+    return rows
+
+
+def database_repositories(min_repos: int) -> list:
+    """Real manifests collected into the database, for comparison with the synthetic corpus.
+
+    The collected set is repeated up to `min_repos` repositories, so it is
+    large enough for extract_all to use the process pool at all.
+    """
+    repos = [r for r in Database().get_all_repositories()
+             if r.pyproject_toml or r.setup_py or r.requirements_txt]
+    if not repos:
+        return repos
+    copies = -(-min_repos // len(repos))
+    return repos * max(copies, 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200, help="Generated manifests per kind")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per parser (best is kept)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="Worker counts to compare for extract_all")
+    parser.add_argument("--from-db", action="store_true",
+                        help="Also time extract_all over the repositories stored in the database")
+    parser.add_argument("--db-repos", type=int, default=4 * PARALLEL_THRESHOLD,
+                        help="Repeat the stored repositories up to this many for --from-db")
+    parser.add_argument("--output", default="parser_results.json", help="Where to write results")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print(f"Generating {args.files} manifests per kind...")
+    corpus = generate_corpus(args.files, seed=args.seed)
+
+    print("\n--- Parser throughput ---")
+    throughput = parser_throughput(corpus, args.repeats)
+    for row in throughput:
+        print(f"{row['parser']:<24} {row['files_per_second']:>10,.0f} files/s "
+              f"{row['lines_per_second']:>12,.0f} lines/s")
+
+    print("\n--- extract_all, synthetic corpus ---")
+    scaling = {'synthetic': extraction_scaling(corpus_repositories(corpus), args.workers)}
+    if args.from_db:
+        scaling['database'] = extraction_scaling(database_repositories(args.db_repos), args.workers)
+
+    for corpus_name, rows in scaling.items():
+        if corpus_name != 'synthetic':
+            print(f"\n--- extract_all, {corpus_name} ---")
+        serial = next(row['seconds'] for row in rows if row['workers'] == 1)
+        for row in rows:
+            print(f"{row['workers']:>3} workers  {row['repos_per_second']:>10,.0f} repos/s "
+                  f"{serial / row['seconds']:>6.2f}x")
+
+    with open(args.output, 'w') as f:
+        json.dump({'seed': args.seed, 'parsers': throughput, 'extract_all': scaling}, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import random
+import shutil
+import tempfile
+
+import networkx as nx
+
+from src.storage import Database
+from src.graph import build_graph, filter_graph, compute_metrics, find_all_paths
+from src.graph import paths
+
+from .harness import Benchmark
+
+
+# number of source/target pairs timed per find_all_paths run
+PATH_QUERIES = 20
+
+
+def _graph(ecosystem):
+    packages, deps = ecosystem
+    return nx.freeze(build_graph(packages, deps))
+
+
+def _filter(G):
+    view = filter_graph(G, domains=['deep_learning', 'nlp', 'data_processing'],
+                        relation_types=['requires_core'], min_in_degree=2)
+    return view.number_of_edges()
+
+
+def _path_queries(ecosystem):
+    G = _graph(ecosystem)
+    rng = random.Random(0)
+    sources = [n for n, d in G.out_degree() if d > 0]
+    # popular targets, the way people use the path explorer
+    targets = sorted(G.nodes(), key=G.in_degree, reverse=True)[:100]
+    pairs = [(rng.choice(sources), rng.choice(targets)) for _ in range(PATH_QUERIES)]
+    return G, pairs
+
+
+def _find_paths(state):
+    G, pairs = state
+    # every timed run searches from scratch, not replaying the previous run's results
+    paths._path_cache.clear()
+    for source, target in pairs:
+        find_all_paths(G, source, target, max_length=5, max_paths=10)
+
+
+def _warm_path_queries(ecosystem):
+    state = _path_queries(ecosystem)
+    _find_paths(state)
+    return state
+
+
+def _replay_paths(state):
+    G, pairs = state
+    for source, target in pairs:
+        find_all_paths(G, source, target, max_length=5, max_paths=10)
+
+
+def _empty_db(ecosystem):
+    tmp = tempfile.mkdtemp(prefix='bench-db-')
+    return tmp, ecosystem
+
+
+def _write_db(state):
+    tmp, (packages, deps) = state
+    path = os.path.join(tmp, 'bench.db')
+    if os.path.exists(path):
+        os.remove(path)
+    db = Database(path)
+    db.save_packages(packages)
+    db.save_dependencies(deps)
+
+
+def _filled_db(ecosystem):
+    state = _empty_db(ecosystem)
+    _write_db(state)
+    return Database(os.path.join(state[0], 'bench.db')), state[0]
+
+
+def _read_db(state):
+    db, _ = state
+    db.get_all_packages()
+    db.get_all_dependencies()
+
+
+# peak memory covers this process only, not the betweenness worker processes
+BENCHMARKS = [
+    Benchmark('build_graph', lambda eco: eco, lambda eco: build_graph(*eco)),
+    Benchmark('filter_graph', _graph, _filter),
+    Benchmark('compute_metrics', _graph, compute_metrics, max_nodes=10_000),
+    Benchmark('compute_metrics_adaptive', _graph,
+              lambda G: compute_metrics(G, betweenness_mode='adaptive'), max_nodes=100_000),
+    Benchmark('find_all_paths', _path_queries, _find_paths),
+    Benchmark('find_all_paths_cached', _warm_path_queries, _replay_paths),
+    Benchmark('db_write', _empty_db, _write_db,
+              teardown=lambda state: shutil.rmtree(state[0], ignore_errors=True)),
+    Benchmark('db_read', _filled_db, _read_db,
+              teardown=lambda state: shutil.rmtree(state[1], ignore_errors=True)),
+]
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Audit requirements files against the ecosystem graph, one JSON line per finding.
+
+Inputs are requirements*.txt, pyproject.toml and setup.py files, or
+directories searched for them; with no arguments, paths are read one per
+line from stdin. Each dependency is looked up in a memory-mapped snapshot
+of the graph metrics, written next to the database and rebuilt when the
+database changes, and reported when it is:
+
+  declining      no commits for over a year
+  hidden_pillar  among the top hidden pillars (high centrality, low visibility)
+  deep_chain     at or above --min-layer in the dependency layering
+  cycle          part of a dependency cycle
+  unknown        not in the graph (only with --unknown)
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.storage import Database, Repository, HealthStatus
+from src.parsing import extract_dependencies, normalize_name
+from src.parsing.dependency_extractor import PARALLEL_THRESHOLD, CHUNK_SIZE
+from src.graph import build_graph, condense, find_hidden_pillars
+
+
+MANIFESTS = ('pyproject.toml', 'setup.py')
+
+# files read and parsed per batch; findings are written after each batch
+BATCH_SIZE = 4096
+
+HEALTH_CODES = [h.value for h in HealthStatus]
+
+SNAPSHOT_ARRAYS = ('health', 'pagerank', 'layer', 'dependents', 'cycle', 'pillar')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Files or directories to audit")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: all cores)")
+    parser.add_argument("--pillars", type=int, default=50, help="How many top hidden pillars to flag")
+    parser.add_argument("--min-layer", type=int, default=6, help="Dependency layer reported as a deep chain")
+    parser.add_argument("--unknown", action="store_true", help="Also report dependencies missing from the graph")
+    parser.add_argument("--snapshot", default=None, help="Snapshot directory (default: next to the database)")
+    return parser.parse_args()
+
+
+def iter_manifests(paths: list[str]):
+    """Manifest files named by `paths`, searching directories recursively."""
+    for path in map(Path, paths):
+        if path.is_dir():
+            for root, dirs, files in os.walk(path):
+                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ('node_modules', '__pycache__')]
+                for name in files:
+                    if _is_manifest(name):
+                        yield Path(root) / name
+        elif path.is_file():
+            yield path
+
+
+def _is_manifest(name: str) -> bool:
+    return name in MANIFESTS or (name.startswith('requirements') and name.endswith('.txt'))
+
+
+def read_manifest(path: Path) -> Repository | None:
+    """Wrap one file as a Repository so the regular extractor can parse it."""
+    try:
+        content = path.read_text(errors='replace')
+    except OSError as e:
+        print(f"{path}: {e}", file=sys.stderr)
+        return None
+    # the path never collides with a package name, so no dependency is dropped as a self-reference
+    repo = Repository(full_name=str(path), package_name=str(path))
+    if path.name == 'pyproject.toml':
+        repo.pyproject_toml = content
+    elif path.name == 'setup.py':
+        repo.setup_py = content
+    else:
+        repo.requirements_txt = content
+    return repo
+
+
+def build_snapshot(db: Database, directory: Path, top_pillars: int) -> None:
+    """Write the per-package arrays the audit reads, as .npy files for memory mapping."""
+    packages = db.get_all_packages()
+    G = build_graph(packages, db.get_all_dependencies())
+    pillars = {name for name, _ in find_hidden_pillars(G, top_n=top_pillars)}
+    structure = condense(G).node_structure()
+    names = list(G.nodes())
+    data = [G.nodes[n] for n in names]
+
+    arrays = {
+        'health': np.array([HEALTH_CODES.index(d.get('health_status') or HealthStatus.UNKNOWN.value)
+                            for d in data], dtype=np.uint8),
+        'pagerank': np.array([d.get('pagerank') or 0.0 for d in data], dtype=np.float64),
+        'layer': np.array([structure[n]['topo_layer'] for n in names], dtype=np.int32),
+        'dependents': np.array([G.in_degree(n) for n in names], dtype=np.int32),
+        'cycle': np.array([structure[n]['in_cycle'] for n in names], dtype=bool),
+        'pillar': np.array([n in pillars for n in names], dtype=bool),
+    }
+    directory.mkdir(parents=True, exist_ok=True)
+    for key, array in arrays.items():
+        np.save(directory / f"{key}.npy", array)
+    # written last: a snapshot without a matching meta file is rebuilt
+    meta = {'version': list(db.data_version()), 'pillars': top_pillars, 'names': names}
+    (directory / 'meta.json').write_text(json.dumps(meta))
+
+
+def load_snapshot(db: Database, directory: Path, top_pillars: int) -> tuple[list[str], dict, dict[str, np.ndarray]]:
+    """Stored names, normalized name -> rows and memory-mapped arrays, rebuilding a stale snapshot first.
+
+    Some stored names aren't normalized (`scikit_learn` next to `scikit-learn`),
+    so a normalized name maps to every row it covers.
+    """
+    meta_path = directory / 'meta.json'
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else None
+    if not meta or meta['version'] != list(db.data_version()) or meta['pillars'] != top_pillars:
+        print(f"Building snapshot in {directory}...", file=sys.stderr)
+        build_snapshot(db, directory, top_pillars)
+        meta = json.loads(meta_path.read_text())
+
+    names = meta['names']
+    normalized = {}
+    for i, name in enumerate(names):
+        normalized.setdefault(normalize_name(name), []).append(i)
+    arrays = {key: np.load(directory / f"{key}.npy", mmap_mode='r') for key in SNAPSHOT_ARRAYS}
+    return names, normalized, arrays
+
+
+def findings(path: str, deps: list, names: list[str], normalized: dict[str, list[int]],
+             arrays: dict[str, np.ndarray], args):
+    """Finding dicts for one file's dependencies.
+
+    `node` is the stored package a finding is about. A dependency matching
+    a stored name exactly uses only that package; otherwise every stored
+    package with the same normalized name is reported separately.
+    """
+    declining = HEALTH_CODES.index(HealthStatus.DECLINING.value)
+    for dep in deps:
+        base = {'file': path, 'package': dep.target, 'relation': dep.relation_type.value,
+                'version': dep.version_constraint}
+        rows = normalized.get(normalize_name(dep.target), [])
+        exact = [i for i in rows if names[i] == dep.target]
+        if not rows:
+            if args.unknown:
+                yield {**base, 'finding': 'unknown'}
+            continue
+
+        for i in exact or rows:
+            kinds = []
+            if arrays['health'][i] == declining:
+                kinds.append('declining')
+            if arrays['pillar'][i]:
+                kinds.append('hidden_pillar')
+            if arrays['layer'][i] >= args.min_layer:
+                kinds.append('deep_chain')
+            if arrays['cycle'][i]:
+                kinds.append('cycle')
+            if not kinds:
+                continue
+
+            detail = {
+                'node': names[i],
+                'health': HEALTH_CODES[arrays['health'][i]],
+                'pagerank': float(arrays['pagerank'][i]),
+                'layer': int(arrays['layer'][i]),
+                'dependents': int(arrays['dependents'][i]),
+            }
+            for kind in kinds:
+                yield {**base, 'finding': kind, **detail}
+
+
+def batches(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    args = parse_args()
+    paths = args.paths or [line.strip() for line in sys.stdin if line.strip()]
+
+    db = Database()
+    snapshot = Path(args.snapshot) if args.snapshot else Path(db.db_path).parent / 'audit_snapshot'
+    names, normalized, arrays = load_snapshot(db, snapshot, args.pillars)
+
+    workers = args.workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    files = 0
+    try:
+        for batch in batches(iter_manifests(paths), BATCH_SIZE):
+            repos = [r for r in map(read_manifest, batch) if r is not None]
+            if pool is not None and len(repos) >= PARALLEL_THRESHOLD:
+                parsed = pool.map(extract_dependencies, repos, chunksize=CHUNK_SIZE)
+            else:
+                parsed = map(extract_dependencies, repos)
+
+            lines = []
+            for repo, deps in zip(repos, parsed):
+                lines.extend(json.dumps(f) for f in findings(repo.full_name, deps, names, normalized, arrays, args))
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
+            files += len(repos)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print(f"Audited {files} files", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Stream the packages transitively affected by a set of packages as JSON lines.
+
+Package names come from the arguments, or one per line on stdin if none are given.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.storage import Database, RelationType
+from src.parsing import normalize_name
+from src.graph import build_graph
+from src.graph.impact import blast_radius
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("packages", nargs="*", help="Packages to treat as broken")
+    parser.add_argument(
+        "--relation", action="append", choices=[r.value for r in RelationType],
+        help="Only follow these relation types (repeatable, default: all)"
+    )
+    parser.add_argument("--max-depth", type=int, default=None, help="Maximum number of hops")
+    return parser.parse_args()
+
+
+def resolve_names(G, requested: list[str]) -> tuple[list[str], list[str]]:
+    """Graph nodes for the requested names, and the names with no node.
+
+    Some stored names aren't in PEP 503 form (e.g. `scikit_learn`), so an
+    exact node match wins; otherwise every node with the same normalized name is used.
+    """
+    by_normalized = {}
+    for node in G.nodes():
+        by_normalized.setdefault(normalize_name(node), []).append(node)
+
+    names, missing = [], []
+    for name in requested:
+        if name in G:
+            names.append(name)
+        elif normalize_name(name) in by_normalized:
+            names.extend(by_normalized[normalize_name(name)])
+        else:
+            missing.append(name)
+    return list(dict.fromkeys(names)), missing
+
+
+def main():
+    args = parse_args()
+    requested = args.packages or [line.strip() for line in sys.stdin if line.strip()]
+
+    db = Database()
+    G = build_graph(db.get_all_packages(), db.get_all_dependencies())
+
+    names, missing = resolve_names(G, requested)
+    if missing:
+        print(f"Unknown packages: {', '.join(missing)}", file=sys.stderr)
+
+    for impact in blast_radius(G, names, args.relation, args.max_depth):
+        sys.stdout.write(json.dumps(impact.to_dict()) + "\n")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,147 @@
 #!/usr/bin/env python3
 """Build dependency graph from collected data."""
 
+import argparse
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src import instrumentation
+from src.instrumentation import span
 from src.storage import Database, Package
-from src.parsing import extract_dependencies
+from src.parsing import extract_many
 from src.ontology import classify_and_assess, refine_dependencies, run_inference
-from src.graph import build_graph, update_package_metrics, get_graph_stats, find_hidden_pillars
+from src.graph import build_graph, compute_metrics, update_package_metrics, get_graph_stats, find_hidden_pillars
+from src.graph import compute_metric_variants, compute_layout, place_new_nodes, export_closures
+from src.graph.incremental import diff_dependencies, update_metrics_incremental
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only update metrics affected by dependency changes since the last build (metadata is refreshed too)"
+    )
+    parser.add_argument(
+        "--report", metavar="PATH",
+        help="Write a JSON report of per-stage timings and counters"
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="Add tracemalloc peak memory per stage to the report (slows the build)"
+    )
+    parser.add_argument(
+        "--profile", metavar="PATH",
+        help="Write a cProfile dump of the whole run (view with pstats or snakeviz)"
+    )
+    return parser.parse_args()
+
+
+# package fields that come from the crawl and classification rather than the graph
+METADATA_FIELDS = ('github_repo', 'domain', 'role', 'health_status', 'description',
+                   'latest_version', 'github_stars', 'last_commit_date')
+
+
+def _metadata(pkg: Package) -> tuple:
+    return tuple(getattr(pkg, f) for f in METADATA_FIELDS)
+
+
+def run_incremental(db: Database, packages: dict[str, Package], all_deps: list) -> bool:
+    """Apply the dependency diff against the stored graph. Returns False if there is nothing stored.
+
+    Fresh crawl metadata (classification, health, stars, ...) is merged onto
+    the stored packages and inference is re-run, so metadata is refreshed
+    even when no edge changed. New packages are placed next to their
+    neighbours in the stored layout. Per-relation metric vectors and
+    reachability closures can't be patched, so they are dropped when edges
+    change and readers fall back to all-relation metrics and on-demand closures.
+    """
+    stored = db.get_all_packages()
+    if not stored:
+        return False
+
+    stored_deps = db.get_all_dependencies()
+    diff = diff_dependencies(stored_deps, all_deps)
+    print(f"Diff: +{len(diff.added)} -{len(diff.removed)} ~{len(diff.updated)} dependencies")
+
+    stored_lookup = {p.name: p for p in stored}
+    new_pkgs = [p for name, p in packages.items() if name not in stored_lookup]
+    before = {p.name: _metadata(p) for p in stored}
+
+    # keep stored metrics, take everything the crawl knows about from the fresh package
+    for pkg in stored:
+        fresh = packages.get(pkg.name)
+        if fresh is None:
+            continue
+        for field in METADATA_FIELDS:
+            value = getattr(fresh, field)
+            if value is not None:
+                setattr(pkg, field, value)
+
+    changed = []
+    G = build_graph(stored, stored_deps)
+    if diff:
+        print("Updating affected metrics...")
+        changed = update_metrics_incremental(stored + new_pkgs, G, diff)
+
+    # fresh classifications are pre-inference, so inference runs over everything again
+    with span('ontology.inference'):
+        merged = run_inference({p.name: p for p in stored + new_pkgs}, all_deps)
+    changed_names = {p.name for p in changed}
+    changed += [p for name, p in merged.items()
+                if name not in changed_names and before.get(name) != _metadata(p)]
+
+    # without a position the WebGL view would fall back to pyvis for the whole graph
+    for pkg in new_pkgs:
+        if pkg.name not in G:
+            G.add_node(pkg.name, **pkg.to_dict())
+    positions = place_new_nodes(G)
+    if positions:
+        print(f"Placing {len(positions)} packages in the stored layout...")
+        changed_names = {p.name for p in changed}
+        for name, (x, y) in positions.items():
+            pkg = merged.get(name)
+            if pkg is None:
+                continue
+            pkg.layout_x, pkg.layout_y = x, y
+            if name not in changed_names:
+                changed.append(pkg)
+
+    if not changed and not diff:
+        print("Nothing changed.")
+        return True
+
+    print(f"Saving {len(changed)} packages and {len(diff.added) + len(diff.updated)} dependencies...")
+    db.save_packages(changed)
+    db.delete_dependencies(diff.removed)
+    db.save_dependencies(diff.added + diff.updated)
+    if diff:
+        # both describe the old edges; readers fall back until the next full build
+        db.save_metric_vectors([], {})
+        db.save_closures([], {})
+
+    stale = sum(1 for p in changed if p.betweenness_stale)
+    if stale:
+        print(f"{stale} packages have stale betweenness; run a full build to refresh.")
+    return True
 
 
 def main():
+    args = parse_args()
+    if args.trace_memory and not args.report:
+        sys.exit("--trace-memory needs --report")
+
+    with instrumentation.run(args.report, args.trace_memory, args.profile):
+        build(args)
+
+    if args.report:
+        print(f"Run report written to {args.report}")
+    if args.profile:
+        print(f"Profile written to {args.profile}")
+
+
+def build(args):
     db = Database()
 
     print("Loading repositories...")
@@ -27,52 +156,73 @@ def main():
     print("\nExtracting dependencies...")
     all_deps = []
     packages = {}
-
-    for repo in repos:
-        deps = extract_dependencies(repo)
-        deps = refine_dependencies(deps)
-        all_deps.extend(deps)
-
-        pkg_name = repo.package_name or repo.full_name.split('/')[-1].lower()
-
-        if pkg_name not in packages:
-            pkg = Package(
-                name=pkg_name,
-                github_repo=repo.full_name,
-                description=repo.description,
-                github_stars=repo.stars,
-                last_commit_date=repo.last_commit,
-            )
-            pkg = classify_and_assess(pkg)
-            packages[pkg_name] = pkg
-
-    # add dependency targets as packages too
-    for dep in all_deps:
-        if dep.target not in packages:
-            pkg = Package(name=dep.target)
-            pkg = classify_and_assess(pkg)
-            packages[dep.target] = pkg
+    extracted = extract_many(repos)
+
+    with span('ontology.classify'):
+        for repo, deps in zip(repos, extracted):
+            deps = refine_dependencies(deps)
+            all_deps.extend(deps)
+
+            pkg_name = repo.package_name or repo.full_name.split('/')[-1].lower()
+
+            if pkg_name not in packages:
+                pkg = Package(
+                    name=pkg_name,
+                    github_repo=repo.full_name,
+                    description=repo.description,
+                    github_stars=repo.stars,
+                    last_commit_date=repo.last_commit,
+                )
+                pkg = classify_and_assess(pkg)
+                packages[pkg_name] = pkg
+
+        # add dependency targets as packages too
+        for dep in all_deps:
+            if dep.target not in packages:
+                pkg = Package(name=dep.target)
+                pkg = classify_and_assess(pkg)
+                packages[dep.target] = pkg
 
     print(f"Found {len(packages)} packages and {len(all_deps)} dependencies")
 
+    if args.incremental and run_incremental(db, packages, all_deps):
+        print("\nDone.")
+        return
+
     # build graph and compute metrics
     print("\nBuilding graph...")
     pkg_list = list(packages.values())
     G = build_graph(pkg_list, all_deps)
 
     print("Computing metrics...")
-    pkg_list = update_package_metrics(pkg_list, G)
+    metrics = compute_metrics(G)
+    pkg_list = update_package_metrics(pkg_list, G, metrics)
+
+    print("Computing per-relation metric variants...")
+    variants = compute_metric_variants(G, metrics)
+
+    # built here rather than on the first transitive query in the UI or API
+    print("Computing reachability closures...")
+    with span('graph.reachability'):
+        closure_nodes, closures = export_closures(G)
+
+    print("Computing layout...")
+    positions = compute_layout(G)
+    for pkg in pkg_list:
+        pkg.layout_x, pkg.layout_y = positions.get(pkg.name, (None, None))
 
     # run inference
     print("Running classification inference...")
     packages = {p.name: p for p in pkg_list}
-    packages = run_inference(packages, all_deps)
+    with span('ontology.inference'):
+        packages = run_inference(packages, all_deps)
 
     # save to database
     print("\nSaving to database...")
-    for pkg in packages.values():
-        db.save_package(pkg)
+    db.save_packages(list(packages.values()))
     db.save_dependencies(all_deps)
+    db.save_metric_vectors(variants.nodes, variants.vectors)
+    db.save_closures(closure_nodes, closures)
 
     # print stats
     stats = get_graph_stats(G)
@@ -82,12 +232,14 @@ def main():
     print(f"Density: {stats['density']:.4f}")
     print(f"Components: {stats['num_components']}")
     print(f"Largest component: {stats['largest_component_size']} nodes")
+    print(f"Dependency layers: {stats['num_layers']}")
+    print(f"Cycles: {stats['num_cycles']} (largest: {stats['largest_cycle_size']} packages)")
 
     # find hidden pillars
     print("\n--- Hidden Pillars (high centrality, potentially low visibility) ---")
-    pillars = find_hidden_pillars(G, top_n=10)
-    for name, metrics in pillars:
-        print(f"  {name}: pagerank={metrics['pagerank']:.4f}, betweenness={metrics['betweenness']:.4f}")
+    pillars = find_hidden_pillars(G, top_n=10, metrics=metrics)
+    for name, m in pillars:
+        print(f"  {name}: pagerank={m['pagerank']:.4f}, betweenness={m['betweenness']:.4f}")
 
     print(f"\nDone. Run 'streamlit run src/ui/app.py' to explore.")
 
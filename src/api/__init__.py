@@ -0,0 +1,2 @@
+from .app import QueryAPI, create_app
+from .state import GraphState, StateHolder
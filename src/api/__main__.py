@@ -0,0 +1,27 @@
+"""Serve the query API locally.
+
+Usage: python -m src.api --port 8000   (needs the optional `api` extra: uvicorn)
+"""
+
+import argparse
+
+from .app import create_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--db", default=None, help="Database path (default: DATABASE_PATH or data/ml_analyzer.db)")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn is not installed; pip install -e '.[api]'")
+
+    uvicorn.run(create_app(args.db), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
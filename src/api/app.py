@@ -0,0 +1,418 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from ..storage import RelationType, SORT_KEYS
+from ..parsing import normalize_name
+from ..graph import iter_paths, get_path_details, get_graph_stats, reachability_index
+from ..graph.compact import compact_graph, relation_mask
+from ..graph.variants import VARIANT_METRICS
+from .state import GraphState, StateHolder, version_tag
+
+
+# encoded responses kept per data version, in bytes
+RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+
+# bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+# seconds a path query may run before returning what it has
+PATH_TIME_BUDGET = 5.0
+
+MAX_LIMIT = 500
+
+BINARY = 'application/octet-stream'
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Response:
+    body: bytes
+    content_type: str = 'application/json'
+    status: int = 200
+    gzipped: bool = False
+    # partial results (e.g. cut off by a time budget) are neither cached nor ETagged
+    cacheable: bool = True
+
+
+class _ResponseCache:
+    """Thread-safe LRU of encoded responses, bounded by total body size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+    def use_version(self, version) -> None:
+        """Drop every entry if `version` differs from the one last used."""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._bytes = 0
+                self._version = version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, response: Response) -> None:
+        size = len(response.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = response
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+
+class QueryAPI:
+    """Read-only HTTP API over the dependency graph, as a plain ASGI app.
+
+    Every response carries an ETag derived from the database version and
+    the request, so `If-None-Match` revalidation is answered with a 304
+    after a single stat of the database file, before any graph work.
+    Encoded responses are cached per data version; a rebuilt database
+    changes the version, which invalidates both. JSON is the default;
+    metric vectors are also served as raw little-endian float64 with
+    `Accept: application/octet-stream`, and large bodies are gzipped when
+    the client accepts it.
+    """
+
+    def __init__(self, db_path: str = None, cache_bytes: int = RESPONSE_CACHE_BYTES):
+        self.holder = StateHolder(db_path)
+        self.cache = _ResponseCache(cache_bytes)
+        self.routes = [
+            (re.compile(r'/health'), self.health),
+            (re.compile(r'/stats'), self.stats),
+            (re.compile(r'/nodes'), self.nodes),
+            (re.compile(r'/search'), self.search),
+            (re.compile(r'/paths'), self.paths),
+            (re.compile(r'/metrics'), self.metrics),
+            (re.compile(r'/packages/(?P<name>[^/]+)'), self.package),
+            (re.compile(r'/packages/(?P<name>[^/]+)/neighbors'), self.neighbors),
+            (re.compile(r'/packages/(?P<name>[^/]+)/closure'), self.closure),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+
+        # handlers are CPU-bound; keep them off the event loop
+        status, headers, body = await asyncio.to_thread(self.handle, scope)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+    def handle(self, scope) -> tuple[int, list, bytes]:
+        """Status, headers and body for one request."""
+        request_headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+        if scope['method'] not in ('GET', 'HEAD'):
+            return _error(405, "Only GET and HEAD are supported")
+
+        path = scope['path'].rstrip('/') or '/'
+        query = scope.get('query_string', b'').decode('latin-1')
+        accept = BINARY if BINARY in request_headers.get('accept', '') else 'application/json'
+        use_gzip = 'gzip' in request_headers.get('accept-encoding', '')
+
+        digest = hashlib.blake2b(f"{path}?{query}|{accept}|{use_gzip}".encode(), digest_size=8).hexdigest()
+
+        def headers_for(version):
+            etag = f'"{version_tag(version)}-{digest}"'
+            return etag, [(b'etag', etag.encode()), (b'cache-control', b'no-cache'),
+                          (b'vary', b'Accept, Accept-Encoding')]
+
+        # revalidation only needs a stat of the database file
+        etag, common = headers_for(self.holder.version())
+        if etag in _etags(request_headers.get('if-none-match', '')):
+            return 304, common, b''
+
+        # the body, its ETag and its cache key all come from this one state, so a
+        # rebuild mid-request can't file new data under the old version
+        state = self.holder.current()
+        etag, common = headers_for(state.version)
+        # responses for an older database are never served again
+        self.cache.use_version(state.version)
+
+        key = (state.version, path, query, accept, use_gzip)
+        response = self.cache.get(key)
+        if response is None:
+            try:
+                response = self._dispatch(state, path, query, accept)
+            except HTTPError as e:
+                return _error(e.status, e.message)
+            if use_gzip and len(response.body) >= GZIP_MIN_BYTES:
+                response = Response(gzip.compress(response.body, 6), response.content_type,
+                                    response.status, gzipped=True, cacheable=response.cacheable)
+            if response.cacheable:
+                self.cache.put(key, response)
+            else:
+                # a retry may get further, so nothing may revalidate against this body
+                common = [(b'cache-control', b'no-store'), (b'vary', b'Accept, Accept-Encoding')]
+
+        headers = common + [(b'content-type', response.content_type.encode()),
+                            (b'content-length', str(len(response.body)).encode())]
+        if response.gzipped:
+            headers.append((b'content-encoding', b'gzip'))
+        return response.status, headers, response.body
+
+    def _dispatch(self, state: GraphState, path: str, query: str, accept: str) -> Response:
+        params = parse_qs(query)
+        for pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match:
+                result = handler(state, params, accept, **match.groupdict())
+                if isinstance(result, Response):
+                    return result
+                return Response(json.dumps(result, default=str).encode())
+        raise HTTPError(404, f"No route for {path}")
+
+    # --- endpoints ---
+
+    def health(self, state: GraphState, params, accept):
+        return {'status': 'ok', 'packages': len(state.packages), 'dependencies': len(state.deps)}
+
+    def stats(self, state: GraphState, params, accept):
+        return get_graph_stats(state.G)
+
+    def nodes(self, state: GraphState, params, accept):
+        """Node order of the binary metric vectors."""
+        return state.variants().nodes
+
+    def package(self, state: GraphState, params, accept, name: str):
+        name = _resolve(state, name)
+        deps = state.dependency_index
+        return {
+            'package': state.by_name[name].to_dict() if name in state.by_name else {'name': name},
+            'dependencies': _grouped(deps.dependencies(name), 'target'),
+            'dependents': _grouped(deps.dependents(name), 'source'),
+        }
+
+    def search(self, state: GraphState, params, accept):
+        q = _param(params, 'q')
+        sort_by = _param(params, 'sort', 'pagerank')
+        if sort_by not in SORT_KEYS:
+            raise HTTPError(400, f"sort must be one of {', '.join(SORT_KEYS)}")
+        offset = _int(params, 'offset', 0, 0, None)
+        limit = _int(params, 'limit', 50, 1, MAX_LIMIT)
+
+        mask = state.package_index.mask(
+            domains=params.get('domain'),
+            roles=params.get('role'),
+            health=params.get('health'),
+            min_in_degree=_int(params, 'min_in_degree', 0, 0, None),
+            names=state.search_index.matches(q) if q else None,
+        )
+        page = state.package_index.page(mask, sort_by, offset=offset, limit=limit)
+        return {
+            'total': int(mask.sum()),
+            'offset': offset,
+            'limit': limit,
+            'results': [_summary(p) for p in page],
+        }
+
+    def neighbors(self, state: GraphState, params, accept, name: str):
+        name = _resolve(state, name)
+        direction = _param(params, 'direction', 'both')
+        if direction not in ('dependencies', 'dependents', 'both'):
+            raise HTTPError(400, "direction must be dependencies, dependents or both")
+        depth = _int(params, 'depth', 1, 1, 5)
+        limit = _int(params, 'limit', 200, 1, MAX_LIMIT * 10)
+
+        cg = compact_graph(state.G)
+        mask = relation_mask(_relations(params))
+        adjacency = []
+        if direction in ('dependencies', 'both'):
+            adjacency.append(cg.adjacency(mask))
+        if direction in ('dependents', 'both'):
+            adjacency.append(cg.adjacency(mask, reverse=True))
+
+        start = cg.index[name]
+        seen = {start}
+        frontier = [start]
+        found = []
+        for d in range(1, depth + 1):
+            level = []
+            for v in frontier:
+                for adj in adjacency:
+                    for w in adj[v]:
+                        if w not in seen:
+                            seen.add(w)
+                            level.append(w)
+                            found.append({'package': cg.nodes[w], 'depth': d})
+            frontier = level
+        return {'package': name, 'direction': direction, 'total': len(found), 'neighbors': found[:limit]}
+
+    def closure(self, state: GraphState, params, accept, name: str):
+        name = _resolve(state, name)
+        direction = _param(params, 'direction', 'dependencies')
+        if direction not in ('dependencies', 'dependents'):
+            raise HTTPError(400, "direction must be dependencies or dependents")
+        index = reachability_index(state.G, reverse=direction == 'dependents')
+        packages = index.common_reachable([name], _relations(params))
+        return {'package': name, 'direction': direction, 'total': len(packages), 'packages': packages}
+
+    def paths(self, state: GraphState, params, accept):
+        source = _resolve(state, _required(params, 'source'))
+        target = _resolve(state, _required(params, 'target'))
+        relations = _relations(params)
+        max_paths = _int(params, 'max_paths', 5, 1, 50)
+        deadline = time.monotonic() + PATH_TIME_BUDGET
+
+        def timed_out():
+            return time.monotonic() > deadline
+
+        paths = list(islice(iter_paths(
+            state.G, source, target,
+            max_length=_int(params, 'max_length', 5, 1, 8),
+            relation_types=relations,
+            should_stop=timed_out,
+        ), max_paths))
+        # fewer paths than asked for after the budget ran out: more may exist
+        truncated = len(paths) < max_paths and timed_out()
+        result = {
+            'source': source,
+            'target': target,
+            'truncated': truncated,
+            'paths': [
+                {'packages': path,
+                 'relations': [step['edge_type'] for step in get_path_details(state.G, path, relations)[:-1]]}
+                for path in paths
+            ],
+        }
+        return Response(json.dumps(result).encode(), cacheable=not truncated)
+
+    def metrics(self, state: GraphState, params, accept):
+        metric = _param(params, 'metric', 'pagerank')
+        if metric not in VARIANT_METRICS:
+            raise HTTPError(400, f"metric must be one of {', '.join(VARIANT_METRICS)}")
+        variants = state.variants()
+        relations = _relations(params)
+        if not variants.covers(relations):
+            raise HTTPError(404, "No stored metrics for these relation types; run a full build to store them")
+        vector = np.asarray(variants.for_relations(relations)[metric], dtype='<f8')
+        if accept == BINARY:
+            # aligned with /nodes
+            return Response(vector.tobytes(), BINARY)
+
+        limit = _int(params, 'limit', 20, 1, MAX_LIMIT)
+        top = np.argsort(-vector, kind='stable')[:limit]
+        return {
+            'metric': metric,
+            'results': [{'package': variants.nodes[i], 'value': float(vector[i])} for i in top.tolist()],
+        }
+
+
+def create_app(db_path: str = None) -> QueryAPI:
+    return QueryAPI(db_path)
+
+
+def _error(status: int, message: str) -> tuple[int, list, bytes]:
+    body = json.dumps({'error': message}).encode()
+    return status, [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())], body
+
+
+def _etags(header: str) -> set[str]:
+    # weak and strong tags compare equal for GET revalidation
+    return {tag.strip().removeprefix('W/') for tag in header.split(',') if tag.strip()}
+
+
+def _param(params: dict, name: str, default: str = None) -> str | None:
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _required(params: dict, name: str) -> str:
+    value = (_param(params, name) or '').strip()
+    if not value:
+        raise HTTPError(400, f"{name} is required")
+    return value
+
+
+def _int(params: dict, name: str, default: int, low: int, high: int | None) -> int:
+    raw = _param(params, name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+    if value < low or (high is not None and value > high):
+        raise HTTPError(400, f"{name} must be between {low} and {high if high is not None else 'any'}")
+    return value
+
+
+def _relations(params: dict) -> list[str] | None:
+    relations = params.get('relation')
+    if not relations:
+        return None
+    valid = {r.value for r in RelationType}
+    unknown = [r for r in relations if r not in valid]
+    if unknown:
+        raise HTTPError(400, f"Unknown relation type: {', '.join(unknown)}")
+    return relations
+
+
+def _resolve(state: GraphState, name: str) -> str:
+    """Package name as stored, accepting unnormalized names and aliases."""
+    if not name.strip():
+        raise HTTPError(400, "Package name is required")
+    if name in state.G:
+        return name
+    exact = state.search_index.exact.get(normalize_name(name))
+    if exact is not None:
+        return state.search_index.names[exact[0]]
+    suggestions = state.search_index.search(name, limit=5)
+    hint = f"; did you mean {', '.join(suggestions)}?" if suggestions else ""
+    raise HTTPError(404, f"Unknown package: {name}{hint}")
+
+
+def _summary(pkg) -> dict:
+    return {
+        'name': pkg.name,
+        'domain': pkg.domain,
+        'role': pkg.role,
+        'health_status': pkg.health_status,
+        'in_degree': pkg.in_degree,
+        'pagerank': pkg.pagerank,
+        'github_stars': pkg.github_stars,
+    }
+
+
+def _grouped(groups: dict, field: str) -> dict[str, list[dict]]:
+    return {
+        rel.value: [{'package': getattr(d, field), 'version': d.version_constraint} for d in deps]
+        for rel, deps in groups.items()
+    }
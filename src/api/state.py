@@ -0,0 +1,65 @@
+import threading
+
+import networkx as nx
+
+from ..storage import Database, DependencyIndex, PackageIndex
+from ..graph import build_graph, MetricVariants, restore_closures
+from ..ontology import SearchIndex
+
+
+def version_tag(version: tuple[int, int]) -> str:
+    """Short token for a data version, used in ETags."""
+    mtime, size = version
+    return f"{mtime:x}-{size:x}"
+
+
+class GraphState:
+    """Everything the API serves from, built once per database version."""
+
+    def __init__(self, db: Database, version: tuple[int, int]):
+        self.version = version
+        self.packages = db.get_all_packages()
+        self.deps = db.get_all_dependencies()
+        self.G = nx.freeze(build_graph(self.packages, self.deps))
+        restore_closures(self.G, *db.get_closures())
+        self.by_name = {p.name: p for p in self.packages}
+        self.package_index = PackageIndex(self.packages)
+        self.search_index = SearchIndex(self.packages)
+        self.dependency_index = DependencyIndex(self.deps)
+        self._db = db
+        self._variants = None
+        self._lock = threading.Lock()
+
+    def variants(self) -> MetricVariants:
+        """Per-relation metric vectors stored by the build; all-relations only if none were stored."""
+        with self._lock:
+            if self._variants is None:
+                names, vectors = self._db.get_metric_vectors()
+                nodes = list(self.G.nodes())
+                if names:
+                    self._variants = MetricVariants.from_storage(names, vectors).reindex(nodes)
+                else:
+                    self._variants = MetricVariants.from_node_attributes(self.G)
+            return self._variants
+
+
+class StateHolder:
+    """Current GraphState, rebuilt when the database file changes."""
+
+    def __init__(self, db_path: str = None):
+        self.db = Database(db_path)
+        self._state = None
+        self._lock = threading.Lock()
+
+    def version(self) -> tuple[int, int]:
+        return self.db.data_version()
+
+    def current(self) -> GraphState:
+        version = self.db.data_version()
+        state = self._state
+        if state is not None and state.version == version:
+            return state
+        with self._lock:
+            if self._state is None or self._state.version != version:
+                self._state = GraphState(self.db, version)
+            return self._state
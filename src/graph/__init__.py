@@ -1,3 +1,11 @@
 from .builder import build_graph, filter_graph, get_subgraph_around
+from .views import FacetIndex, FilteredView
+from .neighborhood import NeighborhoodIndex
 from .metrics import compute_metrics, update_package_metrics, find_hidden_pillars, get_graph_stats
-from .paths import find_shortest_path, find_all_paths, get_path_details
+from .betweenness import betweenness_centrality
+from .variants import MetricVariants, compute_metric_variants
+from .layout import compute_layout, place_new_nodes
+from .paths import find_shortest_path, find_all_paths, iter_paths, get_path_details, find_common_dependencies, find_common_dependents
+from .impact import Impact, blast_radius
+from .scc import Condensation, condense
+from .reachability import ReachabilityIndex, reachability_index, reachable, export_closures, restore_closures
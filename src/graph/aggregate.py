@@ -0,0 +1,134 @@
+from collections import Counter, defaultdict
+
+import networkx as nx
+
+from .scc import condense
+
+
+GROUPINGS = ('domain', 'community', 'scc')
+
+# label for groups merged when there are more groups than the budget allows
+OTHER = 'other'
+
+
+def group_labels(G: nx.MultiDiGraph, by: str = 'domain', seed: int = 0) -> dict[str, str]:
+    """Group label for every node: its domain, Louvain community or SCC."""
+    if by == 'domain':
+        return {n: d or 'unknown' for n, d in G.nodes(data='domain')}
+    if by == 'community':
+        communities = nx.community.louvain_communities(G.to_undirected(as_view=True), seed=seed)
+        labels = {}
+        for members in communities:
+            # name each community after its most depended-on member
+            hub = max(members, key=G.in_degree)
+            for n in members:
+                labels[n] = f"{hub} community"
+        return labels
+    if by == 'scc':
+        # cycles collapse into one group; acyclic packages are grouped by layer
+        cond = condense(G)
+        labels = {}
+        for n, c in zip(cond.nodes, cond.comp):
+            if cond.sizes[c] > 1:
+                labels[n] = f"cycle {c}"
+            else:
+                labels[n] = f"layer {cond.layers[c]}"
+        return labels
+    raise ValueError(f"Unknown grouping: {by}")
+
+
+def aggregate_graph(G: nx.MultiDiGraph, labels: dict[str, str], budget: int = 500,
+                    expanded: list[str] = None) -> nx.MultiDiGraph:
+    """Collapse G into super-nodes so that at most `budget` nodes remain.
+
+    Graphs within budget are returned unchanged. Otherwise each group
+    becomes one node (`is_group=True`, with member count, summed PageRank
+    and mean layout position), except groups listed in `expanded`, whose
+    highest-PageRank members are shown individually while the budget
+    allows. Edges are merged per (source, target, relation type) into one
+    edge carrying the collapsed edge count as `weight`.
+    """
+    if G.number_of_nodes() <= budget:
+        return G
+
+    members = defaultdict(list)
+    for n in G.nodes():
+        members[labels.get(n, OTHER)].append(n)
+
+    def pagerank(n):
+        return G.nodes[n].get('pagerank') or 0.0
+
+    # every expanded group needs at least one slot, and one is kept for the rest
+    expanded = [g for g in dict.fromkeys(expanded or []) if g in members and g != OTHER][:max(budget - 1, 0)]
+
+    # too many groups: keep the biggest, merge the rest
+    collapsed = [g for g in members if g not in expanded]
+    if len(collapsed) + len(expanded) > budget:
+        collapsed.sort(key=lambda g: len(members[g]), reverse=True)
+        for g in collapsed[max(budget - len(expanded) - 1, 0):]:
+            if g != OTHER:
+                members[OTHER].extend(members.pop(g))
+        collapsed = [g for g in members if g not in expanded]
+
+    # each expanded group has one slot of its own; the budget left over
+    # goes to extra members, highest PageRank first
+    room = max(budget - len(collapsed) - len(expanded), 0)
+    node_of = {}
+    shown = []
+    for g in expanded:
+        ranked = sorted(members[g], key=pagerank, reverse=True)
+        if len(ranked) <= room + 1:
+            take = ranked
+            room -= len(ranked) - 1
+        else:
+            take = ranked[:room]
+            room = 0
+        shown.extend(take)
+        for n in take:
+            node_of[n] = n
+        if len(take) < len(ranked):
+            # members that didn't fit stay behind in a remainder group
+            members[g] = ranked[len(take):]
+            collapsed.append(g)
+
+    A = nx.MultiDiGraph()
+    for n in shown:
+        A.add_node(n, **G.nodes[n])
+
+    for g in collapsed:
+        group_id = f"[{g}]"
+        group_members = [n for n in members[g] if n not in node_of]
+        for n in group_members:
+            node_of[n] = group_id
+        A.add_node(group_id, **_group_attrs(G, g, group_members))
+
+    weights = Counter()
+    for u, v, rel in G.edges(data='relation_type'):
+        gu, gv = node_of[u], node_of[v]
+        if gu != gv:
+            weights[(gu, gv, rel)] += 1
+    for (gu, gv, rel), weight in weights.items():
+        A.add_edge(gu, gv, relation_type=rel, weight=weight)
+
+    return A
+
+
+def _group_attrs(G: nx.MultiDiGraph, group: str, members: list[str]) -> dict:
+    data = [G.nodes[n] for n in members]
+    domain = Counter(d.get('domain') for d in data).most_common(1)[0][0] if data else None
+    positioned = [(d['layout_x'], d['layout_y']) for d in data if d.get('layout_x') is not None]
+    top = sorted(members, key=lambda n: G.nodes[n].get('pagerank') or 0.0, reverse=True)[:5]
+
+    attrs = {
+        'name': group,
+        'is_group': True,
+        'group': group,
+        'members': len(members),
+        'top_members': top,
+        'domain': domain,
+        'pagerank': sum(d.get('pagerank') or 0.0 for d in data),
+    }
+    if positioned:
+        attrs['layout_x'] = sum(x for x, _ in positioned) / len(positioned)
+        attrs['layout_y'] = sum(y for _, y in positioned) / len(positioned)
+    return attrs
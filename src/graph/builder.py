@@ -1,10 +1,20 @@
+import uuid
+
 import networkx as nx
+from ..instrumentation import count, instrumented
 from ..storage import Package, Dependency
+from .views import FacetIndex
+from .neighborhood import NeighborhoodIndex
 
 
+@instrumented('graph.build')
 def build_graph(packages: list[Package], dependencies: list[Dependency]) -> nx.MultiDiGraph:
-    """Build a NetworkX MultiDiGraph from packages and dependencies."""
-    G = nx.MultiDiGraph()
+    """Build a NetworkX MultiDiGraph from packages and dependencies.
+
+    `G.graph['version']` identifies this build, so results cached for it
+    are not reused for a graph built from a later database.
+    """
+    G = nx.MultiDiGraph(version=new_graph_version())
 
     # add all packages as nodes
     for pkg in packages:
@@ -26,45 +36,49 @@ def build_graph(packages: list[Package], dependencies: list[Dependency]) -> nx.M
             source_file=dep.source_file
         )
 
+    count('nodes', G.number_of_nodes())
+    count('edges_emitted', G.number_of_edges())
     return G
 
 
+def new_graph_version() -> str:
+    """Fresh token for a graph's contents; replace it whenever the graph is edited."""
+    return uuid.uuid4().hex
+
+
 def filter_graph(G: nx.MultiDiGraph,
                  domains: list[str] = None,
                  roles: list[str] = None,
                  relation_types: list[str] = None,
-                 min_in_degree: int = 0) -> nx.MultiDiGraph:
-    """Create a filtered subgraph."""
-    nodes_to_keep = set()
-
-    for node, data in G.nodes(data=True):
-        if domains and data.get('domain') not in domains:
-            continue
-        if roles and data.get('role') not in roles:
-            continue
-        if G.in_degree(node) < min_in_degree:
-            continue
-        nodes_to_keep.add(node)
-
-    subgraph = G.subgraph(nodes_to_keep).copy()
-
-    # filter edges by relation type
-    if relation_types:
-        edges_to_remove = []
-        for u, v, key, data in subgraph.edges(keys=True, data=True):
-            if data.get('relation_type') not in relation_types:
-                edges_to_remove.append((u, v, key))
-        for u, v, key in edges_to_remove:
-            subgraph.remove_edge(u, v, key)
-
-    return subgraph
-
-
-def get_subgraph_around(G: nx.MultiDiGraph, center: str, depth: int = 2) -> nx.MultiDiGraph:
-    """Get a subgraph centered around a specific node."""
+                 min_in_degree: int = 0,
+                 index: FacetIndex = None) -> nx.MultiDiGraph:
+    """Create a filtered subgraph.
+
+    Returns a read-only view over G; pass a prebuilt FacetIndex to avoid
+    rebuilding the facet masks on every call.
+    """
+    index = index or FacetIndex(G)
+    return index.view(domains, roles, relation_types, min_in_degree).graph()
+
+
+def get_subgraph_around(G: nx.MultiDiGraph, center: str, depth: int = 2,
+                        direction: str = 'both',
+                        index: NeighborhoodIndex = None) -> nx.MultiDiGraph:
+    """Get a subgraph view centered around a specific node.
+
+    `direction` is 'dependencies', 'dependents' or 'both'. With a prebuilt
+    NeighborhoodIndex built from G the neighbor set is a lookup instead of a
+    BFS. On a filtered view the index is ignored, since its hops may pass
+    through hidden nodes or relation types.
+    """
     if center not in G:
         return nx.MultiDiGraph()
 
+    if index is not None and depth <= index.max_depth and index.covers(G):
+        nodes = {center}
+        nodes.update(n for n in index.neighbors(center, depth, direction) if n in G)
+        return G.subgraph(nodes)
+
     nodes = {center}
     frontier = {center}
 
@@ -72,9 +86,11 @@ def get_subgraph_around(G: nx.MultiDiGraph, center: str, depth: int = 2) -> nx.M
         new_frontier = set()
         for node in frontier:
             # predecessors and successors
-            new_frontier.update(G.predecessors(node))
-            new_frontier.update(G.successors(node))
+            if direction in ('dependents', 'both'):
+                new_frontier.update(G.predecessors(node))
+            if direction in ('dependencies', 'both'):
+                new_frontier.update(G.successors(node))
         nodes.update(new_frontier)
         frontier = new_frontier
 
-    return G.subgraph(nodes).copy()
+    return G.subgraph(nodes)
@@ -0,0 +1,137 @@
+import hashlib
+import weakref
+from dataclasses import dataclass, field
+
+import networkx as nx
+import numpy as np
+
+from ..storage import RelationType
+
+
+# one bit per relation type so parallel edges collapse into a single mask
+RELATION_BITS = {rel.value: 1 << i for i, rel in enumerate(RelationType)}
+ALL_RELATIONS = sum(RELATION_BITS.values())
+
+
+def relation_mask(relation_types: list[str] | None) -> int:
+    """Convert a list of relation type values to a bitmask (None means all)."""
+    if relation_types is None:
+        return ALL_RELATIONS
+    mask = 0
+    for rel in relation_types:
+        mask |= RELATION_BITS.get(rel, 0)
+    return mask
+
+
+@dataclass(eq=False)
+class CompactGraph:
+    """Integer-indexed CSR adjacency for a dependency graph.
+
+    Parallel edges between the same pair are merged, with their relation
+    types OR-ed into a per-edge bitmask. Both directions are stored so
+    traversals over dependencies and dependents are equally cheap.
+    """
+    nodes: list[str]
+    index: dict[str, int]
+    out_ptr: np.ndarray
+    out_idx: np.ndarray
+    out_rel: np.ndarray
+    in_ptr: np.ndarray
+    in_idx: np.ndarray
+    in_rel: np.ndarray
+    _lists: dict = field(default_factory=dict, repr=False)
+    _fingerprint: str | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_graph(cls, G: nx.MultiDiGraph) -> 'CompactGraph':
+        nodes = list(G.nodes())
+        index = {n: i for i, n in enumerate(nodes)}
+        default_bit = RELATION_BITS[RelationType.REQUIRES_CORE.value]
+
+        pairs = {}
+        if G.is_multigraph():
+            edges = G.edges(data='relation_type')
+        else:
+            edges = ((u, v, d.get('relation_type')) for u, v, d in G.edges(data=True))
+        for u, v, rel in edges:
+            key = (index[u], index[v])
+            pairs[key] = pairs.get(key, 0) | RELATION_BITS.get(rel, default_bit)
+
+        if pairs:
+            src, dst = np.array(list(pairs.keys()), dtype=np.int32).T
+            rel = np.fromiter(pairs.values(), dtype=np.uint8, count=len(pairs))
+        else:
+            src = dst = np.zeros(0, dtype=np.int32)
+            rel = np.zeros(0, dtype=np.uint8)
+
+        out_ptr, out_idx, out_rel = _to_csr(len(nodes), src, dst, rel)
+        in_ptr, in_idx, in_rel = _to_csr(len(nodes), dst, src, rel)
+        return cls(nodes, index, out_ptr, out_idx, out_rel, in_ptr, in_idx, in_rel)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.out_idx)
+
+    def fingerprint(self) -> str:
+        """Digest of the node order and typed edges, computed once per compact graph."""
+        if self._fingerprint is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update('\0'.join(self.nodes).encode())
+            for array in (self.out_ptr, self.out_idx, self.out_rel):
+                h.update(array.tobytes())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    def masked(self, mask: int) -> 'CompactGraph':
+        """Return a copy keeping only edges with at least one relation in `mask`."""
+        if mask == ALL_RELATIONS:
+            return self
+        keep = (self.out_rel & mask) != 0
+        src = np.repeat(np.arange(len(self.nodes), dtype=np.int32), np.diff(self.out_ptr))[keep]
+        dst = self.out_idx[keep]
+        rel = self.out_rel[keep] & mask
+        out_ptr, out_idx, out_rel = _to_csr(len(self.nodes), src, dst, rel)
+        in_ptr, in_idx, in_rel = _to_csr(len(self.nodes), dst, src, rel)
+        return CompactGraph(self.nodes, self.index, out_ptr, out_idx, out_rel, in_ptr, in_idx, in_rel)
+
+    def adjacency_lists(self, reverse: bool = False) -> list[list[int]]:
+        """Plain Python adjacency lists, fastest for interpreted traversals."""
+        ptr, idx = (self.in_ptr, self.in_idx) if reverse else (self.out_ptr, self.out_idx)
+        flat = idx.tolist()
+        bounds = ptr.tolist()
+        return [flat[bounds[i]:bounds[i + 1]] for i in range(len(self.nodes))]
+
+    def adjacency(self, mask: int = ALL_RELATIONS, reverse: bool = False) -> list[list[int]]:
+        """Adjacency lists restricted to `mask`, memoized per (mask, direction)."""
+        key = (mask, reverse)
+        if key not in self._lists:
+            self._lists[key] = self.masked(mask).adjacency_lists(reverse)
+        return self._lists[key]
+
+
+_compact_cache = weakref.WeakKeyDictionary()
+
+
+def compact_graph(G: nx.MultiDiGraph) -> CompactGraph:
+    """CompactGraph for G, cached per graph object.
+
+    Frozen graphs and views are cached for their lifetime; mutable graphs are
+    rebuilt when their node or edge count changes.
+    """
+    signature = None if nx.is_frozen(G) else (G.number_of_nodes(), G.number_of_edges())
+    cached = _compact_cache.get(G)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    cg = CompactGraph.from_graph(G)
+    _compact_cache[G] = (signature, cg)
+    return cg
+
+
+def _to_csr(n: int, src: np.ndarray, dst: np.ndarray, rel: np.ndarray):
+    order = np.lexsort((dst, src))
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=ptr[1:])
+    return ptr, dst[order].astype(np.int32), rel[order]
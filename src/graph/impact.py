@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from typing import Iterator
+
+import networkx as nx
+
+from ..storage import RelationType
+from .compact import RELATION_BITS, compact_graph, relation_mask
+
+
+# most binding relation first, used to label hops backed by parallel edges
+_RELATION_ORDER = [(RELATION_BITS[rel.value], rel.value) for rel in RelationType]
+
+
+@dataclass
+class Impact:
+    """A package transitively affected by one of the seed packages."""
+    package: str
+    distance: int
+    source: str
+    path: list[str]
+    relations: list[str]
+
+    def to_dict(self) -> dict:
+        return {
+            'package': self.package,
+            'distance': self.distance,
+            'source': self.source,
+            'path': self.path,
+            'relations': self.relations,
+        }
+
+
+def blast_radius(G: nx.MultiDiGraph, packages: list[str],
+                 relation_types: list[str] = None,
+                 max_depth: int = None) -> Iterator[Impact]:
+    """Yield every package that transitively depends on any of `packages`.
+
+    Runs a single multi-source BFS over the dependents adjacency, so each
+    package is reached once at its minimal hop distance from the nearest
+    seed. Results are produced lazily in order of distance. `path` runs from
+    the affected package down to its seed, with one relation type per hop.
+    Unknown package names are ignored.
+    """
+    cg = compact_graph(G)
+    mask = relation_mask(relation_types)
+    ptr, idx, rel = cg.in_ptr.tolist(), cg.in_idx.tolist(), cg.in_rel.tolist()
+
+    seeds = [cg.index[p] for p in dict.fromkeys(packages) if p in cg.index]
+    parent = {s: -1 for s in seeds}
+    parent_rel = {}
+    origin = {s: s for s in seeds}
+
+    frontier = seeds
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        level = []
+        for v in frontier:
+            for k in range(ptr[v], ptr[v + 1]):
+                bits = rel[k] & mask
+                if not bits:
+                    continue
+                w = idx[k]
+                if w in parent:
+                    continue
+                parent[w] = v
+                parent_rel[w] = bits
+                origin[w] = origin[v]
+                level.append(w)
+                yield _impact(cg.nodes, w, depth, origin[w], parent, parent_rel)
+        frontier = level
+
+
+def _impact(nodes: list[str], w: int, depth: int, seed: int, parent: dict, parent_rel: dict) -> Impact:
+    path = [nodes[w]]
+    relations = []
+    v = w
+    while parent[v] != -1:
+        relations.append(_relation_label(parent_rel[v]))
+        v = parent[v]
+        path.append(nodes[v])
+    return Impact(nodes[w], depth, nodes[seed], path, relations)
+
+
+def _relation_label(bits: int) -> str:
+    for bit, name in _RELATION_ORDER:
+        if bits & bit:
+            return name
+    return RelationType.REQUIRES_CORE.value
@@ -0,0 +1,218 @@
+from dataclasses import dataclass, field
+from itertools import chain
+
+import networkx as nx
+
+from ..instrumentation import instrumented
+from ..storage import Package, Dependency
+from .metrics import update_package_metrics
+from .builder import new_graph_version
+
+
+@dataclass
+class EdgeDiff:
+    added: list[Dependency] = field(default_factory=list)
+    removed: list[Dependency] = field(default_factory=list)
+    # same (source, target, relation_type) but a different version or file
+    updated: list[Dependency] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.updated)
+
+
+def diff_dependencies(old: list[Dependency], new: list[Dependency]) -> EdgeDiff:
+    """Compare two dependency lists by (source, target, relation_type)."""
+    old_by_key = {(d.source, d.target, d.relation_type): d for d in old}
+    new_by_key = {(d.source, d.target, d.relation_type): d for d in new}
+
+    diff = EdgeDiff()
+    for key, dep in new_by_key.items():
+        prev = old_by_key.get(key)
+        if prev is None:
+            diff.added.append(dep)
+        elif (prev.version_constraint, prev.source_file) != (dep.version_constraint, dep.source_file):
+            diff.updated.append(dep)
+    diff.removed = [dep for key, dep in old_by_key.items() if key not in new_by_key]
+    return diff
+
+
+@instrumented('graph.incremental')
+def update_metrics_incremental(packages: list[Package],
+                               G: nx.MultiDiGraph,
+                               diff: EdgeDiff,
+                               alpha: float = 0.85,
+                               tol: float = 1e-10,
+                               renormalize_tol: float = 1e-3) -> list[Package]:
+    """Apply an edge diff to G and update only the metrics it affects.
+
+    Degrees are recomputed exactly for touched nodes. PageRank is corrected
+    by pushing the residual created by the changed out-links (Gauss-Southwell
+    style), so work is proportional to the perturbed region rather than the
+    graph. Betweenness is not recomputed; nodes that could lie on a shortest
+    path through a changed edge, or on one that a new edge bypasses (anything
+    between an ancestor of its source and a descendant of its target), are
+    flagged `betweenness_stale` until the next full build.
+    SCC ids, layers and cycle membership are also left for the full build.
+
+    Returns the packages whose stored values changed. Packages for nodes new
+    to the graph must be included in `packages`.
+    """
+    pkg_lookup = {p.name: p for p in packages}
+    n_old = G.number_of_nodes()
+
+    # current pagerank; nodes not yet in the graph start at zero
+    rank = {name: pkg.pagerank for name, pkg in pkg_lookup.items() if name in G}
+    endpoints = {d.source for d in diff.added} | {d.target for d in diff.added}
+    dangling_mass = 0.0
+    if any(node not in G for node in endpoints):
+        dangling_mass = sum(rank.get(n, 0.0) for n in G if G.out_degree(n) == 0)
+
+    sources = {d.source for d in diff.added} | {d.source for d in diff.removed}
+    old_succ = {u: set(G.successors(u)) if u in G else set() for u in sources}
+
+    new_nodes = _apply_diff(G, diff, pkg_lookup)
+    stale = _affected_region(G, [(d.source, d.target) for d in diff.added + diff.removed])
+
+    # residual r = b + alpha * M x - x restricted to the changed columns of M;
+    # uniform terms (teleport and dangling redistribution) only rescale the
+    # solution, so they are absorbed by the final normalization
+    residual = {}
+    base = ((1 - alpha) + alpha * dangling_mass) / max(n_old, 1)
+    for node in new_nodes:
+        residual[node] = residual.get(node, 0.0) + base
+        rank[node] = 0.0
+
+    for u in sources:
+        x_u = rank.get(u, 0.0)
+        if not x_u:
+            continue
+        before = old_succ[u]
+        after = set(G.successors(u))
+        for w in before:
+            residual[w] = residual.get(w, 0.0) - alpha * x_u / len(before)
+        for w in after:
+            residual[w] = residual.get(w, 0.0) + alpha * x_u / len(after)
+
+    changed = _push(G, rank, residual, alpha, tol)
+    changed |= sources | endpoints | {d.target for d in diff.removed} | stale
+
+    # only rewrite every row when the accumulated drift is noticeable
+    total = sum(rank.values())
+    if abs(total - 1.0) > renormalize_tol:
+        rank = {n: v / total for n, v in rank.items()}
+        changed = set(G.nodes())
+
+    metrics = {}
+    for name in changed:
+        pkg = pkg_lookup.get(name)
+        if pkg is None:
+            continue
+        metrics[name] = {
+            'in_degree': G.in_degree(name),
+            'out_degree': G.out_degree(name),
+            'pagerank': rank.get(name, pkg.pagerank),
+            'betweenness': pkg.betweenness,
+            'betweenness_stale': pkg.betweenness_stale or name in stale,
+        }
+
+    updated = [pkg_lookup[name] for name in metrics]
+    return update_package_metrics(updated, G, metrics=metrics)
+
+
+def _apply_diff(G: nx.MultiDiGraph, diff: EdgeDiff, pkg_lookup: dict[str, Package]) -> set[str]:
+    """Mutate G in place; returns nodes that were not in the graph before."""
+    new_nodes = set()
+    G.graph['version'] = new_graph_version()
+
+    for dep in diff.removed:
+        edges = G.get_edge_data(dep.source, dep.target) or {}
+        for key, data in list(edges.items()):
+            if data.get('relation_type') == dep.relation_type.value:
+                G.remove_edge(dep.source, dep.target, key)
+
+    for dep in diff.added + diff.updated:
+        for node in (dep.source, dep.target):
+            if node not in G:
+                pkg = pkg_lookup.get(node)
+                G.add_node(node, **(pkg.to_dict() if pkg else {'name': node}))
+                new_nodes.add(node)
+
+        edges = G.get_edge_data(dep.source, dep.target) or {}
+        for key, data in list(edges.items()):
+            if data.get('relation_type') == dep.relation_type.value:
+                G.remove_edge(dep.source, dep.target, key)
+        G.add_edge(
+            dep.source,
+            dep.target,
+            relation_type=dep.relation_type.value,
+            version_constraint=dep.version_constraint,
+            source_file=dep.source_file
+        )
+
+    return new_nodes
+
+
+def _push(G: nx.MultiDiGraph, rank: dict, residual: dict, alpha: float, tol: float) -> set[str]:
+    """Push residual mass along out-links until every entry is below tol.
+
+    Returns the nodes whose rank was modified.
+    """
+    queue = [n for n, r in residual.items() if abs(r) > tol]
+    queued = set(queue)
+    pushed = set()
+
+    while queue:
+        v = queue.pop()
+        queued.discard(v)
+        r = residual.pop(v, 0.0)
+        if abs(r) <= tol:
+            continue
+
+        rank[v] = rank.get(v, 0.0) + r
+        pushed.add(v)
+        succ = list(G.successors(v))
+        if not succ:
+            continue  # dangling mass is uniform, absorbed by normalization
+        share = alpha * r / len(succ)
+        for w in succ:
+            residual[w] = residual.get(w, 0.0) + share
+            if abs(residual[w]) > tol and w not in queued:
+                queue.append(w)
+                queued.add(w)
+
+    return pushed
+
+
+def _affected_region(G: nx.MultiDiGraph, edges: list[tuple[str, str]]) -> set[str]:
+    """Nodes whose betweenness may change when the edges source->target change.
+
+    A shortest path is affected if it runs between an ancestor of a source
+    and a descendant of a target, so that is every node reachable from the
+    ancestors that also reaches the descendants. Removed edges (already gone
+    from G) are followed too. All edges are handled by four traversals
+    together, which can only flag more nodes than doing them one by one.
+    """
+    succ, pred = {}, {}
+    for u, v in edges:
+        if u in G and v in G:
+            succ.setdefault(u, []).append(v)
+            pred.setdefault(v, []).append(u)
+    if not succ:
+        return set()
+
+    ancestors = _reach(set(succ), G.predecessors, pred)
+    descendants = _reach(set(pred), G.successors, succ)
+    return _reach(ancestors, G.successors, succ) & _reach(descendants, G.predecessors, pred)
+
+
+def _reach(start: set[str], neighbors, extra: dict[str, list[str]]) -> set[str]:
+    """`start` and every node reachable from it via `neighbors` or `extra`."""
+    seen = set(start)
+    stack = list(seen)
+    while stack:
+        node = stack.pop()
+        for other in chain(neighbors(node), extra.get(node, ())):
+            if other not in seen:
+                seen.add(other)
+                stack.append(other)
+    return seen
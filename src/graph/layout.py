@@ -0,0 +1,146 @@
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ..instrumentation import instrumented
+from .compact import compact_graph
+
+
+@instrumented('graph.layout')
+def compute_layout(G: nx.MultiDiGraph,
+                   iterations: int = 100,
+                   spectral_iterations: int = 200,
+                   negative_samples: int = 8,
+                   scale: float = None,
+                   seed: int = 0) -> dict[str, tuple[float, float]]:
+    """Global 2D layout for the whole graph, computed once at build time.
+
+    Starts from a spectral drawing (the two leading non-trivial eigenvectors
+    of the random-walk matrix, found by power iteration) and refines it with
+    a force-directed pass: springs along edges, and repulsion from a few
+    randomly sampled nodes per step instead of all pairs. Every step is a
+    sparse or vectorized operation, so cost is O((n * samples + m) * iterations).
+    Coordinates are in pixels around the origin, `scale` defaulting to 40 * sqrt(n).
+    """
+    cg = compact_graph(G)
+    n = len(cg)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {cg.nodes[0]: (0.0, 0.0)}
+
+    rng = np.random.default_rng(seed)
+    if scale is None:
+        scale = 40.0 * np.sqrt(n)
+
+    # undirected adjacency, merged relation types
+    src = np.repeat(np.arange(n), np.diff(cg.out_ptr))
+    dst = cg.out_idx.astype(np.int64)
+    A = csr_matrix((np.ones(len(src)), (src, dst)), shape=(n, n))
+    A = ((A + A.T) > 0).astype(np.float64)
+
+    pos = _spectral(A, spectral_iterations, rng)
+    pos = _refine(A, pos, iterations, negative_samples, rng)
+
+    pos -= pos.mean(axis=0)
+    extent = np.abs(pos).max() or 1.0
+    pos *= scale / extent
+    return {node: (float(x), float(y)) for node, (x, y) in zip(cg.nodes, pos.tolist())}
+
+
+def place_new_nodes(G: nx.MultiDiGraph, seed: int = 0) -> dict[str, tuple[float, float]]:
+    """Positions for nodes without a stored `layout_x`, keeping every other node where it is.
+
+    For incremental builds: a new node goes next to the mean position of its
+    already placed neighbours, in breadth-first order so chains of new nodes
+    follow each other out; nodes with no placed neighbour are scattered over
+    the current extent. Returns only the new positions.
+    """
+    pos = {n: (d['layout_x'], d['layout_y']) for n, d in G.nodes(data=True) if d.get('layout_x') is not None}
+    pending = [n for n in G if n not in pos]
+    if not pending:
+        return {}
+    if not pos:
+        return compute_layout(G, seed=seed)
+
+    rng = np.random.default_rng(seed)
+    coords = np.array(list(pos.values()))
+    extent = float(np.abs(coords).max()) or 40.0
+    # roughly one edge length at the scale compute_layout uses
+    offset = extent / np.sqrt(len(pos) + len(pending))
+
+    placed = {}
+    frontier = [n for n in pending if any(m in pos for m in nx.all_neighbors(G, n))]
+    queued = set(frontier)
+    while frontier:
+        node = frontier.pop(0)
+        near = [pos[m] for m in nx.all_neighbors(G, node) if m in pos]
+        x, y = np.mean(near, axis=0) + rng.normal(0.0, offset, 2)
+        pos[node] = placed[node] = (float(x), float(y))
+        for m in nx.all_neighbors(G, node):
+            if m not in pos and m not in queued:
+                frontier.append(m)
+                queued.add(m)
+
+    for node in pending:
+        if node not in placed:
+            x, y = rng.uniform(-extent, extent, 2)
+            placed[node] = (float(x), float(y))
+    return placed
+
+
+def _spectral(A: csr_matrix, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """Koren-style degree-normalized spectral drawing by power iteration."""
+    n = A.shape[0]
+    degree = np.asarray(A.sum(axis=1)).ravel() + 1.0  # self-loop keeps isolated nodes defined
+    walk = A.multiply(1.0 / degree[:, None]).tocsr()
+    self_weight = 1.0 / degree
+
+    x = rng.standard_normal((n, 2))
+    for _ in range(iterations):
+        # lazy walk (I + D^-1 A) / 2 keeps the iteration from oscillating
+        x = 0.5 * (x + walk @ x + self_weight[:, None] * x)
+        # D-orthogonalize against the trivial constant vector and each other
+        x -= (degree @ x) / degree.sum()
+        x[:, 0] /= np.sqrt(degree @ x[:, 0] ** 2) or 1.0
+        x[:, 1] -= (degree @ (x[:, 0] * x[:, 1])) * x[:, 0]
+        x[:, 1] /= np.sqrt(degree @ x[:, 1] ** 2) or 1.0
+
+    # disconnected components collapse onto a point; jitter them apart
+    x += rng.standard_normal((n, 2)) * 1e-3 * (np.abs(x).max() or 1.0)
+    return x
+
+
+def _refine(A: csr_matrix, pos: np.ndarray, iterations: int, samples: int,
+            rng: np.random.Generator, gravity: float = 3.0) -> np.ndarray:
+    n = A.shape[0]
+    pos = pos / (np.abs(pos).max() or 1.0)
+    degree = np.asarray(A.sum(axis=1)).ravel()
+    rows, cols = A.nonzero()
+    ideal = 1.0 / np.sqrt(n)
+
+    step = 0.1
+    for _ in range(iterations):
+        # attraction along edges (Fruchterman-Reingold: d^2 / k)
+        delta = pos[cols] - pos[rows]
+        dist = np.linalg.norm(delta, axis=1) + 1e-9
+        pull = delta * (dist / ideal)[:, None]
+        force = np.zeros_like(pos)
+        np.add.at(force, rows, pull)
+
+        # repulsion from a few random nodes, scaled up to stand in for all n (k^2 / d)
+        others = rng.integers(n, size=(n, samples))
+        delta = pos[:, None, :] - pos[others]
+        dist2 = (delta ** 2).sum(axis=2) + 1e-9
+        force += (delta * (ideal ** 2 / dist2)[:, :, None]).sum(axis=1) * (n / samples)
+
+        # degree-weighted gravity (as in ForceAtlas2) keeps hubs central and
+        # stops small components from drifting off
+        force -= pos * (1.0 + degree)[:, None] * gravity
+
+        length = np.linalg.norm(force, axis=1) + 1e-9
+        pos += force / length[:, None] * np.minimum(length, step)[:, None]
+        step *= 0.97
+
+    return pos
+
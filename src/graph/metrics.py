@@ -1,9 +1,24 @@
 import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from ..instrumentation import span, instrumented
 from ..storage import Package
+from .betweenness import betweenness_centrality
+from .compact import compact_graph
+from .scc import condense
+
 
+@instrumented('graph.metrics')
+def compute_metrics(G: nx.MultiDiGraph,
+                    betweenness_mode: str = 'exact',
+                    workers: int = None) -> dict[str, dict]:
+    """Compute all centrality metrics for the graph.
 
-def compute_metrics(G: nx.MultiDiGraph) -> dict[str, dict]:
-    """Compute all centrality metrics for the graph."""
+    Betweenness runs in parallel across `workers` processes (defaults to all
+    cores); pass betweenness_mode='adaptive' to sample sources instead.
+    """
     # convert to simple DiGraph for some algorithms
     simple = nx.DiGraph(G)
 
@@ -14,17 +29,18 @@ def compute_metrics(G: nx.MultiDiGraph) -> dict[str, dict]:
     out_deg = dict(G.out_degree())
 
     # pagerank
-    try:
-        pagerank = nx.pagerank(simple, alpha=0.85)
-    except nx.PowerIterationFailedConvergence:
-        pagerank = {n: 0.0 for n in G.nodes()}
-
-    # betweenness (can be slow on large graphs)
-    if len(G) < 1000:
-        betweenness = nx.betweenness_centrality(simple)
-    else:
-        # sample for large graphs
-        betweenness = nx.betweenness_centrality(simple, k=min(100, len(G)))
+    with span('graph.pagerank'):
+        try:
+            pagerank = nx.pagerank(simple, alpha=0.85)
+        except nx.PowerIterationFailedConvergence:
+            pagerank = {n: 0.0 for n in G.nodes()}
+
+    # betweenness (parallel Brandes, serial on small graphs)
+    with span('graph.betweenness'):
+        betweenness = betweenness_centrality(simple, mode=betweenness_mode, workers=workers)
+
+    # cycles and topological layers
+    structure = condense(G).node_structure()
 
     for node in G.nodes():
         metrics[node] = {
@@ -32,14 +48,21 @@ def compute_metrics(G: nx.MultiDiGraph) -> dict[str, dict]:
             'out_degree': out_deg.get(node, 0),
             'pagerank': pagerank.get(node, 0.0),
             'betweenness': betweenness.get(node, 0.0),
+            **structure[node],
         }
 
     return metrics
 
 
-def update_package_metrics(packages: list[Package], G: nx.MultiDiGraph) -> list[Package]:
-    """Update packages with computed graph metrics."""
-    metrics = compute_metrics(G)
+def update_package_metrics(packages: list[Package], G: nx.MultiDiGraph,
+                           metrics: dict[str, dict] = None) -> list[Package]:
+    """Update packages with computed graph metrics.
+
+    Pass `metrics` to apply values computed elsewhere (e.g. by the
+    incremental service) instead of recomputing them for the whole graph.
+    """
+    if metrics is None:
+        metrics = compute_metrics(G)
 
     for pkg in packages:
         if pkg.name in metrics:
@@ -48,56 +71,105 @@ def update_package_metrics(packages: list[Package], G: nx.MultiDiGraph) -> list[
             pkg.out_degree = m['out_degree']
             pkg.pagerank = m['pagerank']
             pkg.betweenness = m['betweenness']
+            pkg.betweenness_stale = m.get('betweenness_stale', False)
+            pkg.scc_id = m.get('scc_id', pkg.scc_id)
+            pkg.topo_layer = m.get('topo_layer', pkg.topo_layer)
+            pkg.in_cycle = m.get('in_cycle', pkg.in_cycle)
 
     return packages
 
 
-def find_hidden_pillars(G: nx.MultiDiGraph, top_n: int = 20) -> list[tuple[str, dict]]:
+# composite score: (pagerank * w + betweenness * w) * (1 - visibility * min(stars / star_cap, 1))
+PILLAR_WEIGHTS = {
+    'pagerank': 1000.0,
+    'betweenness': 100.0,
+    'visibility': 0.5,
+    'star_cap': 10000.0,
+}
+
+
+def find_hidden_pillars(G: nx.MultiDiGraph, top_n: int = 20,
+                        metrics: dict[str, dict] = None,
+                        weights: dict[str, float] = None) -> list[tuple[str, dict]]:
     """Find high-centrality packages that may be less visible.
 
     These are packages with high betweenness/pagerank but potentially
-    lower star counts - the "hidden pillars" of the ecosystem.
+    lower star counts - the "hidden pillars" of the ecosystem. Uses
+    `metrics` if given, otherwise the metric attributes already stored on
+    the graph's nodes; nothing is recomputed. `weights` overrides entries
+    of PILLAR_WEIGHTS.
     """
-    metrics = compute_metrics(G)
-
-    # rank by composite score
-    scored = []
-    for node, m in metrics.items():
-        data = G.nodes[node]
-        stars = data.get('github_stars') or 0
+    w = {**PILLAR_WEIGHTS, **(weights or {})}
 
-        # high centrality, lower visibility = hidden pillar
-        centrality_score = m['pagerank'] * 1000 + m['betweenness'] * 100
-        visibility_penalty = min(stars / 10000, 1.0)  # cap penalty
-        score = centrality_score * (1 - visibility_penalty * 0.5)
+    if metrics is None:
+        metrics = {
+            node: {key: data.get(key) or 0 for key in ('in_degree', 'out_degree', 'pagerank', 'betweenness')}
+            for node, data in G.nodes(data=True)
+        }
 
-        scored.append((node, {**m, 'score': score, 'stars': stars}))
+    nodes = list(metrics)
+    if not nodes or top_n <= 0:
+        return []
+
+    pagerank = np.fromiter((metrics[n]['pagerank'] for n in nodes), dtype=np.float64, count=len(nodes))
+    betweenness = np.fromiter((metrics[n]['betweenness'] for n in nodes), dtype=np.float64, count=len(nodes))
+    stars = np.fromiter(
+        ((G.nodes[n].get('github_stars') or 0) if n in G else 0 for n in nodes),
+        dtype=np.float64, count=len(nodes)
+    )
+
+    # high centrality, lower visibility = hidden pillar
+    centrality_score = pagerank * w['pagerank'] + betweenness * w['betweenness']
+    visibility_penalty = np.minimum(stars / w['star_cap'], 1.0)
+    scores = centrality_score * (1 - visibility_penalty * w['visibility'])
+
+    # partial selection, then sort only the winners
+    if top_n < len(nodes):
+        top = np.argpartition(-scores, top_n - 1)[:top_n]
+    else:
+        top = np.arange(len(nodes))
+    top = top[np.argsort(-scores[top], kind='stable')]
 
-    scored.sort(key=lambda x: x[1]['score'], reverse=True)
-    return scored[:top_n]
+    return [
+        (nodes[i], {**metrics[nodes[i]], 'score': float(scores[i]), 'stars': int(stars[i])})
+        for i in top.tolist()
+    ]
 
 
 def get_graph_stats(G: nx.MultiDiGraph) -> dict:
-    """Get overall graph statistics."""
-    simple = nx.DiGraph(G)
+    """Get overall graph statistics.
+
+    Works on the compact adjacency, so the graph is never copied.
+    """
+    cg = compact_graph(G)
+    n = len(cg)
 
     stats = {
         'num_nodes': G.number_of_nodes(),
         'num_edges': G.number_of_edges(),
-        'density': nx.density(simple),
-        'avg_in_degree': sum(dict(G.in_degree()).values()) / max(G.number_of_nodes(), 1),
-        'avg_out_degree': sum(dict(G.out_degree()).values()) / max(G.number_of_nodes(), 1),
+        'density': cg.num_edges / (n * (n - 1)) if n > 1 else 0,
+        'avg_in_degree': G.number_of_edges() / max(n, 1),
+        'avg_out_degree': G.number_of_edges() / max(n, 1),
     }
 
-    # connected components (treat as undirected)
-    undirected = G.to_undirected()
-    stats['num_components'] = nx.number_connected_components(undirected)
-
-    # largest component size
-    if stats['num_components'] > 0:
-        largest = max(nx.connected_components(undirected), key=len)
-        stats['largest_component_size'] = len(largest)
+    # weakly connected components in one C-level pass over the CSR arrays
+    if n:
+        adjacency = csr_matrix(
+            (np.ones(cg.num_edges, dtype=np.int8), cg.out_idx, cg.out_ptr), shape=(n, n)
+        )
+        num_components, labels = connected_components(adjacency, directed=True, connection='weak')
+        stats['num_components'] = num_components
+        stats['largest_component_size'] = int(np.bincount(labels).max())
     else:
+        stats['num_components'] = 0
         stats['largest_component_size'] = 0
 
+    # dependency cycles and layering
+    cond = condense(G)
+    cycles = cond.cycles()
+    stats['num_sccs'] = cond.num_comps
+    stats['num_cycles'] = len(cycles)
+    stats['largest_cycle_size'] = len(cycles[0]) if cycles else 0
+    stats['num_layers'] = max(cond.layers, default=-1) + 1
+
     return stats
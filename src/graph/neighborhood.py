@@ -0,0 +1,88 @@
+import weakref
+
+import networkx as nx
+import numpy as np
+
+from .compact import CompactGraph
+
+
+DIRECTIONS = ('dependencies', 'dependents', 'both')
+
+
+class NeighborhoodIndex:
+    """Capped 1..max_depth hop neighbor sets for every node and direction.
+
+    For each direction the neighbors of a node are stored in BFS order in one
+    flat int32 array, with per-depth end offsets, so a k-hop lookup is a
+    single slice. Hubs (more than `hub_degree` neighbors) are included but
+    not expanded further, and each node keeps at most `max_neighbors`,
+    preferring higher-degree nodes within a hop level.
+    """
+
+    def __init__(self, G: nx.MultiDiGraph, max_depth: int = 3,
+                 max_neighbors: int = 200, hub_degree: int = 100):
+        cg = CompactGraph.from_graph(G)
+        self._graph = weakref.ref(G)
+        self.version = G.graph.get('version')
+        self.nodes = cg.nodes
+        self.index = cg.index
+        self.max_depth = max_depth
+
+        succ = cg.adjacency_lists()
+        pred = cg.adjacency_lists(reverse=True)
+        both = [sorted(set(s) | set(p)) for s, p in zip(succ, pred)]
+        degree = [len(b) for b in both]
+
+        self._tables = {}
+        for direction, adj in zip(DIRECTIONS, (succ, pred, both)):
+            self._tables[direction] = _build_table(adj, degree, max_depth, max_neighbors, hub_degree)
+
+    def covers(self, G: nx.MultiDiGraph) -> bool:
+        """True if the index was built from G itself, not a filtered view of it."""
+        return self._graph() is G and G.graph.get('version') == self.version
+
+    def neighbors(self, node: str, depth: int = 1, direction: str = 'both') -> list[str]:
+        """Nodes within `depth` hops of `node` (excluding it), nearest first."""
+        i = self.index.get(node)
+        if i is None or depth < 1:
+            return []
+        ptr, ends, flat = self._tables[direction]
+        end = ends[i, min(depth, self.max_depth) - 1]
+        return [self.nodes[j] for j in flat[ptr[i]:end].tolist()]
+
+
+def _build_table(adj: list[list[int]], degree: list[int], max_depth: int,
+                 max_neighbors: int, hub_degree: int):
+    n = len(adj)
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    ends = np.zeros((n, max_depth), dtype=np.int64)
+    chunks = []
+    offset = 0
+
+    for i in range(n):
+        seen = {i}
+        frontier = [i]
+        found = []
+        for d in range(max_depth):
+            level = []
+            for v in frontier:
+                # don't fan out through hubs other than the center itself
+                if v != i and degree[v] > hub_degree:
+                    continue
+                for w in adj[v]:
+                    if w not in seen:
+                        seen.add(w)
+                        level.append(w)
+            room = max_neighbors - len(found)
+            if len(level) > room:
+                level.sort(key=lambda w: -degree[w])
+                level = level[:room]
+            found.extend(level)
+            ends[i, d] = offset + len(found)
+            frontier = level
+        chunks.append(found)
+        offset += len(found)
+        ptr[i + 1] = offset
+
+    flat = np.fromiter((w for chunk in chunks for w in chunk), dtype=np.int32, count=offset)
+    return ptr, ends, flat
@@ -1,5 +1,74 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Iterator
+
 import networkx as nx
 
+from .compact import compact_graph, relation_mask
+from .reachability import reachable, reachability_index
+
+
+# path steps (node references) held by the result cache across all entries
+PATH_CACHE_STEPS = 500_000
+
+
+class _ResultCache:
+    """Thread-safe LRU shared by all callers, bounded by total path steps held."""
+
+    def __init__(self, max_steps: int):
+        self.max_steps = max_steps
+        self._entries = OrderedDict()
+        self._steps = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, steps: int) -> None:
+        # every entry costs at least one step, so empty results are bounded too
+        steps = max(steps, 1)
+        if steps > self.max_steps:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._steps -= old[1]
+            self._entries[key] = (value, steps)
+            self._steps += steps
+            while self._steps > self.max_steps:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._steps -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._steps = 0
+
+
+_path_cache = _ResultCache(PATH_CACHE_STEPS)
+
+
+def _path_key(G: nx.MultiDiGraph, kind: str, *args) -> tuple | None:
+    """Cache key for a query on G, or None when G has no version to key on."""
+    version = G.graph.get('version')
+    if version is None:
+        return None
+    # views share their graph's attributes, including the version, so the
+    # key also carries a digest of the nodes and edges this graph shows
+    cg = compact_graph(G)
+    relation_types = args[-1]
+    return (version, cg.fingerprint(), kind) + args[:-1] + (relation_mask(relation_types),)
+
 
 def find_shortest_path(G: nx.MultiDiGraph, source: str, target: str) -> list[str] | None:
     """Find shortest path between two packages."""
@@ -12,20 +81,175 @@ def find_shortest_path(G: nx.MultiDiGraph, source: str, target: str) -> list[str
         return None
 
 
-def find_all_paths(G: nx.MultiDiGraph, source: str, target: str, max_length: int = 5) -> list[list[str]]:
-    """Find all paths up to a maximum length."""
-    if source not in G or target not in G:
-        return []
+def find_all_paths(G: nx.MultiDiGraph, source: str, target: str, max_length: int = 5,
+                   max_paths: int = None,
+                   relation_types: list[str] = None,
+                   time_budget: float = None,
+                   should_stop: Callable[[], bool] = None) -> list[list[str]]:
+    """Find simple paths up to a maximum length, shortest first.
+
+    Stops after `max_paths` paths or `time_budget` seconds, whichever comes
+    first, or as soon as `should_stop()` returns True.
+    """
+    paths = iter_paths(G, source, target, max_length, relation_types, time_budget, should_stop)
+    return list(islice(paths, max_paths))
+
 
+def iter_paths(G: nx.MultiDiGraph, source: str, target: str, max_length: int = 5,
+               relation_types: list[str] = None,
+               time_budget: float = None,
+               should_stop: Callable[[], bool] = None) -> Iterator[list[str]]:
+    """Lazily yield simple paths from source to target in order of length.
+
+    Uses Yen's k-shortest-paths algorithm with a bidirectional BFS for each
+    spur search, so only as many paths as the caller consumes are computed.
+    Only edges whose relation type is in `relation_types` are followed.
+    `should_stop` is polled between spur searches, like the time budget, so
+    a caller on another thread can cancel the search.
+
+    Paths found are remembered per graph version (see `build_graph`), so a
+    repeated query replays them at once and only searches past what is
+    already known.
+    """
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+    def stop():
+        return ((deadline is not None and time.monotonic() > deadline)
+                or (should_stop is not None and should_stop()))
+
+    key = _path_key(G, 'paths', source, target, max_length, relation_types)
+    known, complete = _path_cache.get(key) or ((), False)
+    for path in known:
+        yield list(path)
+    if complete:
+        return
+
+    found = list(known)
     try:
-        paths = list(nx.all_simple_paths(G, source, target, cutoff=max_length))
-        return sorted(paths, key=len)
-    except nx.NetworkXNoPath:
-        return []
+        # the search is deterministic, so its first paths are the known ones
+        for i, path in enumerate(_yen_paths(G, source, target, max_length, relation_types, stop)):
+            if i < len(known):
+                continue
+            found.append(tuple(path))
+            yield path
+        complete = not stop()
+    finally:
+        if key is not None and (len(found) > len(known) or complete):
+            _path_cache.put(key, (tuple(found), complete), sum(len(p) for p in found))
+
+
+def _yen_paths(G: nx.MultiDiGraph, source: str, target: str, max_length: int,
+               relation_types: list[str] | None, stop: Callable[[], bool]) -> Iterator[list[str]]:
+    if source not in G or target not in G or source == target:
+        return
+    # cheap index lookup rules out the hopeless searches up front
+    if not reachable(G, source, target, relation_types):
+        return
+
+    cg = compact_graph(G)
+    mask = relation_mask(relation_types)
+    succ = cg.adjacency(mask)
+    pred = cg.adjacency(mask, reverse=True)
+    s, t = cg.index[source], cg.index[target]
+
+    first = _bidirectional_bfs(succ, pred, s, t, set(), set(), max_length)
+    if first is None:
+        return
+    found = [first]
+    seen = {tuple(first)}
+    candidates = []
+    counter = 0
+    yield [cg.nodes[i] for i in first]
+
+    while True:
+        last = found[-1]
+        for i in range(len(last) - 1):
+            if stop():
+                return
+
+            root = last[:i + 1]
+            blocked_edges = {(p[i], p[i + 1]) for p in found if len(p) > i + 1 and p[:i + 1] == root}
+            blocked_nodes = set(root[:-1])
+            spur = _bidirectional_bfs(succ, pred, root[-1], t, blocked_nodes, blocked_edges, max_length - i)
+            if spur is None:
+                continue
+
+            path = root[:-1] + spur
+            key = tuple(path)
+            if key not in seen:
+                seen.add(key)
+                heapq.heappush(candidates, (len(path), counter, path))
+                counter += 1
+
+        if not candidates:
+            return
+        _, _, path = heapq.heappop(candidates)
+        found.append(path)
+        yield [cg.nodes[i] for i in path]
+
+
+def _bidirectional_bfs(succ: list[list[int]], pred: list[list[int]], s: int, t: int,
+                       blocked_nodes: set, blocked_edges: set, limit: int) -> list[int] | None:
+    """Shortest s->t path of at most `limit` edges avoiding the blocked nodes/edges."""
+    if limit < 1:
+        return None
+
+    fwd = {s: None}
+    bwd = {t: None}
+    f_front, b_front = [s], [t]
+    f_depth = b_depth = 0
 
+    # expand the smaller frontier one full level at a time
+    while f_front and b_front and f_depth + b_depth < limit:
+        if len(f_front) <= len(b_front):
+            next_front = []
+            for v in f_front:
+                for w in succ[v]:
+                    if w in fwd or w in blocked_nodes or (v, w) in blocked_edges:
+                        continue
+                    fwd[w] = v
+                    if w in bwd:
+                        return _join(fwd, bwd, w)
+                    next_front.append(w)
+            f_front = next_front
+            f_depth += 1
+        else:
+            next_front = []
+            for v in b_front:
+                for w in pred[v]:
+                    if w in bwd or w in blocked_nodes or (w, v) in blocked_edges:
+                        continue
+                    bwd[w] = v
+                    if w in fwd:
+                        return _join(fwd, bwd, w)
+                    next_front.append(w)
+            b_front = next_front
+            b_depth += 1
 
-def get_path_details(G: nx.MultiDiGraph, path: list[str]) -> list[dict]:
+    return None
+
+
+def _join(fwd: dict, bwd: dict, meet: int) -> list[int]:
+    path = []
+    node = meet
+    while node is not None:
+        path.append(node)
+        node = fwd[node]
+    path.reverse()
+    node = bwd[meet]
+    while node is not None:
+        path.append(node)
+        node = bwd[node]
+    return path
+
+
+def get_path_details(G: nx.MultiDiGraph, path: list[str], relation_types: list[str] = None) -> list[dict]:
     """Get detailed information about each step in a path."""
+    key = _path_key(G, 'details', tuple(path), relation_types)
+    cached = _path_cache.get(key)
+    if cached is not None:
+        return [dict(step) for step in cached]
+
     details = []
 
     for i, node in enumerate(path):
@@ -41,53 +265,56 @@ def get_path_details(G: nx.MultiDiGraph, path: list[str]) -> list[dict]:
             next_node = path[i + 1]
             edge_data = G.get_edge_data(node, next_node)
             if edge_data:
-                # get first edge (in case of multi-edges)
-                first_edge = list(edge_data.values())[0]
+                # get first edge (in case of multi-edges) matching the filter
+                edges = list(edge_data.values())
+                if relation_types:
+                    edges = [e for e in edges if e.get('relation_type') in relation_types] or edges
+                first_edge = edges[0]
                 step['edge_type'] = first_edge.get('relation_type')
                 step['version'] = first_edge.get('version_constraint')
 
         details.append(step)
 
+    if key is not None:
+        _path_cache.put(key, [dict(step) for step in details], len(details))
     return details
 
 
-def find_common_dependencies(G: nx.MultiDiGraph, packages: list[str]) -> list[str]:
-    """Find packages that all given packages depend on."""
-    if not packages:
-        return []
-
-    dep_sets = []
-    for pkg in packages:
-        if pkg in G:
-            deps = set(G.successors(pkg))
-            dep_sets.append(deps)
-
-    if not dep_sets:
-        return []
-
-    common = dep_sets[0]
-    for s in dep_sets[1:]:
-        common &= s
+def find_common_dependencies(G: nx.MultiDiGraph, packages: list[str],
+                             transitive: bool = False,
+                             relation_types: list[str] = None,
+                             should_stop: Callable[[], bool] = None) -> list[str]:
+    """Find packages that all given packages depend on.
 
-    return sorted(common)
+    With `transitive=True` indirect dependencies count too, answered by
+    intersecting precomputed closure bitsets. Building the closures for a
+    new relation selection polls `should_stop`, and gives [] if it fires.
+    """
+    return _common_neighbors(G, packages, transitive, relation_types, should_stop, reverse=False)
 
 
-def find_common_dependents(G: nx.MultiDiGraph, packages: list[str]) -> list[str]:
+def find_common_dependents(G: nx.MultiDiGraph, packages: list[str],
+                           transitive: bool = False,
+                           relation_types: list[str] = None,
+                           should_stop: Callable[[], bool] = None) -> list[str]:
     """Find packages that depend on all given packages."""
-    if not packages:
-        return []
+    return _common_neighbors(G, packages, transitive, relation_types, should_stop, reverse=True)
 
-    dependent_sets = []
-    for pkg in packages:
-        if pkg in G:
-            dependents = set(G.predecessors(pkg))
-            dependent_sets.append(dependents)
 
-    if not dependent_sets:
+def _common_neighbors(G: nx.MultiDiGraph, packages: list[str], transitive: bool,
+                      relation_types: list[str] | None, should_stop: Callable[[], bool] | None,
+                      reverse: bool) -> list[str]:
+    present = [p for p in packages if p in G]
+    if not present:
         return []
 
-    common = dependent_sets[0]
-    for s in dependent_sets[1:]:
-        common &= s
+    if transitive:
+        return reachability_index(G, reverse=reverse).common_reachable(present, relation_types, should_stop)
+
+    cg = compact_graph(G)
+    adj = cg.adjacency(relation_mask(relation_types), reverse=reverse)
+    common = set(adj[cg.index[present[0]]])
+    for pkg in present[1:]:
+        common &= set(adj[cg.index[pkg]])
 
-    return sorted(common)
+    return sorted(cg.nodes[i] for i in common)
@@ -0,0 +1,302 @@
+import random
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable
+
+import networkx as nx
+import numpy as np
+
+from .compact import ALL_RELATIONS, CompactGraph, compact_graph, relation_mask
+from .scc import strongly_connected_components, condensation
+
+
+# condensations up to this many components get a full transitive closure
+CLOSURE_LIMIT = 20000
+
+# random interval labelings used for larger graphs
+NUM_LABELINGS = 3
+
+# components processed between should_stop polls while building
+STOP_CHECK_INTERVAL = 1024
+
+# closure bytes one index (one direction) keeps across relation masks; the
+# least recently used masks are dropped beyond it (a full closure is ~50MB)
+CLOSURE_MEMORY = 128 * 2**20
+
+
+class ReachabilityIndex:
+    """Answers "does A transitively depend on B" without searching paths.
+
+    The graph is condensed into its strongly connected components. Small
+    condensations store a packed transitive-closure bitset per component
+    (O(1) queries); larger ones get GRAIL-style random interval labels that
+    reject unreachable pairs in O(1) and prune the DFS for the rest.
+    Indexes are built lazily per relation-type selection, or restored from
+    closures saved by the build, and at most `memory` bytes of them are
+    kept. With `reverse=True` the index follows dependents instead of dependencies.
+    """
+
+    def __init__(self, cg: CompactGraph, closure_limit: int = CLOSURE_LIMIT,
+                 num_labelings: int = NUM_LABELINGS, seed: int = 0, reverse: bool = False,
+                 memory: int = CLOSURE_MEMORY):
+        self.cg = cg
+        self.reverse = reverse
+        self.closure_limit = closure_limit
+        self.num_labelings = num_labelings
+        self.seed = seed
+        self.memory = memory
+        self._by_mask = OrderedDict()
+        self._lock = threading.Lock()
+
+    def reachable(self, src: str, dst: str, relation_types: list[str] = None) -> bool:
+        i = self.cg.index.get(src)
+        j = self.cg.index.get(dst)
+        if i is None or j is None:
+            return False
+        if i == j:
+            return True
+        return self.for_mask(relation_mask(relation_types)).reachable(i, j)
+
+    def common_reachable(self, names: list[str], relation_types: list[str] = None,
+                         should_stop: Callable[[], bool] = None) -> list[str]:
+        """Nodes reachable from every one of `names`, excluding the names themselves.
+
+        Intersects per-component closure bitsets, so the cost is linear in the
+        bitset width rather than in the size of each closure. If the index for
+        this selection has to be built and `should_stop` fires first, returns [].
+        """
+        idx = [self.cg.index[n] for n in names if n in self.cg.index]
+        if not idx:
+            return []
+        reach = self.for_mask(relation_mask(relation_types), should_stop)
+        if reach is None:
+            return []
+
+        common = reach.closure_row(idx[0]).copy()
+        for i in idx[1:]:
+            np.bitwise_and(common, reach.closure_row(i), out=common)
+
+        comps = np.unpackbits(common, bitorder='little', count=reach.num_comps).astype(bool)
+        keep = comps[reach.comp_array]
+        keep[idx] = False
+        return sorted(self.cg.nodes[i] for i in np.flatnonzero(keep))
+
+    def for_mask(self, mask: int, should_stop: Callable[[], bool] = None) -> '_MaskReachability | None':
+        """Index for one relation mask, building it if needed; None if `should_stop` ends the build."""
+        with self._lock:
+            reach = self._by_mask.get(mask)
+            if reach is not None:
+                self._by_mask.move_to_end(mask)
+                return reach
+        reach = _MaskReachability.build(
+            self.cg.adjacency(mask, self.reverse), self.closure_limit, self.num_labelings, self.seed,
+            should_stop
+        )
+        if reach is not None:
+            self._keep(mask, reach)
+        return reach
+
+    def restore(self, mask: int, comp: np.ndarray, closure: np.ndarray) -> None:
+        """Use a closure saved by the build (see export_closures) instead of computing it."""
+        self._keep(mask, _MaskReachability(comp.tolist(), None, closure))
+
+    def _keep(self, mask: int, reach: '_MaskReachability') -> None:
+        with self._lock:
+            self._by_mask[mask] = reach
+            self._by_mask.move_to_end(mask)
+            total = sum(r.nbytes for r in self._by_mask.values())
+            # the newest mask always stays, even if it alone is over budget
+            while total > self.memory and len(self._by_mask) > 1:
+                _, dropped = self._by_mask.popitem(last=False)
+                total -= dropped.nbytes
+
+
+class _MaskReachability:
+    def __init__(self, comp: list[int], children: list[list[int]] | None,
+                 closure: np.ndarray = None, labels: list = None):
+        self.comp = comp
+        self.num_comps = max(comp, default=-1) + 1
+        self.comp_array = np.array(comp, dtype=np.int64)
+        # only needed without a closure, so restored closures don't carry it
+        self.children = children
+        self.closure = closure
+        self.labels = labels
+
+    @classmethod
+    def build(cls, adj: list[list[int]], closure_limit: int, num_labelings: int, seed: int,
+              should_stop: Callable[[], bool] = None) -> '_MaskReachability | None':
+        comp, num_comps = strongly_connected_components(adj)
+        children = condensation(adj, comp, num_comps)
+        if num_comps <= closure_limit:
+            closure = _closure_bitsets(children, should_stop)
+            return cls(comp, children, closure=closure) if closure is not None else None
+        rng = random.Random(seed)
+        labels = []
+        for _ in range(num_labelings):
+            if should_stop is not None and should_stop():
+                return None
+            labels.append(_interval_labels(children, rng))
+        return cls(comp, children, labels=labels)
+
+    @property
+    def nbytes(self) -> int:
+        return self.comp_array.nbytes + (self.closure.nbytes if self.closure is not None else 0)
+
+    def reachable(self, i: int, j: int) -> bool:
+        cu, cv = self.comp[i], self.comp[j]
+        if cu == cv:
+            return True
+        # component ids are reverse-topological: descendants have lower ids
+        if cv > cu:
+            return False
+        if self.closure is not None:
+            return bool(self.closure[cu, cv >> 3] & (1 << (cv & 7)))
+
+        if not self._may_reach(cu, cv):
+            return False
+        stack = [cu]
+        seen = {cu}
+        while stack:
+            c = stack.pop()
+            for d in self.children[c]:
+                if d == cv:
+                    return True
+                if d not in seen and d > cv and self._may_reach(d, cv):
+                    seen.add(d)
+                    stack.append(d)
+        return False
+
+    def closure_row(self, i: int) -> np.ndarray:
+        """Packed bitset of components reachable from node i (including its own)."""
+        cu = self.comp[i]
+        if self.closure is not None:
+            return self.closure[cu]
+
+        # no precomputed closure on large graphs: walk the condensation once
+        seen = np.zeros(self.num_comps, dtype=bool)
+        seen[cu] = True
+        stack = [cu]
+        while stack:
+            c = stack.pop()
+            for d in self.children[c]:
+                if not seen[d]:
+                    seen[d] = True
+                    stack.append(d)
+        return np.packbits(seen, bitorder='little')
+
+    def _may_reach(self, cu: int, cv: int) -> bool:
+        for low, post in self.labels:
+            if low[cv] < low[cu] or post[cv] > post[cu]:
+                return False
+        return True
+
+
+def _closure_bitsets(children: list[list[int]], should_stop: Callable[[], bool] = None) -> np.ndarray | None:
+    """Row c has bit d set (little-endian within each byte) if c reaches d; None if stopped."""
+    num_comps = len(children)
+    bits = np.zeros((num_comps, (num_comps + 7) // 8), dtype=np.uint8)
+    # children always have lower ids, so ascending order sees them first
+    for c in range(num_comps):
+        if should_stop is not None and c % STOP_CHECK_INTERVAL == 0 and should_stop():
+            return None
+        row = bits[c]
+        row[c >> 3] |= np.uint8(1 << (c & 7))
+        for d in children[c]:
+            np.bitwise_or(row, bits[d], out=row)
+    return bits
+
+
+def _interval_labels(children: list[list[int]], rng: random.Random) -> tuple[list[int], list[int]]:
+    """One GRAIL labeling: randomized DFS post-order rank and subtree minimum.
+
+    If c reaches d then low[c] <= low[d] and post[d] <= post[c], so a pair
+    failing either test is certainly unreachable.
+    """
+    num_comps = len(children)
+    has_parent = [False] * num_comps
+    for kids in children:
+        for d in kids:
+            has_parent[d] = True
+    roots = [c for c in range(num_comps) if not has_parent[c]]
+    rng.shuffle(roots)
+
+    post = [-1] * num_comps
+    low = [0] * num_comps
+    visited = [False] * num_comps
+    rank = 0
+
+    for root in roots:
+        visited[root] = True
+        order = children[root][:]
+        rng.shuffle(order)
+        work = [(root, order, 0)]
+        while work:
+            c, kids, i = work[-1]
+            if i < len(kids):
+                work[-1] = (c, kids, i + 1)
+                d = kids[i]
+                if not visited[d]:
+                    visited[d] = True
+                    order = children[d][:]
+                    rng.shuffle(order)
+                    work.append((d, order, 0))
+                continue
+            work.pop()
+            post[c] = rank
+            low[c] = min([rank] + [low[d] for d in kids])
+            rank += 1
+
+    return low, post
+
+
+_index_cache = weakref.WeakKeyDictionary()
+
+
+def reachability_index(G: nx.MultiDiGraph, reverse: bool = False) -> ReachabilityIndex:
+    """ReachabilityIndex for G, cached alongside its compact form."""
+    cg = compact_graph(G)
+    indexes = _index_cache.setdefault(cg, {})
+    if reverse not in indexes:
+        indexes[reverse] = ReachabilityIndex(cg, reverse=reverse)
+    return indexes[reverse]
+
+
+def export_closures(G: nx.MultiDiGraph, masks: tuple[int, ...] = (ALL_RELATIONS,)) -> tuple[list[str], dict]:
+    """Closures for `masks` in both directions, for the build to store.
+
+    Returns the node order and {(mask, reverse): (component per node, closure bitsets)};
+    masks too large for a full closure are left out.
+    """
+    cg = compact_graph(G)
+    closures = {}
+    for reverse in (False, True):
+        index = reachability_index(G, reverse=reverse)
+        for mask in masks:
+            reach = index.for_mask(mask)
+            if reach.closure is not None:
+                closures[(mask, reverse)] = (reach.comp_array.astype(np.int32), reach.closure)
+    return list(cg.nodes), closures
+
+
+def restore_closures(G: nx.MultiDiGraph, names: list[str], closures: dict) -> bool:
+    """Seed G's reachability indexes with closures stored for the same node set.
+
+    Returns False, restoring nothing, when the stored nodes don't match G.
+    """
+    cg = compact_graph(G)
+    if not closures or len(names) != len(cg) or set(names) != set(cg.index):
+        return False
+    position = {name: i for i, name in enumerate(names)}
+    order = np.fromiter((position[n] for n in cg.nodes), dtype=np.int64, count=len(cg))
+    for (mask, reverse), (comp, closure) in closures.items():
+        # stored as raw buffers: int32 components and one packed row per component
+        comp = np.frombuffer(comp, dtype=np.int32)
+        bits = np.frombuffer(closure, dtype=np.uint8).reshape(int(comp.max()) + 1, -1)
+        reachability_index(G, reverse=reverse).restore(mask, comp[order], bits)
+    return True
+
+
+def reachable(G: nx.MultiDiGraph, src: str, dst: str, relation_types: list[str] = None) -> bool:
+    """True if src transitively depends on dst via the given relation types."""
+    return reachability_index(G).reachable(src, dst, relation_types)
@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+
+import networkx as nx
+
+from ..instrumentation import instrumented
+from .compact import compact_graph, relation_mask
+
+
+def strongly_connected_components(adj: list[list[int]]) -> tuple[list[int], int]:
+    """Tarjan's algorithm over integer adjacency lists, without recursion.
+
+    Returns (component id per node, number of components). Components are
+    numbered in the order Tarjan completes them, which is a reverse
+    topological order of the condensation: every edge between two
+    components goes from a higher id to a lower one.
+    """
+    n = len(adj)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    comp = [-1] * n
+    stack = []
+    counter = 0
+    num_comps = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+
+        while work:
+            v, i = work[-1]
+            neighbors = adj[v]
+            if i < len(neighbors):
+                work[-1] = (v, i + 1)
+                w = neighbors[i]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, 0))
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    comp[w] = num_comps
+                    if w == v:
+                        break
+                num_comps += 1
+
+    return comp, num_comps
+
+
+def condensation(adj: list[list[int]], comp: list[int], num_comps: int) -> list[list[int]]:
+    """Distinct child components of each component (the condensation DAG)."""
+    children = [set() for _ in range(num_comps)]
+    for v, neighbors in enumerate(adj):
+        cv = comp[v]
+        for w in neighbors:
+            cw = comp[w]
+            if cw != cv:
+                children[cv].add(cw)
+    return [sorted(c) for c in children]
+
+
+def topological_layers(children: list[list[int]]) -> list[int]:
+    """Longest dependency chain below each component (0 = depends on nothing)."""
+    layers = [0] * len(children)
+    # children have lower ids, so they are final before their parents
+    for c, kids in enumerate(children):
+        if kids:
+            layers[c] = 1 + max(layers[d] for d in kids)
+    return layers
+
+
+@dataclass
+class Condensation:
+    """SCC condensation of a dependency graph with topological layering."""
+    nodes: list[str]
+    comp: list[int]
+    children: list[list[int]]
+    layers: list[int]
+    sizes: list[int]
+
+    @property
+    def num_comps(self) -> int:
+        return len(self.children)
+
+    def cycles(self) -> list[list[str]]:
+        """Members of every strongly connected component with more than one package."""
+        members = {}
+        for i, c in enumerate(self.comp):
+            if self.sizes[c] > 1:
+                members.setdefault(c, []).append(self.nodes[i])
+        return sorted((sorted(m) for m in members.values()), key=len, reverse=True)
+
+    def node_structure(self) -> dict[str, dict]:
+        """Per-package component id, layer and cycle membership."""
+        return {
+            node: {
+                'scc_id': c,
+                'topo_layer': self.layers[c],
+                'in_cycle': self.sizes[c] > 1,
+            }
+            for node, c in zip(self.nodes, self.comp)
+        }
+
+
+@instrumented('graph.condense')
+def condense(G: nx.MultiDiGraph, relation_types: list[str] = None) -> Condensation:
+    """Run Tarjan over G's compact adjacency and build the condensation DAG."""
+    cg = compact_graph(G)
+    adj = cg.adjacency(relation_mask(relation_types))
+    comp, num_comps = strongly_connected_components(adj)
+    children = condensation(adj, comp, num_comps)
+
+    sizes = [0] * num_comps
+    for c in comp:
+        sizes[c] += 1
+
+    return Condensation(cg.nodes, comp, children, topological_layers(children), sizes)
@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ..instrumentation import count, span, instrumented
+from ..storage import RelationType
+from .betweenness import betweenness_centrality
+from .compact import RELATION_BITS, ALL_RELATIONS, compact_graph, relation_mask
+
+
+VARIANT_METRICS = ('in_degree', 'pagerank', 'betweenness')
+
+# every non-empty combination of relation types
+RELATION_MASKS = tuple(range(1, ALL_RELATIONS + 1))
+
+
+@dataclass
+class MetricVariants:
+    """Metric vectors per relation-type mask, aligned with `nodes`."""
+    nodes: list[str]
+    vectors: dict[tuple[int, str], np.ndarray]
+
+    def for_relations(self, relation_types: list[str] = None) -> dict[str, np.ndarray]:
+        """Vectors for the graph restricted to `relation_types` (empty or None means all)."""
+        mask = _mask(relation_types)
+        return {metric: self.vectors[(mask, metric)] for metric in VARIANT_METRICS}
+
+    def covers(self, relation_types: list[str] = None) -> bool:
+        """True if vectors for this relation-type selection are available."""
+        mask = _mask(relation_types)
+        return all((mask, metric) in self.vectors for metric in VARIANT_METRICS)
+
+    def node_metrics(self, relation_types: list[str] = None, nodes=None) -> dict[str, dict]:
+        """Per-node metric dicts for the selection (all nodes by default), e.g. for tooltips."""
+        selected = self.for_relations(relation_types)
+        lookup = {node: i for i, node in enumerate(self.nodes)}
+        rows = (lookup[n] for n in (self.nodes if nodes is None else nodes) if n in lookup)
+        return {
+            self.nodes[i]: {metric: float(vec[i]) for metric, vec in selected.items()}
+            for i in rows
+        }
+
+    def reindex(self, nodes: list[str]) -> 'MetricVariants':
+        """Realign every vector to `nodes`; nodes without stored values get zeros."""
+        lookup = {node: i for i, node in enumerate(self.nodes)}
+        rows = np.array([lookup.get(n, -1) for n in nodes], dtype=np.int64)
+        present = rows >= 0
+        vectors = {}
+        for key, vec in self.vectors.items():
+            aligned = np.zeros(len(nodes))
+            aligned[present] = vec[rows[present]]
+            vectors[key] = aligned
+        return MetricVariants(list(nodes), vectors)
+
+    @classmethod
+    def from_node_attributes(cls, G: nx.MultiDiGraph) -> 'MetricVariants':
+        """All-relations vectors only, from the metrics stored on G's nodes.
+
+        Used when a database has no stored variants, instead of computing
+        them on a request; `covers` reports the other selections as missing.
+        """
+        nodes = list(G.nodes())
+        vectors = {
+            (ALL_RELATIONS, metric): np.array([G.nodes[n].get(metric) or 0.0 for n in nodes], dtype=np.float64)
+            for metric in VARIANT_METRICS
+        }
+        return cls(nodes, vectors)
+
+    @classmethod
+    def from_storage(cls, names: list[str], vectors: dict) -> 'MetricVariants':
+        """Wrap vectors loaded by Database.get_metric_vectors without copying."""
+        return cls(names, {key: np.frombuffer(vec, dtype=np.float64) for key, vec in vectors.items()})
+
+
+@instrumented('graph.metric_variants')
+def compute_metric_variants(G: nx.MultiDiGraph,
+                            metrics: dict[str, dict] = None,
+                            betweenness_mode: str = 'adaptive',
+                            workers: int = None,
+                            alpha: float = 0.85,
+                            tol: float = 1e-6,
+                            max_iter: int = 100,
+                            seed: int = 0) -> MetricVariants:
+    """Compute in-degree, PageRank and betweenness for every relation-type mask.
+
+    In-degrees for all masks come from one matrix product of per-relation
+    edge counts. PageRank for all masks runs as a single power iteration over
+    a block-diagonal matrix with one block per mask. Betweenness reuses the
+    parallel Brandes engine on each masked compact graph, sampling sources
+    ('adaptive') by default since these vectors only drive filtered views.
+
+    With `metrics` from compute_metrics, the all-relations PageRank and
+    betweenness are taken from it instead of being computed a second time.
+    """
+    cg = compact_graph(G)
+    n = len(cg)
+    masks = np.array(RELATION_MASKS, dtype=np.int64)
+    # masks whose PageRank and betweenness are computed here
+    computed = [mask for mask in RELATION_MASKS if metrics is None or mask != ALL_RELATIONS]
+    bits = [RELATION_BITS[rel.value] for rel in RelationType]
+    vectors = {}
+
+    # in-degree counts parallel edges, like G.in_degree()
+    default_bit = RELATION_BITS[RelationType.REQUIRES_CORE.value]
+    per_relation = np.zeros((len(bits), n), dtype=np.int64)
+    row = {bit: i for i, bit in enumerate(bits)}
+    for _, v, rel in G.edges(data='relation_type'):
+        per_relation[row[RELATION_BITS.get(rel, default_bit)], cg.index[v]] += 1
+    selects = ((masks[:, None] & np.array(bits)[None, :]) != 0).astype(np.int64)
+    in_degrees = selects @ per_relation
+
+    for k, mask in enumerate(RELATION_MASKS):
+        vectors[(mask, 'in_degree')] = in_degrees[k].astype(np.float64)
+
+    if metrics is not None:
+        for metric in ('pagerank', 'betweenness'):
+            vectors[(ALL_RELATIONS, metric)] = np.fromiter(
+                ((metrics[node][metric] if node in metrics else 0.0) for node in cg.nodes),
+                dtype=np.float64, count=n
+            )
+
+    with span('graph.pagerank'):
+        pageranks = _stacked_pagerank(cg, np.array(computed, dtype=np.int64), alpha, tol, max_iter)
+
+    for k, mask in enumerate(computed):
+        vectors[(mask, 'pagerank')] = pageranks[k]
+        with span('graph.betweenness'):
+            betweenness = betweenness_centrality(cg.masked(mask), mode=betweenness_mode,
+                                                 workers=workers, seed=seed)
+        vectors[(mask, 'betweenness')] = np.fromiter(betweenness.values(), dtype=np.float64, count=n)
+
+    count('variants', len(computed))
+    return MetricVariants(cg.nodes, vectors)
+
+
+def _mask(relation_types: list[str] | None) -> int:
+    # an empty selection means every relation type
+    return relation_mask(relation_types or None) or ALL_RELATIONS
+
+
+def _stacked_pagerank(cg, masks: np.ndarray, alpha: float, tol: float, max_iter: int) -> np.ndarray:
+    """PageRank for each mask at once; matches nx.pagerank on each masked DiGraph.
+
+    Blocks that fail to converge are returned as zeros, like compute_metrics.
+    """
+    n = len(cg)
+    b = len(masks)
+    if n == 0:
+        return np.zeros((b, 0))
+
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(cg.out_ptr))
+    dst = cg.out_idx.astype(np.int64)
+    keep = (cg.out_rel[None, :].astype(np.int64) & masks[:, None]) != 0
+    block, edge = np.nonzero(keep)
+
+    offset = block * n
+    out_deg = np.zeros(b * n)
+    np.add.at(out_deg, offset + src[edge], 1)
+    weights = 1.0 / out_deg[offset + src[edge]]
+    P = csr_matrix((weights, (offset + dst[edge], offset + src[edge])), shape=(b * n, b * n))
+    dangling = (out_deg == 0).reshape(b, n)
+
+    x = np.full((b, n), 1.0 / n)
+    converged = np.zeros(b, dtype=bool)
+    for _ in range(max_iter):
+        last = x
+        spread = (x * dangling).sum(axis=1, keepdims=True) / n
+        x = alpha * ((P @ last.ravel()).reshape(b, n) + spread) + (1 - alpha) / n
+        # blocks stop moving once they converge, as a separate run would
+        x[converged] = last[converged]
+        converged |= np.abs(x - last).sum(axis=1) < n * tol
+        if converged.all():
+            break
+
+    x[~converged] = 0.0
+    return x
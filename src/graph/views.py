@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+
+import networkx as nx
+import numpy as np
+
+from ..storage import RelationType
+from .compact import RELATION_BITS, ALL_RELATIONS, relation_mask
+
+
+FACETS = ('domain', 'role', 'health_status')
+
+
+class FacetIndex:
+    """Precomputed node masks per facet value and relation bits per edge.
+
+    Built once per graph; filter selections are then combined with
+    vectorized boolean ops instead of walking and copying the graph.
+    """
+
+    def __init__(self, G: nx.MultiDiGraph):
+        self.G = G
+        self.nodes = list(G.nodes())
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        n = len(self.nodes)
+
+        self.masks = {}
+        for facet in FACETS:
+            values = np.array([G.nodes[node].get(facet) for node in self.nodes], dtype=object)
+            self.masks[facet] = {value: values == value for value in set(values.tolist())}
+
+        self.in_degree = np.fromiter((d for _, d in G.in_degree(self.nodes)), dtype=np.int64, count=n)
+
+        default_bit = RELATION_BITS[RelationType.REQUIRES_CORE.value]
+        m = G.number_of_edges()
+        edges = G.edges(data='relation_type')
+        self.edge_src = np.empty(m, dtype=np.int32)
+        self.edge_dst = np.empty(m, dtype=np.int32)
+        self.edge_rel = np.empty(m, dtype=np.uint8)
+        for i, (u, v, rel) in enumerate(edges):
+            self.edge_src[i] = self.index[u]
+            self.edge_dst[i] = self.index[v]
+            self.edge_rel[i] = RELATION_BITS.get(rel, default_bit)
+
+    def node_mask(self,
+                  domains: list[str] = None,
+                  roles: list[str] = None,
+                  health: list[str] = None,
+                  min_in_degree: int = 0,
+                  in_degree: np.ndarray = None) -> np.ndarray:
+        """Boolean mask of nodes matching every selected facet (empty means any)."""
+        keep = np.ones(len(self.nodes), dtype=bool)
+        for facet, selected in (('domain', domains), ('role', roles), ('health_status', health)):
+            if selected:
+                keep &= self._any_of(facet, selected)
+        if min_in_degree:
+            degrees = self.in_degree if in_degree is None else in_degree
+            keep &= degrees >= min_in_degree
+        return keep
+
+    def view(self,
+             domains: list[str] = None,
+             roles: list[str] = None,
+             relation_types: list[str] = None,
+             min_in_degree: int = 0,
+             health: list[str] = None,
+             in_degree: np.ndarray = None) -> 'FilteredView':
+        mask = self.node_mask(domains, roles, health, min_in_degree, in_degree)
+        rel_mask = relation_mask(relation_types) if relation_types else ALL_RELATIONS
+        return FilteredView(self, mask, rel_mask)
+
+    def _any_of(self, facet: str, values: list[str]) -> np.ndarray:
+        selected = np.zeros(len(self.nodes), dtype=bool)
+        for value in values:
+            mask = self.masks[facet].get(value)
+            if mask is not None:
+                selected |= mask
+        return selected
+
+
+@dataclass
+class FilteredView:
+    """A filter selection over a FacetIndex; no graph is allocated until asked."""
+    index: FacetIndex
+    node_mask: np.ndarray
+    relation_mask: int
+
+    def number_of_nodes(self) -> int:
+        return int(np.count_nonzero(self.node_mask))
+
+    def number_of_edges(self) -> int:
+        idx = self.index
+        keep = self.node_mask[idx.edge_src] & self.node_mask[idx.edge_dst]
+        if self.relation_mask != ALL_RELATIONS:
+            keep &= (idx.edge_rel & self.relation_mask) != 0
+        return int(np.count_nonzero(keep))
+
+    def nodes(self) -> list[str]:
+        return [self.index.nodes[i] for i in np.flatnonzero(self.node_mask)]
+
+    def __contains__(self, node: str) -> bool:
+        i = self.index.index.get(node)
+        return i is not None and bool(self.node_mask[i])
+
+    def graph(self) -> nx.MultiDiGraph:
+        """Read-only NetworkX view over the original graph (zero-copy)."""
+        G = self.index.G
+        lookup = self.index.index
+        keep = self.node_mask
+        mask = self.relation_mask
+        default_bit = RELATION_BITS[RelationType.REQUIRES_CORE.value]
+
+        def filter_node(n):
+            return bool(keep[lookup[n]])
+
+        def filter_edge(u, v, k):
+            rel = G[u][v][k].get('relation_type')
+            return bool(RELATION_BITS.get(rel, default_bit) & mask)
+
+        if mask == ALL_RELATIONS:
+            return nx.subgraph_view(G, filter_node=filter_node)
+        return nx.subgraph_view(G, filter_node=filter_node, filter_edge=filter_edge)
+
+    def materialize(self) -> nx.MultiDiGraph:
+        """Independent copy of the filtered graph, for callers that mutate it."""
+        return self.graph().copy()
@@ -0,0 +1,205 @@
+import cProfile
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+
+
+@dataclass
+class SpanStats:
+    """Merged timings of every call to one span under one parent."""
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    # highest traced memory while any call was open, in bytes
+    peak_bytes: int = 0
+    counters: dict[str, int] = field(default_factory=dict)
+    children: dict[str, 'SpanStats'] = field(default_factory=dict)
+
+    def to_dict(self, memory: bool) -> dict:
+        d = {'name': self.name, 'calls': self.calls, 'seconds': round(self.seconds, 4)}
+        if memory:
+            d['peak_mb'] = round(self.peak_bytes / 2**20, 2)
+        if self.counters:
+            d['counters'] = dict(self.counters)
+        if self.children:
+            d['children'] = [c.to_dict(memory) for c in self.children.values()]
+        return d
+
+
+class Run:
+    """Span tree and counter totals for one instrumented run.
+
+    Spans nest per thread, and repeated spans with the same name under the
+    same parent are merged, so the report stays small however often a stage runs.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.owns_tracing = False
+        self.root = SpanStats('run', calls=1)
+        self.counters: dict[str, int] = {}
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stack(self) -> list[SpanStats]:
+        """Open spans of the calling thread, outermost (the run) first."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = [self.root]
+        return stack
+
+    def note_peak(self, stack: list[SpanStats]) -> None:
+        """Credit the peak since the last span boundary to every open span."""
+        _, peak = tracemalloc.get_traced_memory()
+        for stats in stack:
+            if peak > stats.peak_bytes:
+                stats.peak_bytes = peak
+        tracemalloc.reset_peak()
+
+    def count(self, name: str, n: int) -> None:
+        stats = self.stack()[-1]
+        with self._lock:
+            stats.counters[name] = stats.counters.get(name, 0) + n
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> dict:
+        self.root.seconds = time.perf_counter() - self._start
+        if self.trace_memory:
+            self.note_peak(self.stack())
+        report = {
+            'started_at': self.started_at,
+            'seconds': round(self.root.seconds, 4),
+            'counters': dict(self.counters),
+            'spans': [c.to_dict(self.trace_memory) for c in self.root.children.values()],
+        }
+        if self.trace_memory:
+            report['peak_mb'] = round(self.root.peak_bytes / 2**20, 2)
+        return report
+
+
+class _Span:
+    __slots__ = ('run', 'name', 'stats', 'start')
+
+    def __init__(self, run: Run, name: str):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        run = self.run
+        stack = run.stack()
+        parent = stack[-1]
+        with run._lock:
+            stats = parent.children.get(self.name)
+            if stats is None:
+                stats = parent.children[self.name] = SpanStats(self.name)
+        if run.trace_memory:
+            run.note_peak(stack)
+        stack.append(stats)
+        self.stats = stats
+        self.start = time.perf_counter()
+        return stats
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        run = self.run
+        stack = run.stack()
+        if run.trace_memory:
+            run.note_peak(stack)
+        stack.pop()
+        with run._lock:
+            self.stats.calls += 1
+            self.stats.seconds += elapsed
+        return False
+
+
+_NULL_SPAN = nullcontext()
+
+_current: Run | None = None
+
+
+def enable(trace_memory: bool = False) -> Run:
+    """Start recording; with `trace_memory`, tracemalloc peaks are captured too."""
+    global _current
+    run = Run(trace_memory)
+    # leave tracing alone on disable if someone else started it
+    run.owns_tracing = trace_memory and not tracemalloc.is_tracing()
+    if run.owns_tracing:
+        tracemalloc.start()
+    _current = run
+    return run
+
+
+def disable() -> dict | None:
+    """Stop recording and return the report of the run, if one was active."""
+    global _current
+    run, _current = _current, None
+    if run is None:
+        return None
+    report = run.report()
+    if run.owns_tracing:
+        tracemalloc.stop()
+    return report
+
+
+def enabled() -> bool:
+    return _current is not None
+
+
+def span(name: str):
+    """Context manager timing one stage; a shared no-op while disabled."""
+    run = _current
+    if run is None:
+        return _NULL_SPAN
+    return _Span(run, name)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add `n` to a counter of the innermost open span and to the run totals."""
+    run = _current
+    if run is not None:
+        run.count(name, n)
+
+
+def instrumented(name: str):
+    """Decorator wrapping every call of a function in `span(name)`."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def run(report_path: str = None, trace_memory: bool = False, profile_path: str = None):
+    """Instrument the enclosed block, writing a JSON report and/or a cProfile dump.
+
+    Spans and counters are only recorded when `report_path` is given. With
+    `trace_memory`, each span also gets the tracemalloc peak while it was
+    open; peaks are process-wide, and work in worker processes isn't traced.
+    """
+    if report_path:
+        enable(trace_memory)
+    profiler = cProfile.Profile() if profile_path else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield _current
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        report = disable()
+        if report is not None and report_path:
+            with open(report_path, 'w') as f:
+                json.dump(report, f, indent=2)
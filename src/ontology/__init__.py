@@ -1,3 +1,4 @@
 from .relation_types import infer_relation_type, refine_dependencies, DEV_PACKAGES
 from .package_taxonomy import classify_package, assess_health, classify_and_assess, KNOWN_PACKAGES
 from .inference import run_inference, infer_from_dependencies, infer_from_dependents
+from .search import SearchIndex, PACKAGE_ALIASES
@@ -0,0 +1,208 @@
+from bisect import bisect_left
+
+import numpy as np
+
+from ..parsing import normalize_name
+from ..storage import Package
+
+
+# import or common names that differ from the distribution name
+PACKAGE_ALIASES = {
+    'sklearn': 'scikit-learn',
+    'skimage': 'scikit-image',
+    'skopt': 'scikit-optimize',
+    'cv2': 'opencv-python',
+    'pil': 'pillow',
+    'yaml': 'pyyaml',
+    'bs4': 'beautifulsoup4',
+    'dateutil': 'python-dateutil',
+    'dotenv': 'python-dotenv',
+    'google-protobuf': 'protobuf',
+    'tf': 'tensorflow',
+    'pytorch': 'torch',
+    'hf-hub': 'huggingface-hub',
+    'attr': 'attrs',
+    'jwt': 'pyjwt',
+    'zmq': 'pyzmq',
+    'magic': 'python-magic',
+}
+
+# prefix ranges larger than this have their top results memoized
+LARGE_RANGE = 4096
+
+# results kept per memoized prefix, and the most `search` will return
+MAX_RESULTS = 50
+
+# fuzzy candidates (most shared trigrams first) checked by edit distance
+FUZZY_CANDIDATES = 32
+
+
+class SearchIndex:
+    """Incremental, typo-tolerant package-name search, best-ranked first.
+
+    Names and aliases are PEP 503-normalized, so `scikit_learn`,
+    `Scikit.Learn` and `scikit-learn` are the same query. Prefix matches
+    come from a sorted key array (a flattened trie: the keys under a prefix
+    are one contiguous range found by binary search); every `-` separated
+    suffix of a name is a key too, so `learn` finds `scikit-learn`. When
+    prefixes run out, a trigram index proposes candidates that are checked
+    by edit distance (with transpositions), so `tranformers` finds
+    `transformers`. Ties are broken by PageRank.
+    """
+
+    def __init__(self, packages: list[Package], aliases: dict[str, str] = None):
+        self.names = [p.name for p in packages]
+        self.rank = np.array([p.pagerank or 0.0 for p in packages], dtype=np.float64)
+        normalized = [normalize_name(name) for name in self.names]
+        # stored names can normalize alike (`scikit_learn` next to `scikit-learn`);
+        # a key keeps every such package, highest-ranked first
+        lookup = {}
+        for i in np.argsort(-self.rank, kind='stable').tolist():
+            lookup.setdefault(normalized[i], []).append(i)
+
+        self.exact = dict(lookup)
+        for alias, target in (PACKAGE_ALIASES if aliases is None else aliases).items():
+            ids = lookup.get(normalize_name(target))
+            if ids is not None:
+                self.exact.setdefault(normalize_name(alias), ids)
+
+        # full names, aliases and name suffixes after each separator
+        entries = {(key, i) for key, ids in self.exact.items() for i in ids}
+        for i, key in enumerate(normalized):
+            start = key.find('-')
+            while start != -1:
+                entries.add((key[start + 1:], i))
+                start = key.find('-', start + 1)
+        entries = sorted(e for e in entries if e[0])
+        self.keys = [key for key, _ in entries]
+        self.key_ids = np.array([i for _, i in entries], dtype=np.int64)
+        self._memo = {}
+
+        # trigram postings over full names and aliases, for fuzzy matching
+        self.fuzzy_keys = list(self.exact)
+        postings = {}
+        for k, key in enumerate(self.fuzzy_keys):
+            for gram in _trigrams(key):
+                postings.setdefault(gram, []).append(k)
+        self.postings = {gram: np.array(ks, dtype=np.int64) for gram, ks in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, limit: int = 10) -> list[str]:
+        """Package names for `query`: exact or alias, then prefix, then fuzzy matches."""
+        q = normalize_name(query.strip())
+        limit = min(limit, MAX_RESULTS)
+        if not q or limit <= 0:
+            return []
+
+        found = list(self.exact.get(q, ()))
+        exact = set(found)
+        for i in self._prefix(q):
+            if i not in exact:
+                found.append(i)
+            if len(found) >= limit:
+                return [self.names[i] for i in found[:limit]]
+
+        seen = set(found)
+        for i in self._fuzzy(q):
+            if i not in seen:
+                found.append(i)
+                seen.add(i)
+                if len(found) >= limit:
+                    break
+        return [self.names[i] for i in found]
+
+    def matches(self, query: str) -> list[str]:
+        """Every package whose name contains `query`, plus the ranked `search` hits.
+
+        For filtering a list rather than suggesting names: substring hits are
+        not capped, so `vision` keeps `torchvision` however many names match.
+        """
+        q = normalize_name(query.strip())
+        if not q:
+            return []
+        found = dict.fromkeys(self.search(query, limit=MAX_RESULTS))
+        for i in self._substring(q):
+            found.setdefault(self.names[i])
+        return list(found)
+
+    def top(self, limit: int = 10) -> list[str]:
+        """Highest-PageRank packages, for an empty query."""
+        return [self.names[i] for i in _top(np.arange(len(self.names)), self.rank, limit)]
+
+    def _prefix(self, q: str) -> list[int]:
+        memo = self._memo.get(q)
+        if memo is not None:
+            return memo
+        lo = bisect_left(self.keys, q)
+        hi = bisect_left(self.keys, q + '\uffff')
+        ids = np.unique(self.key_ids[lo:hi])
+        result = _top(ids, self.rank, MAX_RESULTS)
+        if hi - lo > LARGE_RANGE:
+            self._memo[q] = result
+        return result
+
+    def _substring(self, q: str) -> list[int]:
+        # a name containing q contains all of q's trigrams, so the rarest one bounds the candidates
+        if len(q) < 3:
+            keys = range(len(self.fuzzy_keys))
+        else:
+            grams = [q[i:i + 3] for i in range(len(q) - 2)]
+            keys = min((self.postings.get(g, ()) for g in grams), key=len)
+        ids = {i for k in keys if q in self.fuzzy_keys[k] for i in self.exact[self.fuzzy_keys[k]]}
+        return _top(np.array(sorted(ids), dtype=np.int64), self.rank, len(ids)) if ids else []
+
+    def _fuzzy(self, q: str) -> list[int]:
+        # one edit changes at most three trigrams
+        max_edits = 1 if len(q) <= 5 else 2
+        grams = _trigrams(q)
+        # trigrams shared by a large part of the catalog say little and cost the most
+        common = max(len(self.fuzzy_keys) // 20, 1000)
+        lists = [self.postings[g] for g in grams if 0 < len(self.postings.get(g, ())) <= common]
+        skipped = sum(1 for g in grams if len(self.postings.get(g, ())) > common)
+        if not lists:
+            return []
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.fuzzy_keys))
+        candidates = np.flatnonzero(counts >= max(len(grams) - skipped - 3 * max_edits, 1))
+        if len(candidates) > FUZZY_CANDIDATES:
+            best = np.argpartition(-counts[candidates], FUZZY_CANDIDATES - 1)[:FUZZY_CANDIDATES]
+            candidates = candidates[best]
+
+        scored = []
+        for k in candidates.tolist():
+            key = self.fuzzy_keys[k]
+            if abs(len(key) - len(q)) <= max_edits:
+                d = _edit_distance(q, key, max_edits)
+                if d <= max_edits:
+                    scored.extend((d, -self.rank[i], i) for i in self.exact[key])
+        scored.sort()
+        return [i for _, _, i in scored]
+
+
+def _top(ids: np.ndarray, rank: np.ndarray, limit: int) -> list[int]:
+    if len(ids) > limit:
+        ids = ids[np.argpartition(-rank[ids], limit - 1)[:limit]]
+    # stable on ties so equal ranks keep catalog order
+    return ids[np.argsort(-rank[ids], kind='stable')].tolist()
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a: str, b: str, bound: int) -> int:
+    """Optimal string alignment distance, giving up once it exceeds `bound`."""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > bound:
+            return bound + 1
+        prev2, prev = prev, cur
+    return prev[-1]
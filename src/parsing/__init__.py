@@ -1,4 +1,4 @@
-from .dependency_extractor import extract_dependencies, extract_all
+from .dependency_extractor import extract_dependencies, extract_many, extract_all
 from .pyproject_parser import parse_pyproject
 from .setup_parser import parse_setup_py
 from .requirements_parser import parse_requirements, normalize_name
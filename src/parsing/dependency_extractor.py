@@ -1,3 +1,7 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from ..instrumentation import span, count, enabled
 from ..storage import Repository, Dependency
 from .pyproject_parser import parse_pyproject
 from .setup_parser import parse_setup_py
@@ -32,10 +36,40 @@ def extract_dependencies(repo: Repository) -> list[Dependency]:
     return unique
 
 
-def extract_all(repos: list[Repository]) -> dict[str, list[Dependency]]:
+# below this many repositories, process start-up costs more than it saves
+PARALLEL_THRESHOLD = 200
+
+# repositories handed to a worker at a time
+CHUNK_SIZE = 16
+
+
+def extract_many(repos: list[Repository], workers: int = None) -> list[list[Dependency]]:
+    """Extract dependencies for each repository, in order.
+
+    Manifests are parsed in a process pool of `workers` processes (defaults
+    to all cores); small batches and workers=1 run serially.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with span('parsing.extract'):
+        if workers <= 1 or len(repos) < PARALLEL_THRESHOLD:
+            results = [extract_dependencies(repo) for repo in repos]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(extract_dependencies, repos, chunksize=CHUNK_SIZE))
+        # counted here, since workers in other processes aren't instrumented
+        if enabled():
+            count('repositories', len(repos))
+            count('files_parsed', sum(bool(r.pyproject_toml) + bool(r.setup_py) + bool(r.requirements_txt)
+                                      for r in repos))
+            count('dependencies_extracted', sum(map(len, results)))
+    return results
+
+
+def extract_all(repos: list[Repository], workers: int = None) -> dict[str, list[Dependency]]:
     """Extract dependencies from multiple repositories."""
     result = {}
-    for repo in repos:
+    for repo, deps in zip(repos, extract_many(repos, workers)):
         pkg = repo.package_name or repo.full_name.split('/')[-1].lower()
-        result[pkg] = extract_dependencies(repo)
+        result[pkg] = deps
     return result
@@ -1,2 +1,3 @@
 from .models import Package, Dependency, Repository, RelationType, Domain, Role, HealthStatus
 from .database import Database
+from .index import DependencyIndex, PackageIndex, SORT_KEYS
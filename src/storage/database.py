@@ -1,18 +1,40 @@
 import sqlite3
 import json
 import os
+from array import array
 from datetime import datetime
 from contextlib import contextmanager
 
+from ..instrumentation import count, instrumented
 from .models import Package, Dependency, Repository, RelationType
 
 
+# columns added after the initial schema, applied to existing databases on open
+PACKAGE_MIGRATIONS = {
+    'betweenness_stale': 'INTEGER DEFAULT 0',
+    'scc_id': 'INTEGER DEFAULT -1',
+    'topo_layer': 'INTEGER DEFAULT 0',
+    'in_cycle': 'INTEGER DEFAULT 0',
+    'layout_x': 'REAL',
+    'layout_y': 'REAL',
+}
+
+
 class Database:
     def __init__(self, db_path: str = None):
         self.db_path = db_path or os.environ.get('DATABASE_PATH', 'data/ml_analyzer.db')
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         self._init_schema()
 
+    def data_version(self) -> tuple[int, int]:
+        """Modification time and size of the database file, which change whenever it is written."""
+        version = (0, 0)
+        for path in (self.db_path, self.db_path + '-wal'):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                version = (max(version[0], stat.st_mtime_ns), version[1] + stat.st_size)
+        return version
+
     @contextmanager
     def _conn(self):
         conn = sqlite3.connect(self.db_path)
@@ -52,7 +74,13 @@ class Database:
                     in_degree INTEGER DEFAULT 0,
                     out_degree INTEGER DEFAULT 0,
                     pagerank REAL DEFAULT 0,
-                    betweenness REAL DEFAULT 0
+                    betweenness REAL DEFAULT 0,
+                    betweenness_stale INTEGER DEFAULT 0,
+                    scc_id INTEGER DEFAULT -1,
+                    topo_layer INTEGER DEFAULT 0,
+                    in_cycle INTEGER DEFAULT 0,
+                    layout_x REAL,
+                    layout_y REAL
                 );
 
                 CREATE TABLE IF NOT EXISTS dependencies (
@@ -68,8 +96,41 @@ class Database:
 
                 CREATE INDEX IF NOT EXISTS idx_dep_source ON dependencies(source);
                 CREATE INDEX IF NOT EXISTS idx_dep_target ON dependencies(target);
+
+                -- per-relation-mask metric vectors, float64 arrays aligned with metric_index
+                CREATE TABLE IF NOT EXISTS metric_vectors (
+                    relation_mask INTEGER,
+                    metric TEXT,
+                    vector BLOB,
+                    PRIMARY KEY(relation_mask, metric)
+                );
+
+                CREATE TABLE IF NOT EXISTS metric_index (
+                    position INTEGER PRIMARY KEY,
+                    name TEXT
+                );
+
+                -- transitive-closure bitsets per relation mask and direction, with the
+                -- component of each node in closure_index order
+                CREATE TABLE IF NOT EXISTS reachability_closures (
+                    relation_mask INTEGER,
+                    reverse INTEGER,
+                    components BLOB,
+                    closure BLOB,
+                    PRIMARY KEY(relation_mask, reverse)
+                );
+
+                CREATE TABLE IF NOT EXISTS closure_index (
+                    position INTEGER PRIMARY KEY,
+                    name TEXT
+                );
             ''')
 
+            existing = {r['name'] for r in conn.execute('PRAGMA table_info(packages)')}
+            for column, decl in PACKAGE_MIGRATIONS.items():
+                if column not in existing:
+                    conn.execute(f'ALTER TABLE packages ADD COLUMN {column} {decl}')
+
     def save_repository(self, repo: Repository):
         with self._conn() as conn:
             conn.execute('''
@@ -104,9 +165,11 @@ class Database:
                 setup_cfg=row['setup_cfg']
             )
 
+    @instrumented('storage.read_repositories')
     def get_all_repositories(self) -> list[Repository]:
         with self._conn() as conn:
             rows = conn.execute('SELECT * FROM repositories').fetchall()
+            count('rows_read', len(rows))
             return [Repository(
                 full_name=r['full_name'],
                 stars=r['stars'] or 0,
@@ -121,59 +184,65 @@ class Database:
             ) for r in rows]
 
     def save_package(self, pkg: Package):
+        self.save_packages([pkg])
+
+    @instrumented('storage.write_packages')
+    def save_packages(self, pkgs: list[Package]):
+        count('rows_written', len(pkgs))
         with self._conn() as conn:
-            conn.execute('''
+            conn.executemany('''
                 INSERT OR REPLACE INTO packages
                 (name, github_repo, domain, role, health_status, description,
                  latest_version, github_stars, last_commit_date,
-                 in_degree, out_degree, pagerank, betweenness)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+                 in_degree, out_degree, pagerank, betweenness, betweenness_stale,
+                 scc_id, topo_layer, in_cycle, layout_x, layout_y)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(
                 pkg.name, pkg.github_repo, pkg.domain, pkg.role, pkg.health_status,
                 pkg.description, pkg.latest_version, pkg.github_stars,
                 pkg.last_commit_date.isoformat() if pkg.last_commit_date else None,
-                pkg.in_degree, pkg.out_degree, pkg.pagerank, pkg.betweenness
-            ))
+                pkg.in_degree, pkg.out_degree, pkg.pagerank, pkg.betweenness,
+                int(pkg.betweenness_stale), pkg.scc_id, pkg.topo_layer, int(pkg.in_cycle),
+                pkg.layout_x, pkg.layout_y
+            ) for pkg in pkgs])
 
     def get_package(self, name: str) -> Package | None:
         with self._conn() as conn:
             row = conn.execute('SELECT * FROM packages WHERE name = ?', (name,)).fetchone()
             if not row:
                 return None
-            return Package(
-                name=row['name'],
-                github_repo=row['github_repo'],
-                domain=row['domain'],
-                role=row['role'],
-                health_status=row['health_status'],
-                description=row['description'],
-                latest_version=row['latest_version'],
-                github_stars=row['github_stars'],
-                last_commit_date=datetime.fromisoformat(row['last_commit_date']) if row['last_commit_date'] else None,
-                in_degree=row['in_degree'],
-                out_degree=row['out_degree'],
-                pagerank=row['pagerank'],
-                betweenness=row['betweenness']
-            )
+            return self._package_from_row(row)
 
+    @instrumented('storage.read_packages')
     def get_all_packages(self) -> list[Package]:
         with self._conn() as conn:
             rows = conn.execute('SELECT * FROM packages').fetchall()
-            return [Package(
-                name=r['name'],
-                github_repo=r['github_repo'],
-                domain=r['domain'],
-                role=r['role'],
-                health_status=r['health_status'],
-                description=r['description'],
-                latest_version=r['latest_version'],
-                github_stars=r['github_stars'],
-                last_commit_date=datetime.fromisoformat(r['last_commit_date']) if r['last_commit_date'] else None,
-                in_degree=r['in_degree'],
-                out_degree=r['out_degree'],
-                pagerank=r['pagerank'],
-                betweenness=r['betweenness']
-            ) for r in rows]
+            count('rows_read', len(rows))
+            return [self._package_from_row(r) for r in rows]
+
+    @staticmethod
+    def _package_from_row(r: sqlite3.Row) -> Package:
+        return Package(
+            name=r['name'],
+            github_repo=r['github_repo'],
+            domain=r['domain'],
+            role=r['role'],
+            health_status=r['health_status'],
+            description=r['description'],
+            latest_version=r['latest_version'],
+            github_stars=r['github_stars'],
+            last_commit_date=datetime.fromisoformat(r['last_commit_date']) if r['last_commit_date'] else None,
+            in_degree=r['in_degree'],
+            out_degree=r['out_degree'],
+            pagerank=r['pagerank'],
+            betweenness=r['betweenness'],
+            betweenness_stale=bool(r['betweenness_stale']),
+            scc_id=r['scc_id'],
+            topo_layer=r['topo_layer'],
+            in_cycle=bool(r['in_cycle']),
+            layout_x=r['layout_x'],
+            layout_y=r['layout_y']
+        )
 
     def save_dependency(self, dep: Dependency):
         with self._conn() as conn:
@@ -186,7 +255,9 @@ class Database:
                 dep.version_constraint, dep.source_file, int(dep.is_transitive)
             ))
 
+    @instrumented('storage.write_dependencies')
     def save_dependencies(self, deps: list[Dependency]):
+        count('rows_written', len(deps))
         with self._conn() as conn:
             conn.executemany('''
                 INSERT OR REPLACE INTO dependencies
@@ -195,6 +266,15 @@ class Database:
             ''', [(d.source, d.target, d.relation_type.value,
                    d.version_constraint, d.source_file, int(d.is_transitive)) for d in deps])
 
+    @instrumented('storage.delete_dependencies')
+    def delete_dependencies(self, deps: list[Dependency]):
+        count('rows_deleted', len(deps))
+        with self._conn() as conn:
+            conn.executemany(
+                'DELETE FROM dependencies WHERE source = ? AND target = ? AND relation_type = ?',
+                [(d.source, d.target, d.relation_type.value) for d in deps]
+            )
+
     def get_dependencies(self, source: str = None, target: str = None) -> list[Dependency]:
         with self._conn() as conn:
             if source and target:
@@ -213,6 +293,7 @@ class Database:
             else:
                 rows = conn.execute('SELECT * FROM dependencies').fetchall()
 
+            count('rows_read', len(rows))
             return [Dependency(
                 source=r['source'],
                 target=r['target'],
@@ -222,5 +303,56 @@ class Database:
                 is_transitive=bool(r['is_transitive'])
             ) for r in rows]
 
+    @instrumented('storage.read_dependencies')
     def get_all_dependencies(self) -> list[Dependency]:
         return self.get_dependencies()
+
+    @instrumented('storage.write_metric_vectors')
+    def save_metric_vectors(self, names: list[str], vectors: dict[tuple[int, str], list[float]]):
+        """Replace all stored metric vectors; each vector is aligned with `names`."""
+        count('rows_written', len(names) + len(vectors))
+        with self._conn() as conn:
+            conn.execute('DELETE FROM metric_vectors')
+            conn.execute('DELETE FROM metric_index')
+            conn.executemany('INSERT INTO metric_index (position, name) VALUES (?, ?)', enumerate(names))
+            conn.executemany(
+                'INSERT INTO metric_vectors (relation_mask, metric, vector) VALUES (?, ?, ?)',
+                [(mask, metric, array('d', vec).tobytes()) for (mask, metric), vec in vectors.items()]
+            )
+
+    def get_metric_vectors(self) -> tuple[list[str], dict[tuple[int, str], array]]:
+        with self._conn() as conn:
+            names = [r['name'] for r in conn.execute('SELECT name FROM metric_index ORDER BY position')]
+            vectors = {}
+            for r in conn.execute('SELECT * FROM metric_vectors'):
+                vec = array('d')
+                vec.frombytes(r['vector'])
+                vectors[(r['relation_mask'], r['metric'])] = vec
+            return names, vectors
+
+    @instrumented('storage.write_closures')
+    def save_closures(self, names: list[str], closures: dict[tuple[int, bool], tuple]):
+        """Replace stored reachability closures; an empty `closures` just removes them.
+
+        Each value is (int32 component per node, aligned with `names`; packed closure rows).
+        """
+        count('rows_written', len(names) + len(closures))
+        with self._conn() as conn:
+            conn.execute('DELETE FROM reachability_closures')
+            conn.execute('DELETE FROM closure_index')
+            conn.executemany('INSERT INTO closure_index (position, name) VALUES (?, ?)', enumerate(names))
+            conn.executemany(
+                'INSERT INTO reachability_closures (relation_mask, reverse, components, closure) VALUES (?, ?, ?, ?)',
+                [(mask, int(reverse), bytes(comp), bytes(closure))
+                 for (mask, reverse), (comp, closure) in closures.items()]
+            )
+
+    @instrumented('storage.read_closures')
+    def get_closures(self) -> tuple[list[str], dict[tuple[int, bool], tuple[bytes, bytes]]]:
+        with self._conn() as conn:
+            names = [r['name'] for r in conn.execute('SELECT name FROM closure_index ORDER BY position')]
+            closures = {
+                (r['relation_mask'], bool(r['reverse'])): (r['components'], r['closure'])
+                for r in conn.execute('SELECT * FROM reachability_closures')
+            }
+            return names, closures
@@ -0,0 +1,96 @@
+import numpy as np
+
+from .models import Package, Dependency, RelationType
+
+
+# sort keys offered by the package list; all but name sort descending
+SORT_KEYS = ('pagerank', 'in_degree', 'name', 'github_stars')
+
+
+class DependencyIndex:
+    """Dependencies of each package by source and by target, grouped by relation type.
+
+    Built once from the full edge list so that looking up a package's
+    dependencies or dependents is a dict access instead of a scan over every
+    edge. Groups follow `RelationType` order, as the package card shows them.
+    """
+
+    def __init__(self, deps: list[Dependency]):
+        self._by_source: dict[str, dict[RelationType, list[Dependency]]] = {}
+        self._by_target: dict[str, dict[RelationType, list[Dependency]]] = {}
+        order = {rel: i for i, rel in enumerate(RelationType)}
+        for d in sorted(deps, key=lambda d: order[d.relation_type]):
+            self._by_source.setdefault(d.source, {}).setdefault(d.relation_type, []).append(d)
+            self._by_target.setdefault(d.target, {}).setdefault(d.relation_type, []).append(d)
+
+    def dependencies(self, name: str) -> dict[RelationType, list[Dependency]]:
+        """What `name` depends on, grouped by relation type."""
+        return self._by_source.get(name, {})
+
+    def dependents(self, name: str) -> dict[RelationType, list[Dependency]]:
+        """What depends on `name`, grouped by relation type."""
+        return self._by_target.get(name, {})
+
+
+class PackageIndex:
+    """Packages in a fixed order with facet masks and one pre-sorted order per sort key.
+
+    A filter selection becomes a boolean mask over that order, and a page
+    of the sorted, filtered list is a slice of `order[mask[order]]`, so the
+    list never has to be re-sorted or walked in Python to show one page.
+    """
+
+    def __init__(self, packages: list[Package]):
+        self.packages = list(packages)
+        n = len(self.packages)
+        self.names = [p.name.lower() for p in self.packages]
+        self.position = {p.name: i for i, p in enumerate(self.packages)}
+
+        self.masks = {}
+        for facet in ('domain', 'role', 'health_status'):
+            values = np.array([getattr(p, facet) for p in self.packages], dtype=object)
+            self.masks[facet] = {value: values == value for value in set(values.tolist())}
+        self.in_degree = np.fromiter((p.in_degree for p in self.packages), dtype=np.int64, count=n)
+
+        self.order = {'name': np.array(sorted(range(n), key=self.names.__getitem__), dtype=np.int64)}
+        for key in SORT_KEYS:
+            if key != 'name':
+                values = np.fromiter((getattr(p, key) or 0 for p in self.packages), dtype=np.float64, count=n)
+                # stable, so ties keep catalog order
+                self.order[key] = np.argsort(-values, kind='stable')
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+    def mask(self,
+             domains: list[str] = None,
+             roles: list[str] = None,
+             health: list[str] = None,
+             min_in_degree: int = 0,
+             names: list[str] = None) -> np.ndarray:
+        """Boolean mask of packages matching every selected facet (empty means any).
+
+        `names` keeps only those packages, e.g. the matches of a search index.
+        """
+        keep = np.ones(len(self.packages), dtype=bool)
+        for facet, selected in (('domain', domains), ('role', roles), ('health_status', health)):
+            if selected:
+                any_of = np.zeros(len(self.packages), dtype=bool)
+                for value in selected:
+                    if value in self.masks[facet]:
+                        any_of |= self.masks[facet][value]
+                keep &= any_of
+        if min_in_degree:
+            keep &= self.in_degree >= min_in_degree
+        if names is not None:
+            only = np.zeros(len(self.packages), dtype=bool)
+            only[[self.position[name] for name in names if name in self.position]] = True
+            keep &= only
+        return keep
+
+    def page(self, mask: np.ndarray, sort_by: str = 'pagerank',
+             offset: int = 0, limit: int = 50) -> list[Package]:
+        """Packages `offset` to `offset + limit` of the masked list in `sort_by` order."""
+        order = self.order[sort_by]
+        selected = order[mask[order]]
+        return [self.packages[i] for i in selected[offset:offset + limit]]
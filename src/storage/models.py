@@ -51,6 +51,16 @@ class Package:
     out_degree: int = 0
     pagerank: float = 0.0
     betweenness: float = 0.0
+    betweenness_stale: bool = False
+
+    # dependency structure: strongly connected component and topological layer
+    scc_id: int = -1
+    topo_layer: int = 0
+    in_cycle: bool = False
+
+    # precomputed global layout position (pixels), None until a full build
+    layout_x: float | None = None
+    layout_y: float | None = None
 
     def to_dict(self):
         d = asdict(self)
@@ -5,8 +5,9 @@ from pathlib import Path
 # add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.storage import Database, Domain
-from src.graph import build_graph, get_graph_stats
+from src.storage import Domain
+from src.graph import get_graph_stats
+from src.ui.data import load_data, load_graph
 
 st.set_page_config(
     page_title="ML Dependency Analyzer",
@@ -15,19 +16,6 @@ st.set_page_config(
 )
 
 
-@st.cache_resource
-def get_db():
-    return Database()
-
-
-@st.cache_data
-def load_graph_data():
-    db = get_db()
-    packages = db.get_all_packages()
-    deps = db.get_all_dependencies()
-    return packages, deps
-
-
 DOMAIN_TOOLTIPS = {
     'deep_learning': 'Neural network frameworks (PyTorch, TensorFlow, JAX)',
     'traditional_ml': 'Classical ML algorithms (scikit-learn, XGBoost)',
@@ -73,13 +61,13 @@ def main():
         - **Health** — Maintenance status based on commit activity
         """)
 
-    packages, deps = load_graph_data()
+    packages, deps = load_data()
 
     if not packages:
         st.warning("No data found. Run `python scripts/collect_data.py` first.")
         st.stop()
 
-    G = build_graph(packages, deps)
+    G, _ = load_graph()
     stats = get_graph_stats(G)
 
     # summary metrics with tooltips
@@ -1,3 +1,4 @@
 from .facet_filters import render_filters, apply_filters
 from .graph_renderer import render_graph, render_legend
 from .package_card import render_package_card, render_package_mini
+from .package_search import package_picker, package_multi_picker
@@ -1,9 +1,13 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
 import streamlit as st
 import streamlit.components.v1 as components
 from pyvis.network import Network
 import networkx as nx
-import tempfile
-import os
+
+from .webgl_renderer import can_render_webgl, webgl_html
 
 # color scheme for domains
 DOMAIN_COLORS = {
@@ -24,17 +28,105 @@ RELATION_COLORS = {
     'extends': '#e67e22',
 }
 
+# total size of rendered pages kept for reuse across reruns and sessions
+# (a WebGL page for 20k nodes is several MB)
+RENDER_CACHE_BYTES = 64 * 1024 * 1024
+
+# node attributes that end up in the rendered page
+_DRAWN_ATTRS = ('domain', 'role', 'pagerank', 'layout_x', 'layout_y',
+                'is_group', 'group', 'members', 'top_members')
+
+_render_cache: OrderedDict[str, str] = OrderedDict()
+_render_cache_bytes = 0
+_render_lock = threading.Lock()
+
 
-def render_graph(G: nx.MultiDiGraph, height: int = 600, physics: bool = True) -> None:
-    """Render a NetworkX graph using PyVis."""
+def render_graph(G: nx.MultiDiGraph, height: int = 600, physics: bool = True,
+                 node_metrics: dict[str, dict] = None, renderer: str = 'pyvis') -> None:
+    """Render a NetworkX graph using PyVis, or WebGL with renderer='webgl'.
+
+    The WebGL view needs a stored layout position for every node and falls
+    back to PyVis otherwise.
+
+    `node_metrics` overrides the stored in-degree and PageRank per node, e.g.
+    with values computed for the selected relation types. Nodes with a
+    precomputed layout position are pinned there when physics is off, so
+    the browser has nothing to simulate; with physics on the positions only
+    seed the simulation.
+
+    Rendered pages are kept in an LRU cache keyed by `graph_fingerprint`
+    and bounded by total page size, so showing the same subgraph again
+    (e.g. clicking back to a package) reuses the HTML instead of rebuilding it.
+    """
     if len(G) == 0:
         st.info("No nodes to display with current filters.")
         return
 
+    if renderer == 'webgl' and not can_render_webgl(G):
+        renderer = 'pyvis'
+
+    key = graph_fingerprint(G, height, physics, node_metrics, renderer)
+    with _render_lock:
+        html = _render_cache.get(key)
+        if html is not None:
+            _render_cache.move_to_end(key)
+
+    if html is None:
+        if renderer == 'webgl':
+            html = webgl_html(G, height, DOMAIN_COLORS, RELATION_COLORS, node_metrics)
+        else:
+            html = _pyvis_html(G, height, physics, node_metrics)
+        _remember(key, html)
+
+    components.html(html, height=height + (10 if renderer == 'webgl' else 50))
+
+
+def _remember(key: str, html: str) -> None:
+    global _render_cache_bytes
+    if len(html) > RENDER_CACHE_BYTES:
+        return
+    with _render_lock:
+        old = _render_cache.pop(key, None)
+        if old is not None:
+            _render_cache_bytes -= len(old)
+        _render_cache[key] = html
+        _render_cache_bytes += len(html)
+        while _render_cache_bytes > RENDER_CACHE_BYTES:
+            _, evicted = _render_cache.popitem(last=False)
+            _render_cache_bytes -= len(evicted)
+
+
+def graph_fingerprint(G: nx.MultiDiGraph, height: int, physics: bool,
+                      node_metrics: dict[str, dict] = None, renderer: str = 'pyvis') -> str:
+    """Stable hash of everything a rendered page depends on.
+
+    Covers the node set with the attributes that are drawn, the edge set
+    with relation types (so a different relation filter gives a different
+    key), the metric overrides and the render options. Node and edge order
+    don't matter.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((renderer, height, physics)).encode())
+    for node in sorted(G.nodes()):
+        data = G.nodes[node]
+        drawn = tuple(data.get(attr) for attr in _DRAWN_ATTRS)
+        metrics = node_metrics.get(node) if node_metrics else None
+        h.update(repr((node, drawn, sorted(metrics.items()) if metrics else None)).encode())
+    edges = sorted((u, v, data.get('relation_type') or '', data.get('weight') or 0)
+                   for u, v, data in G.edges(data=True))
+    h.update(repr(edges).encode())
+    return h.hexdigest()
+
+
+def _pyvis_html(G: nx.MultiDiGraph, height: int, physics: bool,
+                node_metrics: dict[str, dict] = None) -> str:
     net = Network(height=f"{height}px", width="100%", directed=True, bgcolor="#ffffff")
 
-    # configure physics
-    if physics:
+    positioned = {n for n, x in G.nodes(data='layout_x') if x is not None}
+    pinned = not physics
+
+    # configure physics; still needed to place nodes missing from the stored layout
+    if physics or len(positioned) < len(G):
         net.set_options('''
         {
             "physics": {
@@ -50,38 +142,63 @@ def render_graph(G: nx.MultiDiGraph, height: int = 600, physics: bool = True) ->
     else:
         net.toggle_physics(False)
 
+    def metric(node, name, default):
+        if node_metrics and node in node_metrics:
+            return node_metrics[node][name]
+        return default
+
     # add nodes
-    max_pagerank = max((G.nodes[n].get('pagerank', 0) for n in G.nodes()), default=1) or 1
+    max_pagerank = max((metric(n, 'pagerank', G.nodes[n].get('pagerank', 0)) for n in G.nodes()), default=1) or 1
 
     for node in G.nodes():
         data = G.nodes[node]
         domain = data.get('domain', 'utilities')
-        pagerank = data.get('pagerank', 0)
+        pagerank = metric(node, 'pagerank', data.get('pagerank', 0))
+        in_degree = int(metric(node, 'in_degree', G.in_degree(node)))
 
         size = 10 + (pagerank / max_pagerank) * 40
         color = DOMAIN_COLORS.get(domain, '#95a5a6')
 
+        if data.get('is_group'):
+            # collapsed super-node from aggregate_graph
+            title = f"{data['group']}\n"
+            title += f"{data['members']} packages\n"
+            title += f"Top: {', '.join(data['top_members'])}"
+            net.add_node(node, label=f"{data['group']} ({data['members']})", size=size,
+                         color=color, title=title, shape='diamond', **_position(data, pinned))
+            continue
+
         title = f"{node}\n"
         title += f"Domain: {domain}\n"
         title += f"Role: {data.get('role', 'unknown')}\n"
-        title += f"In-degree: {G.in_degree(node)}\n"
+        title += f"In-degree: {in_degree}\n"
         title += f"PageRank: {pagerank:.4f}"
 
-        net.add_node(node, label=node, size=size, color=color, title=title)
+        net.add_node(node, label=node, size=size, color=color, title=title, **_position(data, pinned))
 
     # add edges
     for u, v, data in G.edges(data=True):
         rel_type = data.get('relation_type', 'requires_core')
         color = RELATION_COLORS.get(rel_type, '#2c3e50')
-        net.add_edge(u, v, color=color, title=rel_type)
-
-    # render
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.html', mode='w') as f:
-        net.save_graph(f.name)
-        f.seek(0)
-        html = open(f.name).read()
-        components.html(html, height=height + 50)
-        os.unlink(f.name)
+        weight = data.get('weight')
+        if weight:
+            # merged super-edge: width grows with the number of collapsed edges
+            net.add_edge(u, v, color=color, title=f"{weight} × {rel_type}", value=weight)
+        else:
+            net.add_edge(u, v, color=color, title=rel_type)
+
+    # render in memory; no temp file
+    return net.generate_html()
+
+
+def _position(data: dict, pinned: bool) -> dict:
+    """vis.js position options for a node with a precomputed layout."""
+    if data.get('layout_x') is None:
+        return {}
+    position = {'x': data['layout_x'], 'y': data['layout_y']}
+    if pinned:
+        position['physics'] = False
+    return position
 
 
 def render_legend():
@@ -1,9 +1,16 @@
 import streamlit as st
-from ...storage import Package, Dependency, RelationType
+from ...storage import Package, Dependency, DependencyIndex, RelationType
 
 
-def render_package_card(pkg: Package, dependencies: list[Dependency] = None, dependents: list[Dependency] = None):
-    """Render a detailed package information card."""
+def render_package_card(pkg: Package, dependencies: list[Dependency] = None, dependents: list[Dependency] = None,
+                        index: DependencyIndex = None):
+    """Render a detailed package information card.
+
+    With `index`, dependencies and dependents are read from it, already grouped.
+    """
+    if index is not None:
+        dependencies = index.dependencies(pkg.name)
+        dependents = index.dependents(pkg.name)
 
     st.subheader(pkg.name)
 
@@ -49,6 +56,11 @@ def render_package_card(pkg: Package, dependencies: list[Dependency] = None, dep
         help="How often this package lies on shortest paths between others (bridge score)"
     )
 
+    st.caption(
+        f"Dependency layer {pkg.topo_layer}"
+        + (" · part of a dependency cycle" if pkg.in_cycle else "")
+    )
+
     # github info
     if pkg.github_stars:
         st.markdown(f"⭐ **{pkg.github_stars:,}** stars")
@@ -68,17 +80,23 @@ def render_package_card(pkg: Package, dependencies: list[Dependency] = None, dep
         render_dependency_list(dependents, group_by_type=True, show_source=True)
 
 
-def render_dependency_list(deps: list[Dependency], group_by_type: bool = False, show_source: bool = False):
-    """Render a list of dependencies."""
+def render_dependency_list(deps: list[Dependency] | dict[RelationType, list[Dependency]],
+                           group_by_type: bool = False, show_source: bool = False):
+    """Render a list of dependencies, or one already grouped by relation type."""
     if not deps:
         st.caption("None")
         return
 
-    if group_by_type:
+    if isinstance(deps, dict):
+        grouped = deps
+        group_by_type = True
+        deps = [d for group in grouped.values() for d in group]
+    elif group_by_type:
         grouped = {}
         for d in deps:
             grouped.setdefault(d.relation_type, []).append(d)
 
+    if group_by_type:
         for rel_type in RelationType:
             type_deps = grouped.get(rel_type, [])
             if type_deps:
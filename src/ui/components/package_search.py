@@ -0,0 +1,46 @@
+import streamlit as st
+
+from ...ontology import SearchIndex
+
+
+# matches offered below a search box
+MATCHES = 20
+
+NONE_OPTION = "(none)"
+
+
+def package_picker(label: str, index: SearchIndex, key: str, default: str = None,
+                   allow_none: bool = False, help: str = None, container=st) -> str | None:
+    """Search box with a short list of ranked matches; returns the chosen package.
+
+    Only the matches for the current query are sent to the browser, not every
+    package name. With an empty query the list starts with `default` (or
+    "(none)" when `allow_none`), followed by the highest-PageRank packages.
+    """
+    query = container.text_input(label, key=f"{key}_query", placeholder="Type a package name...", help=help)
+    if query:
+        options = index.search(query, limit=MATCHES)
+    else:
+        options = ([default] if default else []) + index.top(MATCHES)
+    if allow_none and not query:
+        options = [NONE_OPTION] + options
+    options = list(dict.fromkeys(options))
+
+    if not options:
+        container.caption("No matching packages")
+        return None
+    choice = container.selectbox(f"{label} matches", options, key=f"{key}_choice", label_visibility="collapsed")
+    return None if choice == NONE_OPTION else choice
+
+
+def package_multi_picker(label: str, index: SearchIndex, key: str, default: list[str] = None,
+                         help: str = None) -> list[str]:
+    """Search box feeding a multiselect; the selection survives new queries."""
+    selected_key = f"{key}_selected"
+    if selected_key not in st.session_state:
+        st.session_state[selected_key] = list(default or [])
+
+    query = st.text_input(f"Search {label.lower()}", key=f"{key}_query", placeholder="Type a package name...")
+    matches = index.search(query, limit=MATCHES) if query else []
+    options = list(dict.fromkeys(st.session_state[selected_key] + matches))
+    return st.multiselect(label, options, key=selected_key, help=help)
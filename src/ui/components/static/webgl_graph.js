@@ -0,0 +1,323 @@
+// Minimal WebGL graph viewer. Reads packed typed arrays from window.GRAPH_DATA
+// (base64), draws edges as lines and nodes as round points, and supports
+// pan, zoom, hover tooltips and labels for the largest nodes. No dependencies.
+(function () {
+  const data = window.GRAPH_DATA;
+
+  function decode(b64, Type) {
+    const bin = atob(b64);
+    const bytes = new Uint8Array(bin.length);
+    for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    return new Type(bytes.buffer);
+  }
+
+  const n = data.n;
+  const m = data.m;
+  const pos = decode(data.positions, Float32Array);     // x0, y0, x1, y1, ...
+  const nodeColors = decode(data.colors, Uint8Array);   // r, g, b per node
+  const sizes = decode(data.sizes, Float32Array);
+  const edges = decode(data.edges, Uint32Array);        // src0, dst0, src1, dst1, ...
+  const edgeKinds = decode(data.edge_kinds, Uint8Array);
+  const labels = data.labels;
+  const domainIdx = decode(data.domain_idx, Uint8Array);
+  const roleIdx = decode(data.role_idx, Uint8Array);
+  const inDegree = decode(data.in_degree, Uint32Array);
+  const pagerank = decode(data.pagerank, Float32Array);
+
+  function title(k) {
+    if (k in data.group_titles) return data.group_titles[k];
+    return labels[k] + '\nDomain: ' + data.domains[domainIdx[k]] +
+      '\nRole: ' + data.roles[roleIdx[k]] +
+      '\nIn-degree: ' + inDegree[k] +
+      '\nPageRank: ' + pagerank[k].toFixed(4);
+  }
+
+  const canvas = document.getElementById('graph-canvas');
+  const overlay = document.getElementById('graph-overlay');
+  const tooltip = document.getElementById('graph-tooltip');
+  const gl = canvas.getContext('webgl', { antialias: true });
+  if (!gl) {
+    tooltip.style.display = 'block';
+    tooltip.textContent = 'WebGL is not available in this browser.';
+    return;
+  }
+  const ctx = overlay.getContext('2d');
+
+  // ---- shaders -----------------------------------------------------------
+  const vertexSource = `
+    attribute vec2 a_pos;
+    attribute vec3 a_color;
+    attribute float a_size;
+    uniform vec2 u_center;
+    uniform vec2 u_scale;
+    uniform float u_zoom;
+    varying vec3 v_color;
+    void main() {
+      gl_Position = vec4((a_pos - u_center) * u_scale, 0.0, 1.0);
+      gl_PointSize = clamp(a_size * u_zoom, 2.0, 64.0);
+      v_color = a_color;
+    }`;
+  const fragmentSource = `
+    precision mediump float;
+    uniform bool u_round;
+    uniform float u_alpha;
+    varying vec3 v_color;
+    void main() {
+      if (u_round) {
+        vec2 d = gl_PointCoord - vec2(0.5);
+        if (dot(d, d) > 0.25) discard;
+      }
+      gl_FragColor = vec4(v_color, u_alpha);
+    }`;
+
+  function compile(type, source) {
+    const shader = gl.createShader(type);
+    gl.shaderSource(shader, source);
+    gl.compileShader(shader);
+    return shader;
+  }
+  const program = gl.createProgram();
+  gl.attachShader(program, compile(gl.VERTEX_SHADER, vertexSource));
+  gl.attachShader(program, compile(gl.FRAGMENT_SHADER, fragmentSource));
+  gl.linkProgram(program);
+  gl.useProgram(program);
+
+  const loc = {
+    pos: gl.getAttribLocation(program, 'a_pos'),
+    color: gl.getAttribLocation(program, 'a_color'),
+    size: gl.getAttribLocation(program, 'a_size'),
+    center: gl.getUniformLocation(program, 'u_center'),
+    scale: gl.getUniformLocation(program, 'u_scale'),
+    zoom: gl.getUniformLocation(program, 'u_zoom'),
+    round: gl.getUniformLocation(program, 'u_round'),
+    alpha: gl.getUniformLocation(program, 'u_alpha'),
+  };
+
+  function buffer(array) {
+    const b = gl.createBuffer();
+    gl.bindBuffer(gl.ARRAY_BUFFER, b);
+    gl.bufferData(gl.ARRAY_BUFFER, array, gl.STATIC_DRAW);
+    return b;
+  }
+
+  // ---- GPU buffers -------------------------------------------------------
+  const nodePos = buffer(pos);
+  const nodeCol = buffer(nodeColors);
+  const nodeSize = buffer(sizes);
+
+  const palette = data.edge_palette;  // [[r, g, b], ...] indexed by edge kind
+  const linePos = new Float32Array(m * 4);
+  const lineCol = new Uint8Array(m * 6);
+  for (let e = 0; e < m; e++) {
+    const s = edges[2 * e], t = edges[2 * e + 1];
+    linePos[4 * e] = pos[2 * s];
+    linePos[4 * e + 1] = pos[2 * s + 1];
+    linePos[4 * e + 2] = pos[2 * t];
+    linePos[4 * e + 3] = pos[2 * t + 1];
+    const c = palette[edgeKinds[e]];
+    for (let k = 0; k < 3; k++) {
+      lineCol[6 * e + k] = c[k];
+      lineCol[6 * e + 3 + k] = c[k];
+    }
+  }
+  const edgePos = buffer(linePos);
+  const edgeCol = buffer(lineCol);
+  const edgeSize = buffer(new Float32Array(2 * m));
+
+  function bind(attr, buf, size, type, normalized) {
+    gl.bindBuffer(gl.ARRAY_BUFFER, buf);
+    gl.enableVertexAttribArray(attr);
+    gl.vertexAttribPointer(attr, size, type, normalized, 0, 0);
+  }
+
+  // ---- camera ------------------------------------------------------------
+  let minX = Infinity, minY = Infinity, maxX = -Infinity, maxY = -Infinity;
+  for (let i = 0; i < n; i++) {
+    minX = Math.min(minX, pos[2 * i]); maxX = Math.max(maxX, pos[2 * i]);
+    minY = Math.min(minY, pos[2 * i + 1]); maxY = Math.max(maxY, pos[2 * i + 1]);
+  }
+  if (!n) { minX = minY = -1; maxX = maxY = 1; }
+  let cx = (minX + maxX) / 2, cy = (minY + maxY) / 2;
+  let zoom = 1;
+
+  function resize() {
+    const ratio = window.devicePixelRatio || 1;
+    const w = canvas.clientWidth, h = canvas.clientHeight;
+    for (const c of [canvas, overlay]) {
+      c.width = w * ratio;
+      c.height = h * ratio;
+    }
+    gl.viewport(0, 0, canvas.width, canvas.height);
+  }
+
+  function fit() {
+    const w = canvas.clientWidth, h = canvas.clientHeight;
+    zoom = 0.9 * Math.min(w / Math.max(maxX - minX, 1), h / Math.max(maxY - minY, 1));
+  }
+
+  function toWorld(px, py) {
+    return [cx + (px - canvas.clientWidth / 2) / zoom, cy + (py - canvas.clientHeight / 2) / zoom];
+  }
+
+  function toScreen(x, y) {
+    return [(x - cx) * zoom + canvas.clientWidth / 2, (y - cy) * zoom + canvas.clientHeight / 2];
+  }
+
+  // ---- drawing -----------------------------------------------------------
+  let hovered = -1;
+  let pending = false;
+
+  function draw() {
+    pending = false;
+    const ratio = window.devicePixelRatio || 1;
+    gl.clearColor(1, 1, 1, 1);
+    gl.clear(gl.COLOR_BUFFER_BIT);
+    gl.enable(gl.BLEND);
+    gl.blendFunc(gl.SRC_ALPHA, gl.ONE_MINUS_SRC_ALPHA);
+
+    // world -> clip space; y grows downwards like vis.js coordinates
+    gl.uniform2f(loc.center, cx, cy);
+    gl.uniform2f(loc.scale, 2 * zoom / canvas.clientWidth, -2 * zoom / canvas.clientHeight);
+    gl.uniform1f(loc.zoom, zoom * ratio);
+
+    bind(loc.pos, edgePos, 2, gl.FLOAT, false);
+    bind(loc.color, edgeCol, 3, gl.UNSIGNED_BYTE, true);
+    bind(loc.size, edgeSize, 1, gl.FLOAT, false);
+    gl.uniform1i(loc.round, 0);
+    gl.uniform1f(loc.alpha, m > 20000 ? 0.15 : 0.4);
+    gl.drawArrays(gl.LINES, 0, 2 * m);
+
+    bind(loc.pos, nodePos, 2, gl.FLOAT, false);
+    bind(loc.color, nodeCol, 3, gl.UNSIGNED_BYTE, true);
+    bind(loc.size, nodeSize, 1, gl.FLOAT, false);
+    gl.uniform1i(loc.round, 1);
+    gl.uniform1f(loc.alpha, 1.0);
+    gl.drawArrays(gl.POINTS, 0, n);
+
+    drawLabels(ratio);
+  }
+
+  // labels for the biggest nodes on screen, plus the hovered one
+  const bySize = Array.from({ length: n }, (_, i) => i).sort((a, b) => sizes[b] - sizes[a]);
+
+  function drawLabels(ratio) {
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.clearRect(0, 0, overlay.width, overlay.height);
+    ctx.font = '11px sans-serif';
+    ctx.fillStyle = '#2c3e50';
+    let drawn = 0;
+    for (const i of bySize) {
+      if (drawn >= data.max_labels) break;
+      const [sx, sy] = toScreen(pos[2 * i], pos[2 * i + 1]);
+      if (sx < 0 || sy < 0 || sx > canvas.clientWidth || sy > canvas.clientHeight) continue;
+      ctx.fillText(labels[i], sx + 4, sy - 4);
+      drawn++;
+    }
+    if (hovered >= 0) {
+      const [sx, sy] = toScreen(pos[2 * hovered], pos[2 * hovered + 1]);
+      ctx.font = 'bold 12px sans-serif';
+      ctx.fillText(labels[hovered], sx + 4, sy - 4);
+    }
+  }
+
+  function redraw() {
+    if (!pending) {
+      pending = true;
+      requestAnimationFrame(draw);
+    }
+  }
+
+  // ---- hover picking via a uniform grid ------------------------------------
+  const cells = Math.max(1, Math.ceil(Math.sqrt(n)));
+  const cellW = Math.max(maxX - minX, 1e-9) / cells;
+  const cellH = Math.max(maxY - minY, 1e-9) / cells;
+  const grid = new Map();
+  function cellOf(x, y) {
+    const i = Math.min(cells - 1, Math.max(0, Math.floor((x - minX) / cellW)));
+    const j = Math.min(cells - 1, Math.max(0, Math.floor((y - minY) / cellH)));
+    return [i, j];
+  }
+  for (let k = 0; k < n; k++) {
+    const [i, j] = cellOf(pos[2 * k], pos[2 * k + 1]);
+    const key = i * cells + j;
+    if (!grid.has(key)) grid.set(key, []);
+    grid.get(key).push(k);
+  }
+
+  function pick(px, py) {
+    const [wx, wy] = toWorld(px, py);
+    const radius = 8 / zoom;
+    const [i0, j0] = cellOf(wx - radius, wy - radius);
+    const [i1, j1] = cellOf(wx + radius, wy + radius);
+    let best = -1, bestDist = Infinity;
+    for (let i = i0; i <= i1; i++) {
+      for (let j = j0; j <= j1; j++) {
+        for (const k of grid.get(i * cells + j) || []) {
+          const dx = pos[2 * k] - wx, dy = pos[2 * k + 1] - wy;
+          const d = dx * dx + dy * dy;
+          const r = Math.max(radius, Math.min(sizes[k], 32 / zoom));
+          if (d < r * r && d < bestDist) { best = k; bestDist = d; }
+        }
+      }
+    }
+    return best;
+  }
+
+  // ---- interaction ---------------------------------------------------------
+  let dragging = null;
+
+  canvas.addEventListener('wheel', (ev) => {
+    ev.preventDefault();
+    const rect = canvas.getBoundingClientRect();
+    const px = ev.clientX - rect.left, py = ev.clientY - rect.top;
+    const [wx, wy] = toWorld(px, py);
+    zoom *= Math.exp(-ev.deltaY * 0.0015);
+    // keep the point under the cursor fixed
+    cx = wx - (px - canvas.clientWidth / 2) / zoom;
+    cy = wy - (py - canvas.clientHeight / 2) / zoom;
+    redraw();
+  }, { passive: false });
+
+  canvas.addEventListener('mousedown', (ev) => {
+    dragging = { x: ev.clientX, y: ev.clientY, cx, cy };
+  });
+  window.addEventListener('mouseup', () => { dragging = null; });
+
+  canvas.addEventListener('mousemove', (ev) => {
+    if (dragging) {
+      cx = dragging.cx - (ev.clientX - dragging.x) / zoom;
+      cy = dragging.cy - (ev.clientY - dragging.y) / zoom;
+      tooltip.style.display = 'none';
+      redraw();
+      return;
+    }
+    const rect = canvas.getBoundingClientRect();
+    const px = ev.clientX - rect.left, py = ev.clientY - rect.top;
+    const k = pick(px, py);
+    if (k !== hovered) {
+      hovered = k;
+      redraw();
+    }
+    if (k >= 0) {
+      tooltip.style.display = 'block';
+      tooltip.style.left = (px + 12) + 'px';
+      tooltip.style.top = (py + 12) + 'px';
+      tooltip.textContent = title(k);
+    } else {
+      tooltip.style.display = 'none';
+    }
+  });
+
+  canvas.addEventListener('dblclick', () => {
+    cx = (minX + maxX) / 2;
+    cy = (minY + maxY) / 2;
+    fit();
+    redraw();
+  });
+
+  window.addEventListener('resize', () => { resize(); redraw(); });
+
+  resize();
+  fit();
+  draw();
+})();
@@ -0,0 +1,133 @@
+import networkx as nx
+import streamlit as st
+
+from ..storage import Database, DependencyIndex, PackageIndex
+from ..graph import build_graph, FacetIndex, NeighborhoodIndex, MetricVariants, restore_closures
+from ..graph.aggregate import GROUPINGS, group_labels
+from ..ontology import SearchIndex
+
+
+# every loader below is keyed by the database version, so a rebuild is picked
+# up on the next rerun and the superseded entry is evicted
+
+
+@st.cache_resource
+def get_db():
+    return Database()
+
+
+def data_version() -> tuple[int, int]:
+    """Current database version; cheap enough to check on every rerun."""
+    return get_db().data_version()
+
+
+def load_data():
+    return _load_data(data_version())
+
+
+def load_graph():
+    """Build the full graph and its facet index once, shared across reruns and sessions.
+
+    Callers must treat the graph as read-only; use filtered views instead of copies.
+    """
+    return _load_graph(data_version())
+
+
+def load_packages_by_name():
+    """Package records by name."""
+    return _load_packages_by_name(data_version())
+
+
+def load_package_index():
+    """Facet masks and pre-sorted orders for the paged package list."""
+    return _load_package_index(data_version())
+
+
+def load_search_index():
+    """Typo-tolerant package-name search ranked by PageRank."""
+    return _load_search_index(data_version())
+
+
+def load_dependency_index():
+    """Dependencies and dependents of every package, grouped by relation type."""
+    return _load_dependency_index(data_version())
+
+
+def load_neighborhoods():
+    """Precomputed 1-3 hop neighbor sets for focus and local-network views."""
+    return _load_neighborhoods(data_version())
+
+
+def load_metric_variants():
+    """Per-relation-type metric vectors aligned with the facet index.
+
+    Read from the database when the build stored them. Otherwise only the
+    all-relations metrics stored on the packages are available; check
+    `covers` before asking for a relation-type selection.
+    """
+    return _load_metric_variants(data_version())
+
+
+def load_group_labels(by: str):
+    """Domain, community or SCC group of every package, computed once on the full graph."""
+    return _load_group_labels(data_version(), by)
+
+
+@st.cache_data(max_entries=1)
+def _load_data(version):
+    db = get_db()
+    return db.get_all_packages(), db.get_all_dependencies()
+
+
+@st.cache_resource(max_entries=1)
+def _load_graph(version):
+    packages, deps = _load_data(version)
+    G = nx.freeze(build_graph(packages, deps))
+    # closures stored by the build, so the first transitive query doesn't compute them
+    restore_closures(G, *get_db().get_closures())
+    return G, FacetIndex(G)
+
+
+@st.cache_resource(max_entries=1)
+def _load_packages_by_name(version):
+    packages, _ = _load_data(version)
+    return {p.name: p for p in packages}
+
+
+@st.cache_resource(max_entries=1)
+def _load_package_index(version):
+    packages, _ = _load_data(version)
+    return PackageIndex(packages)
+
+
+@st.cache_resource(max_entries=1)
+def _load_search_index(version):
+    packages, _ = _load_data(version)
+    return SearchIndex(packages)
+
+
+@st.cache_resource(max_entries=1)
+def _load_dependency_index(version):
+    _, deps = _load_data(version)
+    return DependencyIndex(deps)
+
+
+@st.cache_resource(max_entries=1)
+def _load_neighborhoods(version):
+    G, _ = _load_graph(version)
+    return NeighborhoodIndex(G)
+
+
+@st.cache_resource(max_entries=1)
+def _load_metric_variants(version):
+    G, facet_index = _load_graph(version)
+    names, vectors = get_db().get_metric_vectors()
+    if not names:
+        return MetricVariants.from_node_attributes(G).reindex(facet_index.nodes)
+    return MetricVariants.from_storage(names, vectors).reindex(facet_index.nodes)
+
+
+@st.cache_resource(max_entries=len(GROUPINGS))
+def _load_group_labels(version, by):
+    G, _ = _load_graph(version)
+    return group_labels(G, by)
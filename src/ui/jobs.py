@@ -0,0 +1,144 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Iterable
+
+import streamlit as st
+
+
+# a query function gets a should_stop callback and yields results as it finds them
+QueryFn = Callable[[Callable[[], bool]], Iterable]
+
+
+@dataclass
+class Job:
+    """One background query; results grow as the worker yields them."""
+    key: Hashable
+    time_budget: float | None = None
+    results: list = field(default_factory=list)
+    error: Exception | None = None
+    # finished because of the time budget or cancellation, so results may be incomplete
+    stopped: bool = False
+    watchers: int = 1
+    deadline: float | None = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+    _cancelled: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def timed_out(self) -> bool:
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def should_stop(self) -> bool:
+        return self.cancelled or self.timed_out
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block up to `timeout` seconds; True once the job has finished."""
+        return self._done.wait(timeout)
+
+    def snapshot(self) -> list:
+        return list(self.results)
+
+
+class QueryPool:
+    """Worker threads shared by every session for slow graph queries.
+
+    Keeps the Streamlit script thread free: a page submits a query, shows
+    `job.snapshot()` while it runs and stops waiting whenever its inputs
+    change. Identical queries (same key) in flight are shared instead of
+    run twice. A job stops at its time budget, or as soon as the last
+    session waiting on it releases it, so an abandoned or pathological
+    query doesn't hold a worker. Stopping is cooperative: query functions
+    poll the `should_stop` callback they are given.
+    """
+
+    def __init__(self, workers: int = 2, time_budget: float = 10.0):
+        self.time_budget = time_budget
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='query')
+        self._lock = threading.Lock()
+        self._running: dict[Hashable, Job] = {}
+
+    def submit(self, key: Hashable, fn: QueryFn, time_budget: float = None) -> Job:
+        """Start `fn` in the background, or join the identical query already running."""
+        with self._lock:
+            job = self._running.get(key)
+            if job is not None and not job.cancelled:
+                job.watchers += 1
+                return job
+            job = Job(key, time_budget if time_budget is not None else self.time_budget)
+            self._running[key] = job
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def release(self, job: Job) -> None:
+        """Stop waiting on `job`; it is cancelled once nobody else waits on it."""
+        with self._lock:
+            job.watchers -= 1
+            if job.watchers > 0 or job.done:
+                return
+            job._cancelled.set()
+            if self._running.get(job.key) is job:
+                del self._running[job.key]
+
+    def _run(self, job: Job, fn: QueryFn) -> None:
+        # the budget counts from when a worker picks the job up
+        if job.time_budget is not None:
+            job.deadline = time.monotonic() + job.time_budget
+        try:
+            if not job.should_stop():
+                for item in fn(job.should_stop):
+                    job.results.append(item)
+                    if job.should_stop():
+                        break
+        except Exception as e:
+            job.error = e
+        finally:
+            job.stopped = job.should_stop()
+            with self._lock:
+                if self._running.get(job.key) is job:
+                    del self._running[job.key]
+            job._done.set()
+
+
+@st.cache_resource
+def get_query_pool() -> QueryPool:
+    return QueryPool()
+
+
+def session_job(slot: str, key: Hashable, fn: QueryFn = None, time_budget: float = None) -> Job | None:
+    """This session's background job in `slot`, if it is for `key`.
+
+    A job for a different key is released first, since its inputs are gone.
+    With `fn`, a missing job is submitted; without, only an existing one is returned.
+    """
+    pool = get_query_pool()
+    job = st.session_state.get(slot)
+    if job is not None and job.key != key:
+        pool.release(job)
+        del st.session_state[slot]
+        job = None
+    if job is None and fn is not None:
+        job = pool.submit(key, fn, time_budget)
+        st.session_state[slot] = job
+    return job
+
+
+def follow_job(job: Job, show_partial: Callable[[list], None], poll: float = 0.25) -> None:
+    """Show partial results until `job` finishes.
+
+    The script thread only polls, so a widget change reruns the page right
+    away instead of waiting for the query.
+    """
+    placeholder = st.empty()
+    while not job.wait(poll):
+        with placeholder.container():
+            show_partial(job.snapshot())
+    placeholder.empty()
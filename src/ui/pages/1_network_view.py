@@ -4,9 +4,12 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from src.storage import Database
-from src.graph import build_graph, filter_graph, get_subgraph_around
-from src.ui.components import render_filters, render_graph, render_legend
+from src.graph import get_subgraph_around
+from src.graph.aggregate import GROUPINGS, aggregate_graph
+from src.ui.components import render_filters, render_graph, render_legend, package_picker
+from src.ui.components.webgl_renderer import can_render_webgl
+from src.ui.data import (load_data, load_graph, load_neighborhoods, load_metric_variants, load_group_labels,
+                         load_search_index)
 
 st.set_page_config(page_title="Network View", layout="wide", initial_sidebar_state="expanded")
 
@@ -23,67 +26,112 @@ st.title("🌐 Network View")
 st.caption("**Tip:** Click and drag to pan • Scroll to zoom • Click a node to highlight connections • Drag nodes to rearrange")
 
 
-@st.cache_resource
-def get_db():
-    return Database()
-
-
-@st.cache_data
-def load_data():
-    db = get_db()
-    return db.get_all_packages(), db.get_all_dependencies()
-
-
 packages, deps = load_data()
 
 if not packages:
     st.warning("No data. Run collection script first.")
     st.stop()
 
-# build full graph
-G = build_graph(packages, deps)
+# full graph and facet masks are built once and shared
+G, facet_index = load_graph()
 
 # focus on specific package (at top of sidebar)
 st.sidebar.subheader("Focus", help="Zoom in on a specific package's neighborhood")
-pkg_options = ["(none)"] + sorted([p.name for p in packages])
-
-focus_pkg = st.sidebar.selectbox(
-    "Center on package",
-    pkg_options,
-    index=0,
+focus_pkg = package_picker(
+    "Center on package", load_search_index(), key="focus",
+    allow_none=True, container=st.sidebar,
     help="Select a package to view only its local dependency network"
 )
 focus_depth = st.sidebar.slider(
     "Depth", 1, 3, 2,
     help="How many hops away from the focused package to include"
 )
+focus_direction = st.sidebar.radio(
+    "Direction", ["both", "dependencies", "dependents"],
+    horizontal=True,
+    help="Follow what the package depends on, what depends on it, or both"
+)
+
+st.sidebar.divider()
+
+# level of detail
+st.sidebar.subheader("Level of Detail", help="Collapse packages into groups when too many are visible")
+renderer = st.sidebar.radio(
+    "Renderer", ["webgl", "pyvis"], horizontal=True,
+    format_func={'webgl': 'WebGL (fast)', 'pyvis': 'PyVis (draggable)'}.get,
+    help="WebGL draws tens of thousands of nodes at their precomputed positions; "
+         "PyVis supports dragging and physics but slows down past a few thousand elements"
+)
+# decided here so the node budget matches the renderer that actually draws the graph
+if renderer == "webgl" and not can_render_webgl(G):
+    renderer = "pyvis"
+    st.sidebar.caption("Some packages have no stored layout position, so PyVis is used. "
+                       "Run a full build to compute the layout.")
+node_budget = st.sidebar.slider(
+    "Node budget", 50, 50000, 20000 if renderer == "webgl" else 300, step=50,
+    help="Above this many visible packages, packages are collapsed into group nodes"
+)
+group_by = st.sidebar.radio(
+    "Group by", GROUPINGS, horizontal=True,
+    format_func=lambda g: {'scc': 'cycles/layers'}.get(g, g),
+    help="Domain, detected community, or dependency cycle / topological layer"
+)
 
 st.sidebar.divider()
 
 # filters
 filters = render_filters(packages, show_relation_types=True)
 
-# apply filters
-filtered_G = filter_graph(
-    G,
+# metrics computed over only the selected relation types
+variants = load_metric_variants()
+metric_relations = filters['relation_types']
+if not variants.covers(metric_relations):
+    metric_relations = None
+    st.caption("Per-relation metrics weren't stored by the last build, so sizes and the "
+               "in-degree filter use all relation types. Run a full build to store them.")
+
+# apply filters (bitmask view, no graph copy)
+view = facet_index.view(
     domains=filters['domains'],
     roles=filters['roles'],
     relation_types=filters['relation_types'],
-    min_in_degree=filters['min_in_degree']
+    min_in_degree=filters['min_in_degree'],
+    in_degree=variants.for_relations(metric_relations)['in_degree']
 )
+filtered_G = view.graph()
+num_nodes, num_edges = view.number_of_nodes(), view.number_of_edges()
 
 # focus if selected
-if focus_pkg != "(none)":
-    filtered_G = get_subgraph_around(filtered_G, focus_pkg, depth=focus_depth)
+if focus_pkg:
+    filtered_G = get_subgraph_around(
+        filtered_G, focus_pkg, depth=focus_depth,
+        direction=focus_direction, index=load_neighborhoods()
+    )
+    num_nodes, num_edges = filtered_G.number_of_nodes(), filtered_G.number_of_edges()
+
+# collapse into groups before anything is serialized for the browser
+if num_nodes > node_budget:
+    labels = load_group_labels(group_by)
+    present = sorted({labels[n] for n in filtered_G.nodes()})
+    # pyvis can't report clicks back to Streamlit, so drilling down is a sidebar choice
+    expanded = st.sidebar.multiselect(
+        "Expand groups", present,
+        help="Show the packages inside these groups individually (highest PageRank first, within the budget)"
+    )
+    filtered_G = aggregate_graph(filtered_G, labels, node_budget, expanded)
+    st.info(
+        f"{num_nodes:,} packages exceed the node budget; showing {filtered_G.number_of_nodes()} "
+        f"nodes grouped by {group_by}. Expand groups in the sidebar to drill in."
+    )
 
 # stats
 col1, col2 = st.columns(2)
 col1.metric(
-    "Visible Nodes", filtered_G.number_of_nodes(),
+    "Visible Nodes", num_nodes,
     help="Number of packages shown after applying filters"
 )
 col2.metric(
-    "Visible Edges", filtered_G.number_of_edges(),
+    "Visible Edges", num_edges,
     help="Number of dependency relationships shown after filtering"
 )
 
@@ -91,8 +139,17 @@ col2.metric(
 render_legend()
 st.divider()
 
-physics = st.checkbox(
-    "Enable physics simulation", value=True,
-    help="When enabled, nodes repel each other and settle into a layout. Disable for large graphs."
+physics = False
+if renderer == "pyvis":
+    physics = st.checkbox(
+        "Enable physics simulation", value=False,
+        help="By default nodes are pinned to a layout computed at build time. "
+             "Enable to let nodes repel each other and re-settle in the browser (slow for large graphs)."
+    )
+else:
+    st.caption("Scroll to zoom • Drag to pan • Hover for details • Double-click to reset the view")
+render_graph(
+    filtered_G, height=700, physics=physics,
+    node_metrics=variants.node_metrics(metric_relations, filtered_G.nodes()),
+    renderer=renderer
 )
-render_graph(filtered_G, height=700, physics=physics)
@@ -4,9 +4,11 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from src.storage import Database
-from src.graph import build_graph, get_subgraph_around
-from src.ui.components import render_filters, apply_filters, render_package_card, render_graph
+from src.graph import get_subgraph_around
+from src.storage import SORT_KEYS
+from src.ui.components import render_filters, render_package_card, render_graph
+from src.ui.data import (load_data, load_graph, load_neighborhoods, load_packages_by_name,
+                         load_dependency_index, load_package_index, load_search_index)
 
 st.set_page_config(page_title="Package Explorer", layout="wide", initial_sidebar_state="expanded")
 
@@ -21,16 +23,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 st.title("📦 Package Explorer")
 
-
-@st.cache_resource
-def get_db():
-    return Database()
-
-
-@st.cache_data
-def load_data():
-    db = get_db()
-    return db.get_all_packages(), db.get_all_dependencies()
+# packages per page of the list
+PAGE_SIZE = 50
 
 
 packages, deps = load_data()
@@ -39,43 +33,65 @@ if not packages:
     st.warning("No data. Run collection script first.")
     st.stop()
 
-G = build_graph(packages, deps)
-pkg_lookup = {p.name: p for p in packages}
+G, _ = load_graph()
+pkg_lookup = load_packages_by_name()
 
 # filters
 filters = render_filters(packages, show_relation_types=False)
-filtered = apply_filters(packages, filters)
 
 # main content - search and sort at top
 col_search, col_sort = st.columns([3, 1])
 with col_search:
-    search = st.text_input("🔍 Search packages", "", placeholder="Type to filter by name...")
+    search = st.text_input("🔍 Search packages", "", placeholder="Type a package name, typos are fine...")
 with col_sort:
     sort_by = st.selectbox(
         "Sort by",
-        ["pagerank", "in_degree", "name", "github_stars"],
+        list(SORT_KEYS),
         index=0,
         help="PageRank shows most important packages first"
     )
 
-if search:
-    filtered = [p for p in filtered if search.lower() in p.name.lower()]
-
-filtered.sort(key=lambda p: getattr(p, sort_by) or 0, reverse=sort_by != "name")
-
-st.caption(f"**{len(filtered)}** packages match filters")
+# filtering is a mask over the cached index and sorting a lookup of its
+# pre-sorted orders; only the visible page is turned into widgets
+package_index = load_package_index()
+mask = package_index.mask(
+    domains=filters['domains'],
+    roles=filters['roles'],
+    health=filters['health'],
+    min_in_degree=filters['min_in_degree'],
+    names=load_search_index().matches(search) if search else None,
+)
+total = int(mask.sum())
+num_pages = max((total + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+
+# back to the first page whenever the selection changes
+list_key = (tuple(filters['domains']), tuple(filters['roles']), tuple(filters['health']),
+            filters['min_in_degree'], search, sort_by)
+if st.session_state.get('package_list_key') != list_key:
+    st.session_state['package_list_key'] = list_key
+    st.session_state['package_page'] = 0
+page = min(st.session_state.get('package_page', 0), num_pages - 1)
+
+st.caption(f"**{total}** packages match filters")
 
 # package list + detail
 col_list, col_detail = st.columns([1, 2])
 
 with col_list:
     selected = None
-    for pkg in filtered[:50]:
+    for pkg in package_index.page(mask, sort_by, offset=page * PAGE_SIZE, limit=PAGE_SIZE):
         if st.button(pkg.name, key=f"pkg_{pkg.name}", use_container_width=True):
             selected = pkg.name
 
-    if len(filtered) > 50:
-        st.caption(f"... and {len(filtered) - 50} more. Use search to find specific packages.")
+    if num_pages > 1:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        if col_prev.button("◀", disabled=page == 0, use_container_width=True):
+            st.session_state['package_page'] = page - 1
+            st.rerun()
+        col_page.caption(f"Page {page + 1} of {num_pages}")
+        if col_next.button("▶", disabled=page >= num_pages - 1, use_container_width=True):
+            st.session_state['package_page'] = page + 1
+            st.rerun()
 
 # use session state to persist selection
 if selected:
@@ -91,16 +107,13 @@ with col_detail:
     if selected and selected in pkg_lookup:
         pkg = pkg_lookup[selected]
 
-        # get dependencies and dependents
-        pkg_deps = [d for d in deps if d.source == selected]
-        pkg_dependents = [d for d in deps if d.target == selected]
-
-        render_package_card(pkg, dependencies=pkg_deps, dependents=pkg_dependents)
+        # dependencies and dependents come pre-grouped from the cached index
+        render_package_card(pkg, index=load_dependency_index())
 
         # mini network view
         st.divider()
         st.subheader("Local Network")
-        subgraph = get_subgraph_around(G, selected, depth=1)
+        subgraph = get_subgraph_around(G, selected, depth=1, index=load_neighborhoods())
         render_graph(subgraph, height=400, physics=False)
     else:
         st.info("Select a package from the list to view details.")
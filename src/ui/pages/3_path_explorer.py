@@ -1,12 +1,15 @@
 import streamlit as st
 import sys
+from itertools import islice
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from src.storage import Database
-from src.graph import build_graph, find_all_paths, get_path_details
-from src.ui.components import render_graph
+from src.storage import RelationType
+from src.graph import iter_paths, get_path_details, find_common_dependencies, find_common_dependents
+from src.ui.components import render_graph, package_picker, package_multi_picker
+from src.ui.data import load_data, load_graph, load_search_index, data_version
+from src.ui.jobs import session_job, follow_job
 
 st.set_page_config(page_title="Path Explorer", layout="wide")
 st.title("🛤️ Path Explorer")
@@ -30,45 +33,32 @@ For example, `mlflow → numpy` could go through `pandas`, `scipy`, or directly.
 """)
 
 
-@st.cache_resource
-def get_db():
-    return Database()
-
-
-@st.cache_data
-def load_data():
-    db = get_db()
-    return db.get_all_packages(), db.get_all_dependencies()
-
-
 packages, deps = load_data()
 
 if not packages:
     st.warning("No data. Run collection script first.")
     st.stop()
 
-G = build_graph(packages, deps)
-pkg_names = sorted([p.name for p in packages])
+G, _ = load_graph()
+search_index = load_search_index()
+
 
 # interesting defaults - mlflow -> certifi shows a 3-hop path through requests
-def get_index(name, fallback=0):
-    try:
-        return pkg_names.index(name)
-    except ValueError:
-        return fallback
+def first_present(*names):
+    return next((name for name in names if name in G), None)
 
 # inputs
 col1, col2 = st.columns(2)
 with col1:
-    source = st.selectbox(
-        "From package", pkg_names,
-        index=get_index("mlflow", get_index("transformers", 0)),
+    source = package_picker(
+        "From package", search_index, key="path_source",
+        default=first_present("mlflow", "transformers"),
         help="Starting package — finds dependencies of this package"
     )
 with col2:
-    target = st.selectbox(
-        "To package", pkg_names,
-        index=get_index("certifi", get_index("numpy", 1)),
+    target = package_picker(
+        "To package", search_index, key="path_target",
+        default=first_present("certifi", "numpy"),
         help="Target package — searches for this as a direct or transitive dependency"
     )
 
@@ -80,40 +70,72 @@ max_length = st.slider(
     "Max path length", 2, 8, 5,
     help="Maximum hops between packages (longer = slower but finds more paths)"
 )
+relation_options = [r.value for r in RelationType]
+path_relations = st.multiselect(
+    "Follow relation types", relation_options,
+    default=relation_options,
+    help="Only follow dependency edges of these types"
+)
 
-if st.button("Find Paths", type="primary"):
-    if source == target:
-        st.warning("Select different packages")
+# seconds before a path search gives up and shows what it has; searches run
+# in the background, so a long one no longer freezes the page
+PATH_TIME_BUDGET = 10.0
+
+path_key = ('paths', data_version(), source, target, max_length, max_paths, tuple(path_relations))
+find_clicked = st.button("Find Paths", type="primary")
+path_job = session_job('path_job', path_key)
+
+if find_clicked and (not source or not target):
+    st.warning("Select both packages")
+elif find_clicked and source == target:
+    st.warning("Select different packages")
+elif find_clicked or path_job is not None:
+    # one extra path tells us whether more exist beyond the displayed ones
+    path_job = session_job(
+        'path_job', path_key,
+        lambda should_stop: islice(iter_paths(
+            G, source, target, max_length=max_length,
+            relation_types=path_relations or None,
+            should_stop=should_stop
+        ), max_paths + 1),
+        time_budget=PATH_TIME_BUDGET
+    )
+    follow_job(path_job, lambda found: st.info(
+        f"Searching... {len(found)} path(s) so far" + "".join(f"\n- {' → '.join(p)}" for p in found)
+    ))
+    paths = path_job.snapshot()
+
+    if path_job.error is not None:
+        st.error(f"Path search failed: {path_job.error}")
+    elif not paths:
+        st.error(f"No path found from **{source}** to **{target}**")
+        st.caption("Try swapping source ↔ target, or increase max path length. See \"How path finding works\" above.")
     else:
-        paths = find_all_paths(G, source, target, max_length=max_length)
+        st.success(f"Found {min(len(paths), max_paths)} path(s), shortest first")
+        if path_job.stopped and len(paths) <= max_paths:
+            st.caption(f"Search stopped after {PATH_TIME_BUDGET:.0f}s; longer paths may exist")
 
-        if not paths:
-            st.error(f"No path found from **{source}** to **{target}**")
-            st.caption("Try swapping source ↔ target, or increase max path length. See \"How path finding works\" above.")
-        else:
-            st.success(f"Found {len(paths)} path(s)")
+        for i, path in enumerate(paths[:max_paths]):
+            with st.expander(f"Path {i+1}: {' → '.join(path)} (length {len(path)-1})"):
+                details = get_path_details(G, path, relation_types=path_relations or None)
 
-            for i, path in enumerate(paths[:max_paths]):
-                with st.expander(f"Path {i+1}: {' → '.join(path)} (length {len(path)-1})"):
-                    details = get_path_details(G, path)
+                # show step by step
+                for j, step in enumerate(details):
+                    cols = st.columns([1, 2, 1])
+                    cols[0].markdown(f"**{step['package']}**")
+                    cols[1].markdown(f"`{step['domain']}` / `{step['role']}`")
 
-                    # show step by step
-                    for j, step in enumerate(details):
-                        cols = st.columns([1, 2, 1])
-                        cols[0].markdown(f"**{step['package']}**")
-                        cols[1].markdown(f"`{step['domain']}` / `{step['role']}`")
+                    if 'edge_type' in step:
+                        cols[2].markdown(f"↓ _{step['edge_type']}_")
 
-                        if 'edge_type' in step:
-                            cols[2].markdown(f"↓ _{step['edge_type']}_")
+                # mini graph of path
+                path_nodes = set(path)
+                subgraph = G.subgraph(path_nodes)
+                render_graph(subgraph, height=300, physics=False)
 
-                    # mini graph of path
-                    path_nodes = set(path)
-                    subgraph = G.subgraph(path_nodes).copy()
-                    render_graph(subgraph, height=300, physics=False)
-
-            # summary
-            if len(paths) > max_paths:
-                st.info(f"Showing {max_paths} of {len(paths)} paths")
+        # summary
+        if len(paths) > max_paths:
+            st.info(f"Showing the {max_paths} shortest paths; longer ones exist")
 
 # common dependencies finder
 st.divider()
@@ -121,12 +143,15 @@ st.subheader("Find Common Dependencies")
 
 with st.expander("How this works", expanded=False):
     st.markdown("""
-Finds **direct dependencies** that all selected packages share.
+Finds dependencies that all selected packages share — or, in reverse, packages that depend on all of them.
+
+**Direct vs. transitive:** By default only *direct* dependencies are compared. Tick
+"Include transitive" to compare everything each package pulls in, however deep.
 
 **Why no common dependencies?**
 - Packages may use different libraries for similar tasks
 - Some packages have few dependencies (e.g., `torch` has minimal direct deps)
-- Only *direct* dependencies are checked, not transitive ones
+- "Core only" ignores optional, dev and extends edges
 
 **Good examples to try:**
 - HuggingFace ecosystem: `transformers`, `diffusers`, `accelerate` → share `huggingface-hub`, `numpy`
@@ -134,23 +159,55 @@ Finds **direct dependencies** that all selected packages share.
 """)
 
 # default to HuggingFace packages which share common deps
-default_common = [p for p in ["transformers", "diffusers", "accelerate"] if p in pkg_names]
-selected_pkgs = st.multiselect(
-    "Select packages", pkg_names,
+default_common = [p for p in ["transformers", "diffusers", "accelerate"] if p in G]
+selected_pkgs = package_multi_picker(
+    "Select packages", search_index, key="common_packages",
     default=default_common,
     help="Select 2+ packages to find dependencies they all share"
 )
 
+col1, col2, col3 = st.columns(3)
+common_mode = col1.radio(
+    "Find", ["Common dependencies", "Common dependents"],
+    help="Shared dependencies of the selection, or packages that depend on all of it"
+)
+transitive = col2.checkbox(
+    "Include transitive", value=False,
+    help="Compare full transitive closures instead of direct edges only"
+)
+core_only = col3.checkbox(
+    "Core only", value=False,
+    help="Only follow requires_core edges"
+)
+
 if len(selected_pkgs) >= 2:
-    common = set(G.successors(selected_pkgs[0]))
-    for pkg in selected_pkgs[1:]:
-        if pkg in G:
-            common &= set(G.successors(pkg))
-
-    if common:
-        st.markdown(f"**{len(common)} common dependencies:**")
-        st.write(", ".join(sorted(common)))
+    finder = find_common_dependencies if common_mode == "Common dependencies" else find_common_dependents
+    relation_types = ['requires_core'] if core_only else None
+    if transitive:
+        # the first transitive query builds the closure index; do it off the script thread.
+        # the finder returns one list, kept as a single result; the build polls should_stop
+        common_job = session_job(
+            'common_job', ('common', data_version(), tuple(selected_pkgs), common_mode, core_only),
+            lambda should_stop: [finder(G, selected_pkgs, transitive=True, relation_types=relation_types,
+                                        should_stop=should_stop)]
+        )
+        follow_job(common_job, lambda found: st.caption("Computing transitive closures..."))
+        results = common_job.snapshot()
+        common = results[0] if results else []
+    else:
+        common_job = None
+        common = finder(G, selected_pkgs, relation_types=relation_types)
+
+    scope = "transitive" if transitive else "direct"
+    noun = "dependencies" if common_mode == "Common dependencies" else "dependents"
+    if common_job is not None and common_job.error is not None:
+        st.error(f"Common {noun} search failed: {common_job.error}")
+    elif common_job is not None and common_job.stopped and not common:
+        st.caption(f"Search stopped early; common {noun} were not computed")
+    elif common:
+        st.markdown(f"**{len(common)} common {scope} {noun}:**")
+        st.write(", ".join(common))
     else:
-        st.info("No common direct dependencies found. These packages may use different libraries or have minimal dependencies.")
+        st.info(f"No common {scope} {noun} found. These packages may use different libraries or have minimal dependencies.")
 elif len(selected_pkgs) == 1:
     st.caption("Select at least 2 packages to compare")